@@ -0,0 +1 @@
+"""Headless benchmarks for ScreenKit. Run modules with `python -m benchmarks.<name>`."""
@@ -0,0 +1,107 @@
+"""Peak RSS, page faults and throughput of enhance() with and without the frame buffer pool.
+
+    python -m benchmarks.bench_buffer_pool --size 1080p --frames 200
+    python -m benchmarks.bench_buffer_pool --size 4k --frames 60 --workers 0 2
+
+Every case runs in its own interpreter so peak RSS is not shared between
+runs. Minor page faults per frame stand in for allocator churn: each fresh
+frame-sized allocation is mmapped and faulted in page by page, while a
+recycled buffer is already resident. The source is an .mp4 file, so frames
+are decoded into pooled buffers. The outputs are spool files, and the script
+exits non-zero if the pooled and unpooled renders differ in any frame.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from benchmarks.synthetic import SIZES, enhance_params_for, make_recording, scratch_path
+from screenkit import config
+
+
+def high_water_mb() -> float:
+    """Peak RSS of this process image. ru_maxrss survives exec, so it would include the parent's peak."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    from screenkit.metrics import peak_rss_mb
+    return peak_rss_mb() or 0.0
+
+
+def run_case(video_path: str, data_path: str, output_path: str, size: str, workers: int, pooled: bool) -> Dict[str, Any]:
+    from screenkit.enhance import enhance
+    from screenkit.metrics import Metrics
+
+    params = {**enhance_params_for(SIZES[size]), "workers": workers, "buffer_pool": pooled}
+    metrics = Metrics()
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        enhance(video_path, output_path, data_path, params, metrics=metrics)
+        elapsed = time.perf_counter() - started
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults
+    return {"seconds": elapsed, "faults": faults, "peak_rss_mb": high_water_mb(),
+            "pools": metrics.snapshot().get("buffer_pools", {})}
+
+
+def compare(a: str, b: str) -> int:
+    from screenkit.spool import SpoolReader
+    first, second = SpoolReader(a), SpoolReader(b)
+    count = min(len(first), len(second))
+    return sum(not np.array_equal(first.frames[i], second.frames[i]) for i in range(count)) + abs(len(first) - len(second))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="1080p")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2])
+    parser.add_argument("--case", nargs=5, metavar=("VIDEO", "DATA", "OUTPUT", "WORKERS", "POOLED"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        video_path, data_path, output_path, workers, pooled = args.case
+        print(json.dumps(run_case(video_path, data_path, output_path, args.size, int(workers), pooled == "1")))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    video_path, data_path = make_recording(workdir, SIZES[args.size], args.frames, args.frames * 4)
+    print(f"{args.size}, {args.frames} frames")
+    print(f"{'workers':>7} {'pool':>5} {'fps':>7} {'peak RSS MB':>12} {'faults/frame':>13} {'pool buffers':>13} {'identical':>10}")
+    failed = False
+    for workers in args.workers:
+        outputs = {}
+        for pooled in (False, True):
+            output_path = outputs[pooled] = scratch_path(workdir, f"out-{workers}-{int(pooled)}{config.SPOOL_EXTENSION}")
+            result = subprocess.run([sys.executable, "-m", "benchmarks.bench_buffer_pool", "--size", args.size, "--case",
+                                     video_path, data_path, output_path, str(workers), str(int(pooled))],
+                                    capture_output=True, text=True, check=True)
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            buffers = sum(pool["buffers"] for pool in stats["pools"].values())
+            identical = ""
+            if pooled:
+                differing = compare(outputs[False], output_path)
+                failed |= bool(differing)
+                identical = "yes" if not differing else f"NO ({differing})"
+            print(f"{workers:>7} {'on' if pooled else 'off':>5} {args.frames / stats['seconds']:>7.1f} "
+                  f"{stats['peak_rss_mb']:>12.0f} {stats['faults'] / args.frames:>13.0f} {buffers or '-':>13} {identical:>10}")
+        for output_path in outputs.values():
+            os.remove(output_path)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
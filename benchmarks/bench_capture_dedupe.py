@@ -0,0 +1,83 @@
+"""CPU and file size of capturing an idle screen, with and without duplicate-frame suppression.
+
+    python -m benchmarks.bench_capture_dedupe --seconds 5 --change-every 50
+
+The stubbed screen only changes every `--change-every` grabs. For the
+deduplicated spool capture the script also expands the repeat entries back
+into frames and checks every one against the grab it stands for, exiting
+non-zero on a mismatch.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import StubScreen, scratch_path
+from screenkit import config
+from screenkit.capture import CaptureSession
+from screenkit.events import EventStore, expand_frames
+from screenkit.spool import SpoolReader
+
+
+def capture(path: str, monitor, fps: int, seconds: float, change_every: int, dedupe: bool) -> CaptureSession:
+    session = CaptureSession(monitor, fps, path, grabber_factory=lambda: StubScreen(change_every=change_every),
+                             dedupe=dedupe)
+    session.start()
+    time.sleep(seconds)
+    session.stop()
+    return session
+
+
+def check_expansion(path: str, session: CaptureSession, change_every: int) -> int:
+    """Number of expanded frames that differ from the grab they replace."""
+    store = EventStore()
+    store.frame_times, store.repeat_times = session.frame_times, session.repeat_times
+    _, sources = store.frame_schedule()
+    reader = SpoolReader(path)
+    frames = (reader.frames[i] for i in range(len(reader)))
+    mismatched = expanded = 0
+    for tick, frame in enumerate(expand_frames(frames, sources)):
+        state = tick // change_every
+        expected = np.zeros(3, dtype=np.uint8)
+        expected[state % 3] = state % 256
+        mismatched += not np.array_equal(frame[0, 0], expected)
+        expanded += 1
+    return mismatched + abs(expanded - len(sources))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, nargs=2, default=[1920, 1080])
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--change-every", type=int, default=50, help="Grabs between screen changes")
+    args = parser.parse_args()
+
+    width, height = args.size
+    monitor = {"top": 0, "left": 0, "width": width, "height": height}
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+
+    print(f"{width}x{height} at {args.fps} fps for {args.seconds:g}s, screen changes every {args.change_every} grabs")
+    print(f"{'format':<8} {'dedupe':<7} {'ticks':>6} {'encoded':>8} {'repeats':>8} {'CPU s':>7} {'CPU %':>6} {'file MB':>8}")
+    failed = False
+    for extension in (".mp4", config.SPOOL_EXTENSION):
+        for dedupe in (False, True):
+            path = scratch_path(workdir, f"capture-{int(dedupe)}{extension}")
+            cpu_started = time.process_time()
+            session = capture(path, monitor, args.fps, args.seconds, args.change_every, dedupe)
+            cpu = time.process_time() - cpu_started
+            print(f"{extension.lstrip('.'):<8} {'on' if dedupe else 'off':<7} {session.pacer.frames:>6} "
+                  f"{session.encoded:>8} {len(session.repeat_times):>8} {cpu:>7.2f} {cpu / args.seconds * 100:>5.0f}% "
+                  f"{os.path.getsize(path) / 1024 ** 2:>8.1f}")
+            if dedupe and extension == config.SPOOL_EXTENSION and not session.dropped:
+                mismatched = check_expansion(path, session, args.change_every)
+                print(f"expanded repeats match the original grabs: {'yes' if not mismatched else f'NO ({mismatched})'}")
+                failed |= bool(mismatched)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
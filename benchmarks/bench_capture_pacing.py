@@ -0,0 +1,58 @@
+"""Check recorder pacing with a stubbed mss source, optionally under CPU load.
+
+    python -m benchmarks.bench_capture_pacing --fps 60 --seconds 5 --load 4
+
+Exits non-zero when the drift report exceeds the given limits.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import StubScreen, scratch_path
+from screenkit.capture import CaptureSession
+
+
+def burn(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(10_000))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, nargs=2, default=[1280, 720])
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--grab-cost", type=float, default=0.002, help="Simulated grab time in seconds")
+    parser.add_argument("--load", type=int, default=0, help="Busy threads competing with the recorder")
+    parser.add_argument("--max-mean-jitter-ms", type=float, default=5.0)
+    parser.add_argument("--max-late-ratio", type=float, default=0.05)
+    args = parser.parse_args()
+
+    width, height = args.size
+    monitor = {"top": 0, "left": 0, "width": width, "height": height}
+    video_path = scratch_path(tempfile.mkdtemp(prefix="screenkit-bench-"), "capture.mp4")
+
+    stop = threading.Event()
+    burners = [threading.Thread(target=burn, args=(stop,), daemon=True) for _ in range(args.load)]
+    for thread in burners:
+        thread.start()
+
+    session = CaptureSession(monitor, args.fps, video_path, grabber_factory=lambda: StubScreen(args.grab_cost))
+    session.start()
+    time.sleep(args.seconds)
+    session.stop()
+    stop.set()
+
+    report = dict(session.pacer.report(), dropped=session.dropped, queue_high_water=session.ring.high_water)
+    print(json.dumps(report, indent=2))
+
+    late_ratio = report["late_frames"] / max(report["frames"], 1)
+    ok = report["mean_jitter_ms"] <= args.max_mean_jitter_ms and late_ratio <= args.max_late_ratio
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Render one recording in N parallel chunks and check it matches the single-process render frame for frame.
+
+    python -m benchmarks.bench_chunked --size 720p --frames 300 --chunks 2 3 4
+
+Three recordings are rendered: a video where every frame changes, a mostly
+idle one (so static-frame reuse crosses chunk boundaries) and a deduplicated
+capture whose sidecar carries repeat entries. Every render writes a spool
+file so the comparison is exact; the script exits non-zero on any frame that
+differs. With ffmpeg on the PATH an .mp4 output is also joined by stream copy
+and its frame count checked.
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Tuple
+
+import cv2
+import numpy as np
+
+from benchmarks.bench_static_frames import make_idle_recording
+from benchmarks.synthetic import SIZES, enhance_params_for, make_recording, scratch_path
+from screenkit import config
+from screenkit.enhance import enhance
+from screenkit.events import EventStore
+from screenkit.spool import SpoolReader
+
+
+def make_deduplicated(directory: str, video_path: str, data_path: str, fps: float) -> Tuple[str, str]:
+    """Sidecar for `video_path` as if every third capture tick had been recorded as a repeat entry."""
+    store = EventStore.load(data_path)
+    cap = cv2.VideoCapture(video_path)
+    encoded = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    ticks = np.arange(encoded + encoded // 2) / fps
+    repeats = np.zeros(len(ticks), dtype=bool)
+    repeats[2::3] = True
+    store.frame_times.extend(ticks[~repeats][:encoded].tolist())
+    store.repeat_times.extend(ticks[repeats].tolist())
+    return video_path, store.save(scratch_path(directory, "dedupe.npz"))
+
+
+def render(video_path: str, output_path: str, data_path: str, params: Dict[str, Any]) -> float:
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        enhance(video_path, output_path, data_path, params)
+        return time.perf_counter() - started
+
+
+def mismatches(reference: SpoolReader, path: str) -> int:
+    """Frames of `path` that differ from `reference`, counting missing or extra frames."""
+    candidate = SpoolReader(path)
+    count = min(len(candidate), len(reference))
+    differing = sum(not np.array_equal(candidate.frames[i], reference.frames[i]) for i in range(count))
+    return differing + abs(len(candidate) - len(reference))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="720p")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[2, 3, 4])
+    args = parser.parse_args()
+
+    size = SIZES[args.size]
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    moving = make_recording(workdir, size, args.frames, args.frames * 4, args.fps)
+    recordings = {
+        "moving": moving,
+        "idle": make_idle_recording(workdir, size, args.frames, args.fps, active=0.15),
+        "dedupe": make_deduplicated(workdir, *moving, args.fps),
+    }
+    params = enhance_params_for(size)
+
+    print(f"{args.size}, {args.frames} source frames, {os.cpu_count()} CPUs")
+    print(f"{'recording':<10} {'chunks':>6} {'frames':>7} {'seconds':>8} {'speedup':>8} {'identical':>10}")
+    failed = False
+    for name, (video_path, data_path) in recordings.items():
+        reference_path = scratch_path(workdir, f"{name}-1{config.SPOOL_EXTENSION}")
+        single = render(video_path, reference_path, data_path, params)
+        reference = SpoolReader(reference_path)
+        print(f"{name:<10} {1:>6} {len(reference):>7} {single:>8.2f} {1:>7.2f}x {'-':>10}")
+        for chunks in args.chunks:
+            output_path = scratch_path(workdir, f"{name}-{chunks}{config.SPOOL_EXTENSION}")
+            seconds = render(video_path, output_path, data_path, {**params, "chunks": chunks})
+            differing = mismatches(reference, output_path)
+            failed |= bool(differing)
+            print(f"{name:<10} {chunks:>6} {len(SpoolReader(output_path)):>7} {seconds:>8.2f} "
+                  f"{single / seconds:>7.2f}x {'yes' if not differing else f'NO ({differing})':>10}")
+
+    if shutil.which("ffmpeg"):
+        video_path, data_path = moving
+        output_path = scratch_path(workdir, "moving-joined.mp4")
+        render(video_path, output_path, data_path, {**params, "chunks": max(args.chunks)})
+        cap = cv2.VideoCapture(output_path)
+        joined = sum(1 for _ in iter(lambda: cap.read()[0], False))
+        cap.release()
+        print(f"mp4 joined by stream copy: {joined} frames, expected {args.frames}")
+        failed |= joined != args.frames
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare Compositor against the PIL path of apply_border_radius_with_shadow.
+
+    python -m benchmarks.bench_compositor
+
+Exits non-zero if any pixel differs by more than --tolerance per channel.
+"""
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from screenkit.enhance import Compositor, apply_border_radius_with_shadow
+
+SIZES = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=["720p", "1080p"])
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--tolerance", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    failed = False
+    print(f"{'size':>6} {'radius':>6} {'blur':>4} {'PIL ms':>8} {'numpy ms':>9} {'max diff':>8}")
+    for name in args.sizes:
+        width, height = SIZES[name]
+        background = cv2.resize(rng.integers(0, 256, (9, 16, 3), dtype=np.uint8), (width, height))
+        fg_width, fg_height = int(width * 0.8), int(height * 0.8)
+        x_offset, y_offset = (width - fg_width) // 2, (height - fg_height) // 2
+        frames = [rng.integers(0, 256, (fg_height, fg_width, 3), dtype=np.uint8) for _ in range(args.frames)]
+
+        for radius, blur in [(0, 0), (20, 0), (20, 10), (48, 30)]:
+            params = dict(x_offset=x_offset, y_offset=y_offset, radius=radius, shadow_blur=blur, shadow_opacity=0.5)
+            expected = apply_border_radius_with_shadow(background.copy(), frames[0], **params)
+
+            started = time.perf_counter()
+            for frame in frames:
+                apply_border_radius_with_shadow(background.copy(), frame, **params)
+            pil_ms = (time.perf_counter() - started) / len(frames) * 1e3
+
+            compositor = Compositor(background, (fg_width, fg_height), **params)
+            started = time.perf_counter()
+            for frame in frames:
+                compositor.compose(frame)
+            numpy_ms = (time.perf_counter() - started) / len(frames) * 1e3
+
+            diff = int(np.abs(compositor.compose(frames[0]).astype(np.int16) - expected).max())
+            failed |= diff > args.tolerance
+            print(f"{name:>6} {radius:>6} {blur:>4} {pil_ms:>8.2f} {numpy_ms:>9.2f} {diff:>8}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Per-frame cost of cursor rendering: the cached CursorSprite against the previous implementation.
+
+    python -m benchmarks.bench_cursor
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from screenkit import config
+from screenkit.enhance import render_cursor
+
+
+def render_cursor_uncached(frame, cursor_image, x_offset, y_offset, scale=1.0):
+    """render_cursor before the sprite cache: resize and binary mask every frame."""
+    frame_height, frame_width = frame.shape[:2]
+    if x_offset < 0 or x_offset > frame_width or y_offset < 0 or y_offset > frame_height:
+        return frame
+    if scale > 0:
+        new_size = (int(cursor_image.shape[1] * scale * config.CURSOR_SCALE),
+                    int(cursor_image.shape[0] * scale * config.CURSOR_SCALE))
+        cursor_image = cv2.resize(cursor_image, new_size)
+    cursor_height, cursor_width = cursor_image.shape[:2]
+    x_end = min(x_offset + cursor_width, frame_width)
+    y_end = min(y_offset + cursor_height, frame_height)
+    cropped_cursor = cursor_image[:y_end - y_offset, :x_end - x_offset, :]
+    mask = cropped_cursor[:, :, 3]
+    cursor_rgb = cropped_cursor[:, :, :3]
+    roi = frame[y_offset:y_end, x_offset:x_end, :]
+    frame[y_offset:y_end, x_offset:x_end, :] = cv2.add(
+        cv2.bitwise_and(cursor_rgb, cursor_rgb, mask=mask),
+        cv2.bitwise_and(roi, roi, mask=cv2.bitwise_not(mask))
+    )
+    return frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1.0, 2.0, 4.0])
+    args = parser.parse_args()
+
+    cursor_image = cv2.imread(str(Path(config.__file__).parent / config.CURSOR_IMAGE_PATH), cv2.IMREAD_UNCHANGED)
+    frame = np.full((1080, 1920, 3), 128, dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    positions = rng.integers(0, [1900, 1060], size=(args.frames, 2))
+
+    print(f"{'scale':>6} {'previous us/frame':>18} {'sprite us/frame':>16}")
+    for scale in args.scales:
+        timings = []
+        for render in (render_cursor_uncached, render_cursor):
+            started = time.perf_counter()
+            for x, y in positions:
+                render(frame, cursor_image, int(x), int(y), scale)
+            timings.append((time.perf_counter() - started) / args.frames * 1e6)
+        print(f"{scale:>6} {timings[0]:>18.1f} {timings[1]:>16.1f}")
+
+    # Cursors hanging off the left/top edge used to vanish; they are now clipped.
+    edge = np.zeros((100, 100, 3), dtype=np.uint8)
+    render_cursor(edge, cursor_image, -5, -5, 1.0)
+    print(f"cursor drawn at (-5, -5): {bool(edge.any())}")
+
+
+if __name__ == "__main__":
+    main()
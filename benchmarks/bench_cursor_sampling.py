@@ -0,0 +1,79 @@
+"""Replay a synthetic pointer stream through MoveSampler and measure cursor accuracy at frame times.
+
+    python -m benchmarks.bench_cursor_sampling --fps 10 --rates 0 240 60
+
+No display is needed: the stream stands in for `mouse.Listener` `on_move`
+callbacks. "per-frame" is the old behaviour, reading the pointer once per
+captured frame after the grab (`--grab-ms` later than the frame timestamp).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from screenkit import config
+from screenkit.events import CursorTimeline, EventStore, MoveSampler
+
+SCREEN = (1920, 1080)
+
+
+def pointer_path(t: np.ndarray) -> np.ndarray:
+    """Relative cursor position over time: sweeping gestures separated by rests."""
+    phase = np.clip(np.sin(t * 0.9) * 1.6, -1, 1)  # flat stretches where the pointer rests
+    x = 0.5 + 0.35 * phase
+    y = 0.5 + 0.3 * np.sin(t * 2.3) * np.abs(phase)
+    return np.stack([x, y], axis=1)
+
+
+def error_px(positions: np.ndarray, truth: np.ndarray) -> np.ndarray:
+    return np.hypot((positions[:, 0] - truth[:, 0]) * SCREEN[0], (positions[:, 1] - truth[:, 1]) * SCREEN[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--fps", type=float, default=10.0, help="Capture frame rate")
+    parser.add_argument("--pointer-hz", type=float, default=1000.0, help="Rate the OS reports pointer moves at")
+    parser.add_argument("--rates", type=float, nargs="+", default=[0, 240, 60], help="MoveSampler rate limits (0 = none)")
+    parser.add_argument("--grab-ms", type=float, default=12.0)
+    args = parser.parse_args()
+
+    # Pointer reports are not aligned with the capture clock
+    event_times = np.arange(0, args.seconds, 1 / args.pointer_hz)
+    event_times += np.random.default_rng(0).uniform(0, 1 / args.pointer_hz, len(event_times))
+    event_times[0] = 0.0  # the recorder seeds the resting position at the start
+    events = pointer_path(event_times)
+    moving = np.r_[True, np.any(np.diff(events, axis=0) != 0, axis=1)]  # the OS only reports actual moves
+    event_times, events = event_times[moving], events[moving]
+    frame_times = np.arange(0, args.seconds, 1 / args.fps)
+    truth = pointer_path(frame_times)
+
+    print(f"{len(event_times)} pointer moves over {args.seconds:g}s, {len(frame_times)} frames at {args.fps:g} fps")
+    print(f"{'source':<16} {'samples':>8} {'us/move':>8} {'lookup':>7} {'mean px':>8} {'p99 px':>8} {'max px':>8}")
+
+    lagged = frame_times + args.grab_ms / 1e3
+    legacy = CursorTimeline(frame_times, *pointer_path(lagged).T)
+    errors = error_px(legacy.positions_at(frame_times), truth)
+    print(f"{'per-frame':<16} {len(legacy):>8} {'-':>8} {'step':>7} {errors.mean():>8.2f} "
+          f"{np.percentile(errors, 99):>8.2f} {errors.max():>8.2f}")
+
+    for rate in args.rates:
+        store = EventStore()
+        sampler = MoveSampler(store, min_interval=1 / rate if rate > 0 else 0.0)
+        started = time.perf_counter()
+        for t, (x, y) in zip(event_times.tolist(), events.tolist()):
+            sampler.add(x, y, t)
+        sampler.flush()
+        cost_us = (time.perf_counter() - started) / len(event_times) * 1e6
+
+        timeline = CursorTimeline.from_store(store)
+        for lookup, positions in (("step", timeline.positions_at(frame_times)),
+                                  ("interp", timeline.interpolate_at(frame_times, config.CURSOR_MAX_GAP))):
+            errors = error_px(positions, truth)
+            name = f"on_move {int(rate)} Hz" if rate else "on_move all"
+            print(f"{name:<16} {len(timeline):>8} {cost_us:>8.2f} {lookup:>7} {errors.mean():>8.2f} "
+                  f"{np.percentile(errors, 99):>8.2f} {errors.max():>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
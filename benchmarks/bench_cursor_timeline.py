@@ -0,0 +1,72 @@
+"""Show that enhance() cost no longer grows with the number of mouse events.
+
+    python -m benchmarks.bench_cursor_timeline
+"""
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import enhance_params_for, make_mouse_events, make_video, scratch_path, write_mouse_events
+from screenkit.enhance import enhance
+from screenkit.events import CursorTimeline
+
+
+def reverse_scan(moves, t):
+    """The lookup enhance() used before CursorTimeline."""
+    return next((event for event in reversed(moves) if event["time"] <= t), None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    size = (640, 360)
+    duration = args.frames / args.fps
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    video_path = make_video(scratch_path(workdir, "input.mp4"), size, args.frames, args.fps)
+    frame_times = np.arange(args.frames) / args.fps
+
+    print(f"{'events':>10} {'scan us/frame':>15} {'timeline us/frame':>18} {'enhance ms/frame':>17} {'sidecar load ms':>15}")
+    for count in args.counts:
+        mouse_events = make_mouse_events(count, duration)
+        moves = mouse_events["move"]
+
+        # The old scan walks back from the newest event, so early frames pay for the whole list.
+        sample = frame_times[:5]
+        started = time.perf_counter()
+        for t in sample:
+            reverse_scan(moves, t)
+        scan_us = (time.perf_counter() - started) / len(sample) * 1e6
+
+        timeline = CursorTimeline.from_events(mouse_events)
+        started = time.perf_counter()
+        positions = timeline.positions_at(frame_times)
+        for i in range(len(frame_times)):
+            positions[i]
+        timeline_us = (time.perf_counter() - started) / len(frame_times) * 1e6
+
+        data_path = write_mouse_events(scratch_path(workdir, f"events-{count}.json"), mouse_events)
+        # Parsing the sidecar is a one-off cost proportional to its size; report it separately.
+        started = time.perf_counter()
+        with open(data_path) as f:
+            json.load(f)
+        load_s = time.perf_counter() - started
+
+        with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            enhance(video_path, scratch_path(workdir, "output.mp4"), data_path, enhance_params_for(size))
+            enhance_ms = (time.perf_counter() - started - load_s) / args.frames * 1e3
+
+        print(f"{count:>10} {scan_us:>15.1f} {timeline_us:>18.2f} {enhance_ms:>17.2f} {load_s * 1e3:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compare the JSON mouse event sidecar with the columnar EventStore for a long session.
+
+    python -m benchmarks.bench_event_store --hours 2 --fps 30
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import scratch_path
+from screenkit.events import CursorTimeline, EventStore
+
+
+def record_dicts(times: np.ndarray, xs: np.ndarray, ys: np.ndarray, clicks: int) -> Dict[str, Any]:
+    """What ScreenRecorder accumulated before EventStore: one dict per event."""
+    mouse_events = {"click": [], "move": []}
+    for t, x, y in zip(times.tolist(), xs.tolist(), ys.tolist()):
+        mouse_events["move"].append({"x": x, "y": y, "time": t})
+    for t, x, y in zip(times[:clicks].tolist(), xs[:clicks].tolist(), ys[:clicks].tolist()):
+        mouse_events["click"].append({"x": x, "y": y, "button": "Button.left", "pressed": True, "time": t})
+    mouse_events["frame_times"] = [round(t, 4) for t in times.tolist()]
+    return mouse_events
+
+
+def record_store(times: np.ndarray, xs: np.ndarray, ys: np.ndarray, clicks: int) -> EventStore:
+    store = EventStore()
+    for t, x, y in zip(times.tolist(), xs.tolist(), ys.tolist()):
+        store.add_move(t, x, y)
+    for t, x, y in zip(times[:clicks].tolist(), xs[:clicks].tolist(), ys[:clicks].tolist()):
+        store.add_click(t, x, y, "Button.left", True)
+    store.frame_times.extend(times.tolist())
+    return store
+
+
+def traced(build: Callable[[], Any]) -> Tuple[Any, float]:
+    """Result of `build()` and the MB it still holds once it returns."""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 1024 ** 2
+
+
+def timed(load: Callable[[], Any], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        load()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hours", type=float, default=2.0)
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--clicks-per-minute", type=float, default=20.0)
+    args = parser.parse_args()
+
+    frames = int(args.hours * 3600 * args.fps)
+    clicks = int(args.hours * 60 * args.clicks_per_minute)
+    rng = np.random.default_rng(0)
+    times = np.arange(frames) / args.fps
+    xs, ys = rng.random(frames), rng.random(frames)
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+
+    mouse_events, dict_mb = traced(lambda: record_dicts(times, xs, ys, clicks))
+    json_path = scratch_path(workdir, "events.json")
+    with open(json_path, "w") as f:
+        json.dump(mouse_events, f)
+    del mouse_events
+
+    def load_json() -> CursorTimeline:
+        with open(json_path) as f:
+            return CursorTimeline.from_store(EventStore.from_dict(json.load(f)))
+
+    store, store_mb = traced(lambda: record_store(times, xs, ys, clicks))
+    npz_path = store.save(scratch_path(workdir, "events.npz"))
+    del store
+
+    rows = {
+        "json (dict per event)": (dict_mb, os.path.getsize(json_path), timed(load_json)),
+        "EventStore (.npz)": (store_mb, os.path.getsize(npz_path),
+                              timed(lambda: CursorTimeline.from_store(EventStore.load(npz_path)))),
+    }
+    print(f"{frames} moves, {clicks} clicks, {frames} frame times ({args.hours:g} h at {args.fps:g} fps)")
+    print(f"{'format':<24} {'recorder MB':>12} {'sidecar MB':>11} {'load ms':>9}")
+    for name, (memory_mb, size, load_s) in rows.items():
+        print(f"{name:<24} {memory_mb:>12.1f} {size / 1024 ** 2:>11.1f} {load_s * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
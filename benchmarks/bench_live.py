@@ -0,0 +1,109 @@
+"""Time from stopping a recording to a finished video, live render against capture-then-enhance.
+
+    python -m benchmarks.bench_live --size 1080p --fps 60 --seconds 5
+
+The stubbed screen hands out frames as fast as the capture loop asks, so
+`--fps` can be set above what the renderer sustains to exercise the
+back-off. A thread feeds cursor moves into the event store while capture
+runs. The live case renders every captured frame into the output as it
+arrives; the offline case captures a raw spool and runs `enhance()` after
+stop. Outputs are spool files so frames can be counted exactly, and the
+script exits non-zero if the live video does not hold one frame per encoded
+capture.
+"""
+import argparse
+import contextlib
+import io
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import SIZES, StubScreen, enhance_params_for, scratch_path
+from screenkit import config
+from screenkit.capture import CaptureSession
+from screenkit.enhance import enhance
+from screenkit.events import EventStore
+from screenkit.live import LiveRenderSink
+from screenkit.spool import SpoolReader
+
+
+def move_cursor(store: EventStore, session: CaptureSession, stop: threading.Event, rate: float = 120.0) -> None:
+    """Circle the cursor around the screen, stamping moves with session time like the recorder does."""
+    while not stop.is_set():
+        t = time.perf_counter() - session.start_time
+        store.add_move(t, 0.5 + 0.3 * math.cos(t), 0.5 + 0.3 * math.sin(t))
+        time.sleep(1 / rate)
+
+
+def record(path: str, monitor, fps: int, seconds: float, store: EventStore, sink=None) -> CaptureSession:
+    session = CaptureSession(monitor, fps, path, grabber_factory=StubScreen, sink=sink)
+    stop = threading.Event()
+    mover = threading.Thread(target=move_cursor, args=(store, session, stop), daemon=True)
+    session.start()
+    mover.start()
+    time.sleep(seconds)
+    stop.set()
+    mover.join()
+    return session
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="1080p")
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    width, height = SIZES[args.size]
+    monitor = {"top": 0, "left": 0, "width": width, "height": height}
+    params = enhance_params_for(SIZES[args.size])
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    print(f"{args.size} at {args.fps} fps for {args.seconds:g}s")
+    failed = False
+
+    store = EventStore()
+    live_path = scratch_path(workdir, f"live{config.SPOOL_EXTENSION}")
+    sinks = []
+
+    def live_sink(size):
+        sinks.append(LiveRenderSink(live_path, args.fps, size, params, store))
+        return sinks[0]
+
+    session = record(live_path, monitor, args.fps, args.seconds, store, live_sink)
+    stopped = time.perf_counter()
+    session.stop()
+    live_ready = time.perf_counter() - stopped
+    sink = sinks[0]
+    frames = len(SpoolReader(live_path))
+    stats = sink.stats()
+    print(f"live:    ready {live_ready:>6.2f}s after stop | captured {session.captured}, encoded {session.encoded}, "
+          f"dropped {session.dropped} | rendered {stats['rendered']}, reused {stats['reused (static)']}, "
+          f"held {stats['held (back-off)']} | render {stats['render ms']} ms, stride changes {sink.backoff.changes}")
+    if frames != session.encoded:
+        print(f"live video has {frames} frames for {session.encoded} encoded captures")
+        failed = True
+    os.remove(live_path)
+
+    store = EventStore()
+    raw_path = scratch_path(workdir, f"raw{config.SPOOL_EXTENSION}")
+    output_path = scratch_path(workdir, f"offline{config.SPOOL_EXTENSION}")
+    session = record(raw_path, monitor, args.fps, args.seconds, store)
+    stopped = time.perf_counter()
+    session.stop()
+    store.frame_times = session.frame_times
+    data_path = store.save(scratch_path(workdir, "raw.npz"))
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        enhance(raw_path, output_path, data_path, params)
+    offline_ready = time.perf_counter() - stopped
+    print(f"offline: ready {offline_ready:>6.2f}s after stop | captured {session.captured}, encoded {session.encoded}, "
+          f"dropped {session.dropped} | enhanced {len(SpoolReader(output_path))} frames")
+    for path in (raw_path, output_path, data_path):
+        os.remove(path)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
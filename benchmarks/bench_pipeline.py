@@ -0,0 +1,59 @@
+"""Compare serial enhance() with the threaded pipeline at several worker counts.
+
+    python -m benchmarks.bench_pipeline --size 1920 1080 --workers 0 2 4 8
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import enhance_params_for, make_video, scratch_path
+from screenkit.enhance import enhance
+
+
+def read_all(path: str) -> np.ndarray:
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return np.stack(frames)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, nargs=2, default=[1280, 720])
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--queue-depth", type=int, default=8)
+    args = parser.parse_args()
+
+    size = tuple(args.size)
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    video_path = make_video(scratch_path(workdir, "input.mp4"), size, args.frames)
+
+    reference = None
+    print(f"{'workers':>8} {'fps':>8} {'same output':>12}")
+    for workers in args.workers:
+        params = dict(enhance_params_for(size), workers=workers, queue_depth=args.queue_depth)
+        output_path = scratch_path(workdir, f"output-{workers}.mp4")
+        with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            enhance(video_path, output_path, None, params)
+            elapsed = time.perf_counter() - started
+
+        frames = read_all(output_path)
+        reference = frames if reference is None else reference
+        print(f"{workers:>8} {args.frames / elapsed:>8.1f} {str(np.array_equal(frames, reference)):>12}")
+
+
+if __name__ == "__main__":
+    main()
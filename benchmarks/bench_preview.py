@@ -0,0 +1,99 @@
+"""Latency of draft previews against a full-resolution render, and how closely they match it.
+
+    python -m benchmarks.bench_preview --sizes 1080p 4k
+    python -m benchmarks.bench_preview --scale 0.5 --budget 0.5
+
+For every size a synthetic recording is previewed the way a tuning loop would
+use it: one frame at a timestamp, then the same frame again with a different
+border radius and shadow (so the plate is rebuilt), and a 9-frame contact
+sheet. Each case runs `--repeat` times: the first run may still have to decode
+the wallpaper, later ones find the scaled background and plate in the plate
+cache, as a tuning loop would. The full-resolution time is `enhance()` over
+the whole recording. Each
+single-frame preview is also compared with the same frame rendered at full
+size and scaled down (PSNR in dB), which shows the scaled layout lines up.
+The script exits non-zero when the best run of a single-frame preview takes
+longer than `--budget` seconds or its PSNR drops below `--min-psnr`.
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import SIZES, enhance_params_for, make_recording, scratch_path
+from screenkit.enhance import FrameRenderer, enhance, open_source
+from screenkit.events import load_events
+from screenkit.preview import render_preview, select_frames
+
+
+def full_size_frame(video_path: str, data_path: str, params, seconds: float) -> np.ndarray:
+    """Frame at `seconds` rendered at full resolution, the way `enhance` would."""
+    cap, source_size, fps, total_frames = open_source(video_path)
+    renderer = FrameRenderer(params, source_size, fps, total_frames, load_events(data_path), plate_cache=None)
+    index = select_frames(renderer, timestamps=[seconds])[0]
+    cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+    _, frame = cap.read()
+    cap.release()
+    return renderer.render(frame, index).copy()
+
+
+def psnr(a: np.ndarray, b: np.ndarray) -> float:
+    mse = np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2)
+    return float("inf") if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=["1080p", "4k"])
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--scale", type=float, default=0.25)
+    parser.add_argument("--budget", type=float, default=0.5, help="Seconds a single-frame preview may take")
+    parser.add_argument("--min-psnr", type=float, default=25.0)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    print(f"{args.frames} frames, previews at {args.scale:g}x")
+    print(f"{'size':<6} {'case':<22} {'first s':>8} {'best s':>8} {'PSNR dB':>8}")
+    failed = False
+    for size in args.sizes:
+        video_path, data_path = make_recording(workdir, SIZES[size], args.frames, args.frames * 4)
+        params = enhance_params_for(SIZES[size])
+        seconds = args.frames / 25 / 2
+        cases = [("1 frame", params, {"timestamps": [seconds]}),
+                 ("1 frame, new layout", dict(params, border_radius=40, shadow_blur=30), {"timestamps": [seconds]}),
+                 ("9-frame contact sheet", params, {"count": 9})]
+        for label, case_params, selection in cases:
+            output_path = scratch_path(workdir, f"preview-{size}.png")
+            timings = []
+            for _ in range(max(args.repeat, 1)):
+                started = time.perf_counter()
+                render_preview(video_path, output_path, data_path, case_params, scale=args.scale, quiet=True,
+                               **selection)
+                timings.append(time.perf_counter() - started)
+            elapsed = min(timings)
+            quality = ""
+            if "timestamps" in selection:
+                preview = cv2.imread(output_path)
+                reference = cv2.resize(full_size_frame(video_path, data_path, case_params, seconds),
+                                       (preview.shape[1], preview.shape[0]), interpolation=cv2.INTER_AREA)
+                score = psnr(preview, reference)
+                quality = f"{score:.1f}"
+                failed |= elapsed > args.budget or score < args.min_psnr
+            print(f"{size:<6} {label:<22} {timings[0]:>8.3f} {elapsed:>8.3f} {quality:>8}")
+
+        started = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+            enhance(video_path, scratch_path(workdir, f"full-{size}.mp4"), data_path, dict(params, writer="opencv"))
+        full_seconds = time.perf_counter() - started
+        print(f"{size:<6} {'full enhance()':<22} {full_seconds:>8.3f} {full_seconds:>8.3f}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
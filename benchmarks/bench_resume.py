@@ -0,0 +1,145 @@
+"""Kill a checkpointed `screenkit enhance` mid-render, resume it, and check the result frame for frame.
+
+    python -m benchmarks.bench_resume --size 720p --frames 400 --checkpoint 2
+
+For each output format (a spool file and an mp4 written by OpenCV, whose
+chunks are HuffYUV until joined), the CLI is started in a subprocess and
+SIGKILLed once `--kill-after` chunks are in its manifest. A second run with
+`--resume` must skip those chunks and finish; its output is then compared
+with an uninterrupted, unchunked render of the same input, run in-process
+(its time is `ref s`; `resume s` includes interpreter start-up). A
+deduplicated recording that sits on its first frame past the first chunk
+boundary is also rendered with checkpoints, uninterrupted, since its later
+chunks start on source frame 0 again. The script exits non-zero if the
+resumed run did not resume, failed, or any render differs in any frame.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import SIZES, enhance_params_for, make_mouse_events, make_recording, make_video, scratch_path
+from screenkit import config
+from screenkit.checkpoint import parts_dir
+from screenkit.enhance import enhance
+from screenkit.events import EventStore
+from screenkit.spool import open_video
+
+RUNNER = ("import sys; sys.modules.update(pynput=None, mss=None); "
+          "from screenkit.screenkit import cli; cli(sys.argv[1:], prog_name='screenkit')")
+
+
+def committed(output_path: str) -> int:
+    try:
+        with open(os.path.join(parts_dir(output_path), "manifest.json")) as f:
+            return len(json.load(f)["chunks"])
+    except (OSError, ValueError):
+        return 0
+
+
+def make_idle_start(directory: str, size: Tuple[int, int], frames: int, fps: float) -> Tuple[str, str]:
+    """Deduplicated recording of 3 distinct frames shown over `frames` ticks; the first holds for over half."""
+    video_path = make_video(scratch_path(directory, "idle-start.mp4"), size, 3, fps)
+    store = EventStore.from_dict(make_mouse_events(frames, frames / fps))
+    ticks = np.arange(frames) / fps
+    encoded = np.zeros(frames, dtype=bool)
+    encoded[[0, frames * 9 // 16, frames * 13 // 16]] = True
+    store.frame_times.extend(ticks[encoded].tolist())
+    store.repeat_times.extend(ticks[~encoded].tolist())
+    return video_path, store.save(scratch_path(directory, "idle-start.npz"))
+
+
+def differing_frames(a: str, b: str) -> Tuple[int, int, int]:
+    """Frames that differ, and the frame counts of both videos."""
+    first, second = open_video(a), open_video(b)
+    differing = count_a = count_b = 0
+    while True:
+        ok_a, frame_a = first.read()
+        ok_b, frame_b = second.read()
+        count_a, count_b = count_a + ok_a, count_b + ok_b
+        if not ok_a or not ok_b:
+            break
+        differing += not np.array_equal(frame_a, frame_b)
+    first.release()
+    second.release()
+    return differing, count_a, count_b
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="720p")
+    parser.add_argument("--frames", type=int, default=400)
+    parser.add_argument("--checkpoint", type=float, default=2.0, help="Seconds of output per chunk")
+    parser.add_argument("--kill-after", type=int, default=2, help="Chunks to let the first run commit")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    video_path, data_path = make_recording(workdir, SIZES[args.size], args.frames, args.frames * 4)
+    params = enhance_params_for(SIZES[args.size])
+    env = dict(os.environ, HOME=workdir, PYTHONPATH=os.getcwd())
+    print(f"{args.size}, {args.frames} frames, {args.checkpoint:g}s chunks, killed after {args.kill_after} chunks")
+    print(f"{'output':<8} {'killed at':>10} {'resumed':>8} {'resume s':>9} {'ref s':>7} {'frames':>7} {'identical':>10}")
+    failed = False
+
+    for extension, writer in ((config.SPOOL_EXTENSION, "spool"), (".mp4", "opencv")):
+        reference_path = scratch_path(workdir, f"reference{extension}")
+        started = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+            enhance(video_path, reference_path, data_path, {**params, "writer": writer})
+        full_seconds = time.perf_counter() - started
+
+        output_path = scratch_path(workdir, f"resumed{extension}")
+        command: List[str] = [sys.executable, "-c", RUNNER, "enhance", video_path, "-d", data_path, "-o", output_path,
+                              "--writer", writer, "--padding", str(params["padding"]),
+                              "--background", params["background"], "--checkpoint-every", str(args.checkpoint)]
+        first = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        while first.poll() is None and committed(output_path) < args.kill_after:
+            time.sleep(0.01)
+        first.send_signal(signal.SIGKILL)
+        first.wait()
+        killed_at = committed(output_path)
+        if os.path.exists(output_path):
+            print(f"{extension}: the killed run already wrote its output; raise --frames or lower --kill-after")
+            failed = True
+            continue
+
+        started = time.perf_counter()
+        second = subprocess.run(command + ["--resume"], env=env, capture_output=True, text=True)
+        resume_seconds = time.perf_counter() - started
+        resumed = "Resuming" in second.stdout
+        if second.returncode or not os.path.isfile(output_path):
+            print(f"{extension}: resumed run failed\n{(second.stdout + second.stderr)[-1000:]}")
+            failed = True
+            continue
+        differing, frames, expected = differing_frames(output_path, reference_path)
+        identical = "yes" if not differing and frames == expected else f"NO ({differing}, {frames}/{expected})"
+        print(f"{extension.lstrip('.'):<8} {killed_at:>10} {'yes' if resumed else 'NO':>8} {resume_seconds:>9.2f} "
+              f"{full_seconds:>7.2f} {frames:>7} {identical:>10}")
+        failed |= not resumed or bool(differing) or frames != expected or os.path.isdir(parts_dir(output_path))
+        for path in (output_path, reference_path):
+            os.remove(path)
+
+    video_path, data_path = make_idle_start(workdir, SIZES[args.size], 80, 10.0)
+    reference_path = scratch_path(workdir, f"idle-reference{config.SPOOL_EXTENSION}")
+    output_path = scratch_path(workdir, f"idle-checkpointed{config.SPOOL_EXTENSION}")
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        enhance(video_path, reference_path, data_path, params)
+        enhance(video_path, output_path, data_path, {**params, "checkpoint_seconds": 2.0})
+    differing, frames, expected = differing_frames(output_path, reference_path)
+    print(f"idle-start dedupe, 2s chunks, uninterrupted: {frames}/{expected} frames, "
+          f"identical: {'yes' if not differing and frames == expected else f'NO ({differing})'}")
+    failed |= bool(differing) or frames != expected
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Wait after stop for a rotating segmented recording against enhancing one capture at the end.
+
+    python -m benchmarks.bench_segments --size 720p --fps 30 --seconds 12 --segment 3
+    python -m benchmarks.bench_segments --dedupe 10
+
+The stubbed screen is captured to raw spool segments while a thread moves the
+cursor, and `SegmentEnhancer` renders each finished segment in the
+background. For reference the raw segments are then concatenated and
+enhanced in one go with the whole sidecar, which is also the wait a
+single-file recording would have. The script exits non-zero if the joined
+video does not match that reference frame for frame.
+"""
+import argparse
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.bench_live import move_cursor
+from benchmarks.synthetic import SIZES, StubScreen, enhance_params_for, scratch_path
+from screenkit import config
+from screenkit.capture import CaptureSession
+from screenkit.enhance import enhance
+from screenkit.events import EventStore
+from screenkit.segments import SegmentEnhancer
+from screenkit.spool import SpoolReader, concat_spools
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="720p")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=12.0)
+    parser.add_argument("--segment", type=float, default=3.0, help="Segment length in seconds")
+    parser.add_argument("--dedupe", type=int, default=0, metavar="N",
+                        help="Capture with dedupe, the screen changing every N grabs")
+    args = parser.parse_args()
+
+    width, height = SIZES[args.size]
+    monitor = {"top": 0, "left": 0, "width": width, "height": height}
+    params = enhance_params_for(SIZES[args.size])
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    raw_path = scratch_path(workdir, f"raw{config.SPOOL_EXTENSION}")
+    output_path = scratch_path(workdir, f"segmented{config.SPOOL_EXTENSION}")
+    print(f"{args.size} at {args.fps} fps for {args.seconds:g}s in {args.segment:g}s segments"
+          f"{f', screen changes every {args.dedupe} grabs' if args.dedupe else ''}")
+
+    store = EventStore()
+    enhancer = SegmentEnhancer(output_path, store, params)
+    session = CaptureSession(monitor, args.fps, raw_path, grabber_factory=lambda: StubScreen(change_every=args.dedupe or 1),
+                             dedupe=bool(args.dedupe), segment_seconds=args.segment, on_segment=enhancer.submit)
+    store.frame_times, store.repeat_times = session.frame_times, session.repeat_times
+    stop = threading.Event()
+    mover = threading.Thread(target=move_cursor, args=(store, session, stop), daemon=True)
+    session.start()
+    mover.start()
+    time.sleep(args.seconds)
+    stopped = time.perf_counter()
+    session.stop()
+    stop.set()
+    pending = enhancer.pending()
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        enhancer.finish()
+    segmented_wait = time.perf_counter() - stopped
+    mover.join()
+
+    reference_raw = scratch_path(workdir, f"whole{config.SPOOL_EXTENSION}")
+    reference_path = scratch_path(workdir, f"reference{config.SPOOL_EXTENSION}")
+    concat_spools(session.segments, reference_raw)
+    data_path = store.save(scratch_path(workdir, "whole.npz"))
+    started = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        enhance(reference_raw, reference_path, data_path, params)
+    whole_wait = time.perf_counter() - started
+
+    joined, reference = SpoolReader(output_path), SpoolReader(reference_path)
+    count = min(len(joined), len(reference))
+    differing = [i for i in range(count) if not np.array_equal(joined.frames[i], reference.frames[i])]
+    expected = session.encoded + len(session.repeat_times)
+    print(f"captured {session.captured}, encoded {session.encoded}, repeats {len(session.repeat_times)}, "
+          f"dropped {session.dropped}, {len(session.segments)} segments ({pending} still rendering at stop)")
+    print(f"{'wait after stop, segmented':<32} {segmented_wait:>7.2f}s")
+    print(f"{'wait after stop, one file':<32} {whole_wait:>7.2f}s (enhance only, capture stop not included)")
+    print(f"joined frames {len(joined)} / expected {expected}, "
+          f"identical to the whole render: {'yes' if not differing else f'NO ({len(differing)}, first {differing[:5]})'}")
+    failed = bool(differing) or len(joined) != expected or len(reference) != expected
+    joined.release()
+    reference.release()
+    shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Startup cost of the light CLI commands, and which heavy modules they import.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 7 --budget-scale 2
+
+Each command runs in a fresh interpreter under `-X importtime` with `pynput`
+and `mss` made unimportable, as on a headless box without input backends.
+The script reports the median wall time and the time spent importing, and
+exits non-zero when a command imports a module it should not need, fails, or
+its median import time exceeds its budget (scaled by `--budget-scale` on
+slower machines). `trim` runs against a small synthetic video through a
+throwaway HOME, so the real cache is left alone.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set, Tuple
+
+from benchmarks.synthetic import make_video, scratch_path
+
+# Nothing should import these except `record`, `enhance` and `background show`
+HEAVY = {"pynput", "mss", "PIL", "tqdm", "cv2", "numpy", "screenkit.record", "screenkit.enhance",
+         "screenkit.capture"}
+# command: (arguments, modules it must not import, import budget in ms). trim decodes and encodes
+# video, so it may load OpenCV and NumPy, but not the input listeners or the renderer.
+COMMANDS: Dict[str, Tuple[List[str], Set[str], float]] = {
+    "--help": (["--help"], HEAVY, 150),
+    "background list": (["background", "list"], HEAVY, 150),
+    "cache stats": (["cache", "stats"], HEAVY - {"numpy"}, 250),
+    "trim": (["trim", "-s", "0", "-e", "1", "--writer", "opencv"], HEAVY - {"cv2", "numpy"}, 400),
+}
+
+RUNNER = ("import sys; sys.modules.update(pynput=None, mss=None); "
+          "from screenkit.screenkit import cli; cli(sys.argv[1:], prog_name='screenkit')")
+
+
+def run(args: List[str], env: Dict[str, str]) -> Tuple[float, float, Set[str], int, str]:
+    """Wall seconds, import seconds, top-level modules imported, exit code and output of one command."""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", RUNNER, *args], env=env,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    imported, total_us = set(), 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit() and name.startswith(" ") and not name.startswith("  "):
+            total_us += int(cumulative)
+        imported.add(name.strip())
+    errors = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+    return wall, total_us / 1e6, imported, result.returncode, (result.stdout + errors)[-500:]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiply every import budget by this")
+    args = parser.parse_args()
+
+    home = tempfile.mkdtemp(prefix="screenkit-bench-home-")
+    video_path = make_video(scratch_path(home, "recording.mp4"), (320, 180), 50)
+    cache_dir = os.path.join(home, ".screenkit")
+    os.makedirs(cache_dir)
+    env = dict(os.environ, HOME=home, PYTHONPATH=os.getcwd())
+
+    print(f"{'command':<17} {'wall ms':>8} {'import ms':>10} {'budget':>7} {'modules':>8}  heavy imports")
+    failed = False
+    for label, (command, forbidden, budget_ms) in COMMANDS.items():
+        walls, imports, loaded, errors = [], [], set(), []
+        for _ in range(args.runs):
+            # trim replaces the cached video in place, so give every run a fresh copy
+            with open(os.path.join(cache_dir, "video_cache.json"), "w") as f:
+                json.dump({"output_path": make_video(video_path, (320, 180), 50)}, f)
+            wall, imported_s, modules, code, output = run(command, env)
+            walls.append(wall)
+            imports.append(imported_s)
+            loaded |= modules
+            if code or "error occurred" in output:
+                errors.append(output)
+        heavy = sorted(name for name in loaded if name.split(".")[0] in forbidden or name in forbidden)
+        import_ms = statistics.median(imports) * 1e3
+        budget_ms *= args.budget_scale
+        failed |= bool(heavy) or bool(errors) or import_ms > budget_ms
+        print(f"{label:<17} {statistics.median(walls) * 1e3:>8.0f} {import_ms:>10.0f} {budget_ms:>7.0f} {len(loaded):>8}  "
+              f"{', '.join(heavy) or '-'}")
+        if errors:
+            print(f"  failed: {errors[0].strip()}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Time enhance() with and without static-frame reuse on a mostly idle screencast, and check the outputs match.
+
+    python -m benchmarks.bench_static_frames --size 1080p --frames 300
+    python -m benchmarks.bench_static_frames --workers 2
+
+Both runs write spool files so the comparison is exact; the script exits
+non-zero if any frame of the reusing run differs from the full render.
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from benchmarks.synthetic import SIZES, enhance_params_for, scratch_path
+from screenkit import config
+from screenkit.events import EventStore
+from screenkit.metrics import Metrics
+from screenkit.spool import SpoolReader, SpoolWriter
+
+
+def make_idle_recording(directory: str, size: Tuple[int, int], frames: int, fps: float, active: float) -> Tuple[str, str]:
+    """A page of 'text' that gains a character on a fraction `active` of frames, and a cursor that mostly rests."""
+    width, height = size
+    rng = np.random.default_rng(0)
+    page = np.full((height, width, 3), 245, dtype=np.uint8)
+    page[: height // 12] = (60, 60, 60)
+    video_path = scratch_path(directory, f"idle-{width}x{height}-{frames}{config.SPOOL_EXTENSION}")
+    writer = SpoolWriter(video_path, fps, size)
+    line, column = 0, 0
+    for _ in range(frames):
+        if rng.random() < active:
+            y, x = height // 8 + line * 24, 40 + column * 14
+            page[y:y + 16, x:x + 10] = rng.integers(0, 120, 3)
+            column += 1
+            if x + 28 > width:
+                line, column = (line + 1) % ((height * 7 // 8) // 24), 0
+        writer.write(page)
+    writer.release()
+
+    store = EventStore()
+    for second in range(int(frames / fps) + 1):
+        # A short flick every few seconds, otherwise the pointer is still
+        if second % 4 == 0:
+            for step in range(5):
+                store.add_move(second + step / fps, 0.3 + 0.05 * step, 0.5)
+    store.metadata["screen"] = {"width": width, "height": height}
+    data_path = store.save(scratch_path(directory, f"idle-{frames}.npz"))
+    return video_path, data_path
+
+
+RENDER_STAGES = ("enhance.static_check", "enhance.resize", "enhance.titlebar", "enhance.cursor", "enhance.composite")
+
+
+def timed_enhance(video_path: str, output_path: str, data_path: str, params: Dict[str, Any]) -> Tuple[float, float]:
+    """Wall time of the whole run and the time spent rendering (everything but decode and encode)."""
+    from screenkit.enhance import enhance
+    metrics = Metrics()
+    with contextlib.redirect_stderr(io.StringIO()), contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        enhance(video_path, output_path, data_path, params, metrics=metrics)
+        wall = time.perf_counter() - started
+    stages = metrics.snapshot()["stages"]
+    return wall, sum(stages[name]["total_ms"] for name in RENDER_STAGES if name in stages) / 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="1080p")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--active", type=float, default=0.15, help="Fraction of frames where the screen changes")
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    video_path, data_path = make_idle_recording(workdir, SIZES[args.size], args.frames, args.fps, args.active)
+    params = dict(enhance_params_for(SIZES[args.size]), plate_cache=False, workers=args.workers)
+
+    full_path = scratch_path(workdir, f"full{config.SPOOL_EXTENSION}")
+    reuse_path = scratch_path(workdir, f"reuse{config.SPOOL_EXTENSION}")
+    full_s, full_render_s = timed_enhance(video_path, full_path, data_path, dict(params, static_skip=False))
+    reuse_s, reuse_render_s = timed_enhance(video_path, reuse_path, data_path, params)
+
+    full, reuse = SpoolReader(full_path), SpoolReader(reuse_path)
+    mismatched = [i for i in range(len(full)) if i >= len(reuse) or not np.array_equal(full.frames[i], reuse.frames[i])]
+    mismatched += list(range(len(full), len(reuse)))
+
+    print(f"{args.frames} frames at {args.size}, screen changes on {args.active:.0%} of frames, workers={args.workers}")
+    print(f"{'':<16} {'wall s':>8} {'fps':>8} {'render s':>9} {'render speedup':>15}")
+    print(f"{'full render':<16} {full_s:>8.2f} {args.frames / full_s:>8.1f} {full_render_s:>9.2f} {'':>15}")
+    print(f"{'static reuse':<16} {reuse_s:>8.2f} {args.frames / reuse_s:>8.1f} {reuse_render_s:>9.2f} "
+          f"{full_render_s / reuse_render_s:>14.2f}x")
+    print(f"identical output {'yes' if not mismatched else f'NO, {len(mismatched)} frames differ (first: {mismatched[0]})'}")
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == "__main__":
+    main()
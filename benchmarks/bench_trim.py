@@ -0,0 +1,81 @@
+"""Show that trim_video cost follows the kept duration, not the length of the source.
+
+    python -m benchmarks.bench_trim --lengths 30 120 480 --keep-seconds 5
+
+For each source length the last `--keep-seconds` are kept, once as a single
+range and once split across two ranges with a cut between them. The old
+approach (decode everything from frame zero) is timed alongside. Trims are
+written as spool files and compared frame by frame with a sequential decode;
+the script exits non-zero on any mismatch.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import make_video, scratch_path
+from screenkit import config
+from screenkit.spool import SpoolReader
+from screenkit.trim import keep_frames, trim_video
+
+
+def sequential_decode(video_path: str, indices: np.ndarray) -> Tuple[List[np.ndarray], float]:
+    """The previous trim loop: decode from frame zero up to the last kept frame."""
+    wanted = set(indices.tolist())
+    frames = []
+    cap = cv2.VideoCapture(video_path)
+    started = time.perf_counter()
+    for index in range(int(indices[-1]) + 1):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if index in wanted:
+            frames.append(frame)
+    elapsed = time.perf_counter() - started
+    cap.release()
+    return frames, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, nargs=2, default=[320, 180])
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--lengths", type=float, nargs="+", default=[30, 120, 480], help="Source lengths in seconds")
+    parser.add_argument("--keep-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    print(f"{'source s':>9} {'ranges':>7} {'kept':>6} {'full decode ms':>15} {'seek trim ms':>13} {'identical':>10}")
+    failed = False
+    for length in args.lengths:
+        frames = int(length * args.fps)
+        video_path = make_video(scratch_path(workdir, f"source-{int(length)}.mp4"), tuple(args.size), frames, args.fps)
+        keep_from = length - args.keep_seconds
+        cases = {
+            1: {"keep": [(keep_from, None)]},
+            2: {"keep": [(keep_from, None)], "cut": [(keep_from + args.keep_seconds / 3, keep_from + args.keep_seconds * 2 / 3)]},
+        }
+        for ranges, kwargs in cases.items():
+            indices = keep_frames(frames, args.fps, kwargs["keep"], kwargs.get("cut", []))
+            reference, full_s = sequential_decode(video_path, indices)
+
+            output_path = scratch_path(workdir, f"trim-{int(length)}-{ranges}{config.SPOOL_EXTENSION}")
+            started = time.perf_counter()
+            trim_video(video_path, output_path=output_path, **kwargs)
+            trim_s = time.perf_counter() - started
+
+            trimmed = SpoolReader(output_path)
+            identical = len(trimmed) == len(reference) and all(
+                np.array_equal(trimmed.frames[i], frame) for i, frame in enumerate(reference))
+            failed |= not identical
+            print(f"{length:>9g} {ranges:>7} {len(indices):>6} {full_s * 1e3:>15.1f} {trim_s * 1e3:>13.1f} "
+                  f"{'yes' if identical else 'NO':>10}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
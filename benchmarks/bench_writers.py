@@ -0,0 +1,143 @@
+"""Encode speed, output size and fidelity of each frame writer backend.
+
+    python -m benchmarks.bench_writers --size 1080p --frames 120
+    python -m benchmarks.bench_writers --presets ultrafast veryfast medium --crf 20
+
+The frames look like an enhanced screencast: a wallpaper gradient with a
+window of small, high-contrast 'text' that scrolls a little every frame.
+Every output is read back and compared with the input (PSNR in dB, inf for
+lossless). The ffmpeg rows only appear when ffmpeg is installed; the script
+exits non-zero if a lossless backend does not round-trip exactly.
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import SIZES, scratch_path
+from screenkit import config
+from screenkit.spool import SpoolReader
+from screenkit.writers import ffmpeg_binary, open_writer
+
+LOSSLESS = ("spool", "sequence png", "sequence npy")
+
+
+def make_frames(size: Tuple[int, int], count: int) -> List[np.ndarray]:
+    width, height = size
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(40, 200, width, dtype=np.float32)[None, :, None]
+    wallpaper = np.broadcast_to(gradient, (height, width, 3)).astype(np.uint8)
+    page = np.full((height * 2, width * 4 // 5, 3), 250, dtype=np.uint8)
+    for y in range(20, page.shape[0] - 20, 22):
+        for x in range(20, page.shape[1] - 40, 12):
+            if rng.random() < 0.7:
+                page[y:y + 14, x:x + 8] = rng.integers(0, 100, 3)
+    top, left = height // 10, width // 10
+    frames = []
+    for i in range(count):
+        frame = wallpaper.copy()
+        frame[top:height - top, left:left + page.shape[1]] = page[i * 3:i * 3 + height - 2 * top]
+        frames.append(frame)
+    return frames
+
+
+def read_y4m(path: str, size: Tuple[int, int]) -> Iterator[np.ndarray]:
+    width, height = size
+    with open(path, "rb") as f:
+        f.readline()
+        frame_bytes = width * height * 3 // 2
+        while f.readline() == b"FRAME\n":
+            planes = np.frombuffer(f.read(frame_bytes), dtype=np.uint8).reshape(height * 3 // 2, width)
+            yield cv2.cvtColor(planes, cv2.COLOR_YUV2BGR_I420)
+
+
+def read_back(backend: str, path: str, size: Tuple[int, int]) -> Iterator[np.ndarray]:
+    if backend == "spool":
+        yield from SpoolReader(path).frames
+    elif backend == "y4m":
+        yield from read_y4m(path, size)
+    elif backend.startswith("sequence"):
+        for name in sorted(glob.glob(os.path.join(path, "*"))):
+            yield np.load(name) if name.endswith(".npy") else cv2.imread(name)
+    else:
+        cap = cv2.VideoCapture(path)
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+        cap.release()
+
+
+def psnr(frames: List[np.ndarray], decoded: Iterator[np.ndarray]) -> Tuple[float, int]:
+    """Mean squared error over all frames as PSNR, and how many frames came back."""
+    squared, count = 0.0, 0
+    for original, frame in zip(frames, decoded):
+        if frame is None or frame.shape != original.shape:
+            break
+        squared += float(np.mean((original.astype(np.float32) - frame) ** 2))
+        count += 1
+    mse = squared / count if count else float("nan")
+    return (float("inf") if mse == 0 else 10 * np.log10(255 ** 2 / mse)), count
+
+
+def output_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(name) for name in glob.glob(os.path.join(path, "*")))
+    return os.path.getsize(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="1080p")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--crf", type=int, default=config.DEFAULT_CRF)
+    parser.add_argument("--presets", nargs="+", default=["ultrafast", config.DEFAULT_PRESET])
+    args = parser.parse_args()
+
+    size = SIZES[args.size]
+    frames = make_frames(size, args.frames)
+    workdir = tempfile.mkdtemp(prefix="screenkit-bench-")
+    cases: Dict[str, Tuple[str, str, Dict[str, Any]]] = {
+        "opencv mp4v": ("opencv", "opencv.mp4", {}),
+        "y4m": ("y4m", "frames.y4m", {}),
+        "spool": ("spool", f"frames{config.SPOOL_EXTENSION}", {}),
+        "sequence png": ("sequence", "png", {"format": "png"}),
+        "sequence npy": ("sequence", "npy", {"format": "npy"}),
+    }
+    if ffmpeg_binary():
+        for preset in args.presets:
+            cases[f"ffmpeg {preset}"] = ("ffmpeg", f"ffmpeg-{preset}.mp4", {"preset": preset, "crf": args.crf})
+    else:
+        print("ffmpeg not found; skipping the ffmpeg backend")
+
+    raw_mb = args.frames * size[0] * size[1] * 3 / 1024 ** 2
+    print(f"{args.size}, {args.frames} frames ({raw_mb:.0f} MB raw)")
+    print(f"{'backend':<18} {'encode fps':>11} {'size MB':>9} {'ratio':>7} {'PSNR dB':>8} {'frames':>7}")
+    failed = False
+    for label, (backend, name, options) in cases.items():
+        path = scratch_path(workdir, name)
+        started = time.perf_counter()
+        writer = open_writer(path, args.fps, size, backend, options)
+        for frame in frames:
+            writer.write(frame)
+        writer.release()
+        elapsed = time.perf_counter() - started
+        size_mb = output_size(path) / 1024 ** 2
+        quality, decoded = psnr(frames, read_back(backend, path, size))
+        if label in LOSSLESS:
+            failed |= quality != float("inf") or decoded != args.frames
+        print(f"{label:<18} {args.frames / elapsed:>11.1f} {size_mb:>9.1f} {raw_mb / size_mb:>6.0f}x "
+              f"{quality:>8.1f} {decoded:>7}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
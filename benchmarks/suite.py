@@ -0,0 +1,227 @@
+"""Headless benchmark suite for the record, enhance and trim hot paths.
+
+    python -m benchmarks.suite run --sizes 720p 1080p --output results.json
+    python -m benchmarks.suite run --baseline baseline.json --threshold 10
+    python -m benchmarks.suite compare baseline.json results.json --threshold 10
+
+Every case runs in its own interpreter so its peak RSS is not polluted by
+the others. `compare` (and `run --baseline`) exit non-zero when any case's
+throughput drops by more than `--threshold` percent.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import SIZES, StubScreen, enhance_params_for, make_recording, scratch_path
+from screenkit.metrics import peak_rss_mb
+
+STAGES = ("decode", "resize", "cursor", "composite", "encode")
+
+
+def bench_enhance(workdir: str, size: str, frames: int, events: int) -> Dict[str, Any]:
+    """enhance() broken down per stage, mirroring FrameRenderer.render."""
+    from screenkit.enhance import FrameRenderer
+    from screenkit.events import EventStore
+    from screenkit.spool import open_video
+    from screenkit.writers import open_writer
+
+    video_path, data_path = make_recording(workdir, SIZES[size], frames, events)
+    mouse_events = EventStore.load(data_path)
+
+    cap = open_video(video_path)
+    source_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    renderer = FrameRenderer(dict(enhance_params_for(SIZES[size]), plate_cache=False), source_size, fps, frames, mouse_events)
+    out = open_writer(scratch_path(workdir, f"enhanced-{size}.mp4"), fps, renderer.canvas_size)
+
+    totals = dict.fromkeys(STAGES, 0.0)
+    count = 0
+    started = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        ret, frame = cap.read()
+        t1 = time.perf_counter()
+        if not ret:
+            break
+        resized = cv2.resize(frame, renderer.foreground_size)
+        t2 = time.perf_counter()
+        cursor = renderer.cursor_position(count)
+        if cursor is not None:
+            renderer.cursor_sprite.blend(resized, *cursor)
+        t3 = time.perf_counter()
+        composed = renderer.compositor.compose(resized)
+        t4 = time.perf_counter()
+        out.write(composed)
+        t5 = time.perf_counter()
+        for stage, elapsed in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4)):
+            totals[stage] += elapsed
+        count += 1
+    elapsed = time.perf_counter() - started
+    cap.release()
+    out.release()
+
+    return {
+        "frames": count,
+        "fps": round(count / elapsed, 2),
+        "stage_ms": {stage: round(total / max(count, 1) * 1e3, 3) for stage, total in totals.items()},
+    }
+
+
+def bench_trim(workdir: str, size: str, frames: int) -> Dict[str, Any]:
+    """trim_video keeping the middle half of the recording."""
+    from screenkit.trim import trim_video
+
+    video_path, _ = make_recording(workdir, SIZES[size], frames, 0)
+    duration = frames / 25.0
+    started = time.perf_counter()
+    temp_file = trim_video(video_path, duration / 4, duration * 3 / 4)
+    elapsed = time.perf_counter() - started
+    kept = int(cv2.VideoCapture(temp_file).get(cv2.CAP_PROP_FRAME_COUNT))
+    os.remove(temp_file)
+    return {"frames": kept, "fps": round(kept / elapsed, 2), "source_frames": frames}
+
+
+def bench_capture(workdir: str, size: str, seconds: float, fps: int) -> Dict[str, Any]:
+    """CaptureSession fed by a stubbed mss source at the target frame rate."""
+    from screenkit.capture import CaptureSession
+
+    width, height = SIZES[size]
+    monitor = {"top": 0, "left": 0, "width": width, "height": height}
+    session = CaptureSession(monitor, fps, scratch_path(workdir, f"capture-{size}.mp4"), grabber_factory=StubScreen)
+    session.start()
+    time.sleep(seconds)
+    session.stop()
+    report = session.pacer.report()
+    return {
+        "frames": session.encoded,
+        "fps": round(session.encoded / seconds, 2),
+        "target_fps": fps,
+        "dropped": session.dropped,
+        "mean_jitter_ms": report["mean_jitter_ms"],
+        "max_jitter_ms": report["max_jitter_ms"],
+    }
+
+
+CASES = {"enhance": bench_enhance, "trim": bench_trim, "capture": bench_capture}
+
+
+def plan(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    cases = []
+    for size in args.sizes:
+        for events in args.events:
+            cases.append({"id": f"enhance-{size}-{events}ev", "case": "enhance",
+                          "kwargs": {"size": size, "frames": args.frames, "events": events}})
+        cases.append({"id": f"trim-{size}", "case": "trim", "kwargs": {"size": size, "frames": args.frames}})
+        cases.append({"id": f"capture-{size}", "case": "capture",
+                      "kwargs": {"size": size, "seconds": args.capture_seconds, "fps": args.capture_fps}})
+    return [case for case in cases if case["case"] in args.cases]
+
+
+def run_case(case: Dict[str, Any], workdir: str) -> Dict[str, Any]:
+    """Run one case in a fresh interpreter and return its result."""
+    command = [sys.executable, "-m", "benchmarks.suite", "case", json.dumps(dict(case, workdir=workdir))]
+    completed = subprocess.run(command, capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> bool:
+    """Print a per-case comparison; False if any case regressed past `threshold` percent."""
+    ok = True
+    print(f"{'case':<28} {'baseline fps':>13} {'current fps':>12} {'change':>8}")
+    for case_id, result in current["results"].items():
+        base = baseline.get("results", {}).get(case_id)
+        if not base or "fps" not in base or "fps" not in result:
+            print(f"{case_id:<28} {'-':>13} {result.get('fps', '-'):>12} {'n/a':>8}")
+            continue
+        change = (result["fps"] - base["fps"]) / base["fps"] * 100 if base["fps"] else 0.0
+        regressed = change < -threshold
+        ok &= not regressed
+        print(f"{case_id:<28} {base['fps']:>13.2f} {result['fps']:>12.2f} {change:>+7.1f}%{'  REGRESSED' if regressed else ''}")
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the suite and write JSON results")
+    run.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    run.add_argument("--sizes", nargs="+", choices=SIZES, default=["720p", "1080p"])
+    run.add_argument("--events", type=int, nargs="+", default=[1_000, 100_000])
+    run.add_argument("--frames", type=int, default=100)
+    run.add_argument("--capture-seconds", type=float, default=2.0)
+    run.add_argument("--capture-fps", type=int, default=30)
+    run.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "screenkit-bench"))
+    run.add_argument("--output", help="Write results here (default: stdout)")
+    run.add_argument("--baseline", help="Compare against a saved results file")
+    run.add_argument("--threshold", type=float, default=10.0, help="Allowed throughput drop in percent")
+
+    cmp = commands.add_parser("compare", help="Compare two results files")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=10.0)
+
+    single = commands.add_parser("case", help=argparse.SUPPRESS)
+    single.add_argument("spec")
+
+    args = parser.parse_args()
+
+    if args.command == "case":
+        spec = json.loads(args.spec)
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            result = CASES[spec["case"]](spec["workdir"], **spec["kwargs"])
+        result["peak_rss_mb"] = peak_rss_mb()
+        print(json.dumps(result))
+        return 0
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return 0 if compare(baseline, current, args.threshold) else 1
+
+    results = {}
+    for case in plan(args):
+        results[case["id"]] = run_case(case, args.workdir)
+        print(f"{case['id']:<28} {json.dumps(results[case['id']])}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    failed = any("error" in result for result in results.values())
+    if args.baseline:
+        with open(args.baseline) as f:
+            failed |= not compare(json.load(f), report, args.threshold)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
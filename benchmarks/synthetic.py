@@ -0,0 +1,103 @@
+"""Synthetic recordings used by the benchmarks."""
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from screenkit.events import EventStore
+
+
+SIZES = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+
+
+def make_video(path: str, size: Tuple[int, int], frames: int, fps: float = 25.0) -> str:
+    """Write a video of a moving gradient so every frame differs."""
+    width, height = size
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    base = np.broadcast_to(gradient, (height, width, 3)).astype(np.uint8)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    for i in range(frames):
+        writer.write(np.roll(base, i * 4, axis=1))
+    writer.release()
+    return path
+
+
+def make_mouse_events(count: int, duration: float, seed: int = 0) -> Dict[str, List[Dict]]:
+    """Return `count` move events spread evenly over `duration` seconds."""
+    rng = np.random.default_rng(seed)
+    times = np.linspace(0, duration, count)
+    xs, ys = rng.random(count), rng.random(count)
+    return {
+        "click": [],
+        "move": [{"x": float(x), "y": float(y), "time": float(t)} for x, y, t in zip(xs, ys, times)],
+    }
+
+
+def write_mouse_events(path: str, mouse_events: Dict[str, List[Dict]]) -> str:
+    with open(path, "w") as f:
+        json.dump(mouse_events, f)
+    return path
+
+
+def make_recording(directory: str, size: Tuple[int, int], frames: int, events: int, fps: float = 25.0) -> Tuple[str, str]:
+    """Synthetic raw recording and sidecar, reused across runs with the same shape."""
+    width, height = size
+    video_path = scratch_path(directory, f"raw-{width}x{height}-{frames}.mp4")
+    if not os.path.isfile(video_path):
+        make_video(video_path, size, frames, fps)
+    data_path = scratch_path(directory, f"events-{events}-{frames}.npz")
+    if not os.path.isfile(data_path):
+        EventStore.from_dict(make_mouse_events(events, frames / fps)).save(data_path)
+    return video_path, data_path
+
+
+def enhance_params_for(size: Tuple[int, int]) -> Dict:
+    """Enhance parameters matching a full-screen recording of `size`."""
+    width, height = size
+    return {
+        "screen_width": width,
+        "screen_height": height,
+        "record_region": {"left": 0, "top": 0, "width": width, "height": height},
+        "padding": 0.1,
+        "background": "default-wallpaper-2",
+        "border_radius": 20,
+        "cursor_scale": 1.0,
+        "shadow_blur": 10,
+        "shadow_opacity": 0.5,
+    }
+
+
+def scratch_path(directory: str, name: str) -> str:
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+class StubScreen:
+    """Stand-in for `mss.mss()` that returns synthetic BGRA grabs without a display.
+
+    `grab_cost` simulates the time a real grab blocks for. The content changes
+    every `change_every` grabs (never when 0), to mimic an idle desktop.
+    """
+
+    def __init__(self, grab_cost: float = 0.0, change_every: int = 1):
+        self.grab_cost = grab_cost
+        self.change_every = change_every
+        self.grabs = 0
+
+    def __enter__(self) -> "StubScreen":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def grab(self, monitor: Dict[str, int]) -> np.ndarray:
+        if self.grab_cost:
+            time.sleep(self.grab_cost)
+        frame = np.zeros((monitor["height"], monitor["width"], 4), dtype=np.uint8)
+        state = self.grabs // self.change_every if self.change_every else 0
+        frame[:, :, state % 3] = state % 256
+        self.grabs += 1
+        return frame
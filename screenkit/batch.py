@@ -0,0 +1,186 @@
+import glob
+import os
+import queue
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from multiprocessing import Manager
+from typing import Any, Dict, Iterable, List, Optional
+
+from tqdm import tqdm
+
+from screenkit import config
+from screenkit.utils import find_sidecar
+
+# Files a glob over a recordings folder picks up that are not recordings
+SKIPPED_SUFFIXES = (config.SIDECAR_EXTENSION, ".json")
+
+
+@dataclass
+class EnhanceJob:
+    video_path: str
+    output_path: str
+    data_path: Optional[str] = None
+
+
+@dataclass
+class JobResult:
+    job: EnhanceJob
+    ok: bool
+    frames: int = 0
+    seconds: float = 0.0
+    error: str = ""
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[str]:
+    """Video paths matched by `patterns` (paths or globs, `**` allowed), in order and without duplicates."""
+    paths: Dict[str, None] = {}
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            if os.path.isfile(path) and not path.endswith(SKIPPED_SUFFIXES):
+                paths.setdefault(os.path.abspath(path), None)
+    return list(paths)
+
+
+def plan_jobs(video_paths: List[str], output_dir: str, data_path: Optional[str] = None) -> List[EnhanceJob]:
+    """One job per video, writing `<output_dir>/<stem>.mp4` (suffixed when two inputs share a stem)."""
+    jobs, taken = [], set()
+    for video_path in video_paths:
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        name, n = f"{stem}.mp4", 1
+        while name in taken:
+            n += 1
+            name = f"{stem}-{n}.mp4"
+        taken.add(name)
+        jobs.append(EnhanceJob(video_path, os.path.join(output_dir, name), data_path or find_sidecar(video_path)))
+    return jobs
+
+
+# Per-process render caches, so jobs with the same background and layout reuse the prepared plate
+_cache = None
+_plate_cache = None
+
+
+def _init_worker(plate_cache: bool) -> None:
+    global _cache, _plate_cache
+    from screenkit.enhance import CacheManager
+    from screenkit.plate_cache import PlateCache
+    _cache = CacheManager()
+    _plate_cache = PlateCache() if plate_cache else None
+
+
+def run_job(index: int, job: EnhanceJob, enhance_params: Dict[str, Any], progress_queue: Any = None,
+            interval: float = 0.25) -> JobResult:
+    """Enhance one video, turning any failure into an unsuccessful result instead of an exception."""
+    from screenkit.enhance import enhance
+
+    if _cache is None:
+        _init_worker(enhance_params.get("plate_cache", True))
+    last_report = 0.0
+    frames = 0
+
+    def progress(done: int, total: int) -> None:
+        nonlocal last_report, frames
+        frames = done
+        now = time.perf_counter()
+        if progress_queue is not None and (now - last_report >= interval or done == total):
+            last_report = now
+            progress_queue.put((index, done, total))
+
+    started = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(job.output_path)), exist_ok=True)
+        enhance(job.video_path, job.output_path, job.data_path, enhance_params, cache=_cache,
+                plate_cache=_plate_cache, progress=progress, quiet=True)
+    except Exception as e:
+        return JobResult(job, False, frames, time.perf_counter() - started, f"{type(e).__name__}: {e}",
+                         {"traceback": traceback.format_exc()})
+    return JobResult(job, True, frames, time.perf_counter() - started, details={"cache": _cache.stats()})
+
+
+def run_batch(jobs: List[EnhanceJob], enhance_params: Dict[str, Any], processes: int) -> List[JobResult]:
+    """Enhance `jobs` across `processes` worker processes, showing a progress bar per running job.
+
+    A job that raises is reported as failed without stopping the others. If a
+    worker process dies, every job the broken pool had not finished is retried
+    on its own, so only the job that crashed ends up failed.
+    """
+    results: List[Optional[JobResult]] = [None] * len(jobs)
+    # Jobs already run in parallel; a job splitting itself into chunks would nest process pools
+    enhance_params = {**enhance_params, "chunks": 1}
+    bars: Dict[int, tqdm] = {}
+
+    def show(index: int, done: int, total: int) -> None:
+        bar = bars.get(index)
+        if bar is None:
+            bar = bars[index] = tqdm(total=total, desc=os.path.basename(jobs[index].video_path), unit="frame",
+                                     leave=False)
+        bar.total = max(total, done)
+        bar.update(done - bar.n)
+
+    def finish(index: int, result: JobResult) -> None:
+        results[index] = result
+        bar = bars.pop(index, None)
+        if bar is not None:
+            bar.close()
+        status = f"done in {result.seconds:.1f}s ({result.fps:.1f} fps)" if result.ok else f"failed: {result.error}"
+        tqdm.write(f"[{sum(r is not None for r in results)}/{len(jobs)}] {os.path.basename(result.job.video_path)} {status}")
+
+    def run_pool(indices: List[int], workers: int, progress_queue: Any) -> List[int]:
+        """Run `indices` in one pool and return those lost to a dead worker."""
+        broken = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(enhance_params.get("plate_cache", True),)) as pool:
+            futures = {pool.submit(run_job, index, jobs[index], enhance_params, progress_queue): index
+                       for index in indices}
+            pending = set(futures)
+            while pending:
+                try:
+                    while True:
+                        show(*progress_queue.get(timeout=0.1))
+                except queue.Empty:
+                    pass
+                for future in [future for future in pending if future.done()]:
+                    pending.discard(future)
+                    index = futures[future]
+                    try:
+                        finish(index, future.result())
+                    except BrokenProcessPool as e:
+                        if len(indices) == 1:
+                            finish(index, JobResult(jobs[index], False, error=f"worker process died ({e})"))
+                        else:
+                            broken.append(index)
+        return broken
+
+    with Manager() as manager:
+        progress_queue = manager.Queue()
+        broken = run_pool(list(range(len(jobs))), processes, progress_queue)
+        for index in broken:
+            bar = bars.pop(index, None)
+            if bar is not None:
+                bar.close()
+            run_pool([index], 1, progress_queue)
+    return results
+
+
+def summarize(results: List[JobResult]) -> Dict[str, str]:
+    """Rows for `pprint_table`: one per job, then the totals."""
+    rows = {}
+    for result in results:
+        name = os.path.basename(result.job.output_path)
+        if result.ok:
+            rows[name] = f"ok, {result.frames} frames in {result.seconds:.1f}s"
+        else:
+            rows[name] = f"FAILED: {result.error}"[:60]
+    ok = [result for result in results if result.ok]
+    rows["Succeeded"] = f"{len(ok)}/{len(results)}"
+    rows["Frames rendered"] = str(sum(result.frames for result in ok))
+    return rows
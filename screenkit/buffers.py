@@ -0,0 +1,72 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class FramePool:
+    """Recycled frame buffers of one shape, so the enhance loop stops allocating per frame.
+
+    Every buffer has the shape fixed from the video geometry. `acquire` hands
+    out a free buffer with a reference count of one; `retain` and `release`
+    adjust the count, and a buffer goes back to the free list when it reaches
+    zero. Buffers are only allocated when none is free, so the pool settles at
+    the number of frames actually in flight (bounded by the pipeline's queue
+    depth), and `stats` reports that high-water mark. `fill` initializes new
+    buffers, for example with the background plate.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], dtype: Any = np.uint8,
+                 fill: Optional[Callable[[np.ndarray], None]] = None):
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.fill = fill
+        self.allocated = 0
+        self.acquired = 0
+        self._free: List[np.ndarray] = []
+        self._refs: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _allocate(self) -> np.ndarray:
+        buffer = np.empty(self.shape, dtype=self.dtype)
+        if self.fill is not None:
+            self.fill(buffer)
+        with self._lock:
+            self.allocated += 1
+        return buffer
+
+    def acquire(self) -> np.ndarray:
+        with self._lock:
+            buffer = self._free.pop() if self._free else None
+            self.acquired += 1
+        if buffer is None:
+            buffer = self._allocate()
+        with self._lock:
+            self._refs[id(buffer)] = 1
+        return buffer
+
+    def retain(self, buffer: Any) -> Any:
+        """Add a reference to `buffer`; arrays the pool did not hand out are ignored."""
+        with self._lock:
+            if id(buffer) in self._refs:
+                self._refs[id(buffer)] += 1
+        return buffer
+
+    def release(self, buffer: Any) -> None:
+        """Drop a reference to `buffer`; arrays the pool did not hand out (and None) are ignored."""
+        with self._lock:
+            refs = self._refs.get(id(buffer))
+            if refs is None:
+                return
+            if refs > 1:
+                self._refs[id(buffer)] = refs - 1
+            else:
+                del self._refs[id(buffer)]
+                self._free.append(buffer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffers": self.allocated,
+            "mb": round(self.allocated * int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize / 1024 ** 2, 1),
+            "acquired": self.acquired,
+        }
@@ -0,0 +1,390 @@
+import os
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from screenkit.metrics import NULL_METRICS
+from screenkit.writers import open_writer
+
+
+class FrameRing:
+    """Fixed set of preallocated frame slots handed between a producer and a consumer.
+
+    The producer never waits: when every slot is still waiting to be encoded
+    `acquire` returns None and the frame is counted as dropped.
+    """
+
+    def __init__(self, slots: int, shape: Tuple[int, ...], dtype=np.uint8):
+        self.slots = slots
+        self.frames = np.empty((slots, *shape), dtype=dtype)
+        self.timestamps = np.zeros(slots, dtype=np.float64)
+        self.dropped = 0
+        self.high_water = 0
+        self._free = deque(range(slots))
+        self._ready: deque = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def depth(self) -> int:
+        return len(self._ready)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def acquire(self) -> Optional[int]:
+        with self._cond:
+            if not self._free:
+                self.dropped += 1
+                return None
+            return self._free.popleft()
+
+    def publish(self, slot: int, timestamp: float) -> None:
+        with self._cond:
+            self.timestamps[slot] = timestamp
+            self._ready.append(slot)
+            self.high_water = max(self.high_water, len(self._ready))
+            self._cond.notify()
+
+    def consume(self, timeout: Optional[float] = None) -> Optional[int]:
+        """Oldest ready slot, or None once the ring is closed and drained (or on timeout)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._ready or self._closed, timeout):
+                return None
+            return self._ready.popleft() if self._ready else None
+
+    def release(self, slot: int) -> None:
+        with self._cond:
+            self._free.append(slot)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+def frames_equal(a: np.ndarray, b: np.ndarray, bands: int = 8) -> bool:
+    """Exact comparison of two grabs, band by band so a changed frame usually bails out early."""
+    if a.shape != b.shape:
+        return False
+    height = a.shape[0]
+    step = max(height // bands, 1)
+    for top in range(0, height, step):
+        band_a = a[top:top + step].reshape(min(step, height - top), -1)
+        band_b = b[top:top + step].reshape(band_a.shape)
+        if cv2.norm(band_a, band_b, cv2.NORM_INF):
+            return False
+    return True
+
+
+def slots_for(frame_bytes: int, budget_mb: int, min_slots: int = 2, max_slots: int = 64) -> int:
+    """How many frames of `frame_bytes` fit in the ring buffer budget."""
+    return int(np.clip(budget_mb * 1024 * 1024 // max(frame_bytes, 1), min_slots, max_slots))
+
+
+class Pacer:
+    """Paces a loop against absolute `perf_counter` deadlines.
+
+    Deadlines are `origin + n / fps`, so sleep overshoot never accumulates.
+    A tick that starts late but within one interval runs immediately to catch
+    up; if whole intervals were missed they are skipped rather than replayed
+    back to back.
+    """
+
+    def __init__(self, fps: float, late_tolerance: float = 0.5):
+        self.interval = 1 / fps
+        self.late_tolerance = late_tolerance
+        self.origin = 0.0
+        self.tick = 0
+        self.frames = 0
+        self.skipped = 0
+        self.late = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+
+    def start(self) -> float:
+        self.origin = time.perf_counter()
+        self.tick = 0
+        self._record(0.0)
+        return self.origin
+
+    def wait(self) -> float:
+        """Sleep until the next deadline and return the time the tick actually started."""
+        self.tick += 1
+        deadline = self.origin + self.tick * self.interval
+        now = time.perf_counter()
+        if now < deadline:
+            time.sleep(deadline - now)
+            now = time.perf_counter()
+        else:
+            missed = int((now - deadline) / self.interval)
+            if missed:
+                self.skipped += missed
+                self.tick += missed
+                deadline += missed * self.interval
+        self._record(now - deadline)
+        return now
+
+    def _record(self, lateness: float) -> None:
+        self.frames += 1
+        self.jitter_total += abs(lateness)
+        self.jitter_max = max(self.jitter_max, abs(lateness))
+        if lateness > self.interval * self.late_tolerance:
+            self.late += 1
+
+    def report(self) -> Dict[str, Any]:
+        """Drift summary: how far ticks started from their deadlines."""
+        elapsed = time.perf_counter() - self.origin
+        return {
+            "frames": self.frames,
+            "target_fps": round(1 / self.interval, 2),
+            "actual_fps": round(self.frames / elapsed, 2) if elapsed > 0 else 0.0,
+            "mean_jitter_ms": round(self.jitter_total / max(self.frames, 1) * 1e3, 3),
+            "max_jitter_ms": round(self.jitter_max * 1e3, 3),
+            "late_frames": self.late,
+            "skipped_ticks": self.skipped,
+        }
+
+
+def segment_path(video_path: str, index: int) -> str:
+    """File for segment `index` of a rotating capture to `video_path`."""
+    stem, extension = os.path.splitext(video_path)
+    return f"{stem}-{index:04d}{extension}"
+
+
+class SegmentWriter:
+    """Capture writer that starts a new file every `segment_seconds` of capture time.
+
+    Segment `i` holds the frames captured in [i * segment_seconds,
+    (i + 1) * segment_seconds) and is written to `segment_path(video_path, i)`;
+    `on_segment(i, path, start, end)` is called as soon as its file is closed.
+    Segments are opened when their first frame arrives. With `segment_seconds`
+    at 0 everything goes to `video_path`, opened straight away.
+    """
+
+    def __init__(self, video_path: str, fps: float, size: Tuple[int, int], writer: str = "auto",
+                 writer_options: Optional[Dict[str, Any]] = None, segment_seconds: float = 0.0,
+                 on_segment: Optional[Callable[[int, str, float, float], None]] = None):
+        self.video_path = video_path
+        self.fps = fps
+        self.size = size
+        self.writer = writer
+        self.writer_options = writer_options
+        self.segment_seconds = segment_seconds
+        self.on_segment = on_segment
+        self.index = -1
+        self.segments: List[str] = []
+        self._writer: Any = None
+        if not segment_seconds:
+            self._open(0)
+
+    def path(self, index: int) -> str:
+        return segment_path(self.video_path, index) if self.segment_seconds else self.video_path
+
+    def _open(self, index: int) -> None:
+        self.index = index
+        self._writer = open_writer(self.path(index), self.fps, self.size, self.writer, self.writer_options)
+        self.segments.append(self.path(index))
+
+    def _close(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.release()
+        self._writer = None
+        if self.on_segment is not None:
+            start = self.index * self.segment_seconds
+            self.on_segment(self.index, self.path(self.index), start, start + self.segment_seconds)
+
+    def write(self, frame: np.ndarray, timestamp: float) -> None:
+        if self.segment_seconds and timestamp // self.segment_seconds != self.index:
+            self._close()
+            self._open(int(timestamp // self.segment_seconds))
+        self._writer.write(frame)
+
+    def release(self) -> None:
+        self._close()
+
+
+class CaptureSession:
+    """Screen capture on one thread, encoding on another, joined by a `FrameRing`.
+
+    The capture thread owns its own grabber (mss instances must stay on the
+    thread that created them) and only converts each grab into a ring slot;
+    the encoder thread drains the ring into the video writer.
+
+    With `dedupe`, a grab identical to the last encoded one is not encoded
+    again; its timestamp goes to `repeat_times` instead, and `enhance`/`trim`
+    expand those entries back into frames. `writer` and `writer_options` pick
+    the encoder for the capture file (see `open_writer`). Pass a `sink`
+    factory to send frames somewhere else: it is called with the frame size
+    and must return an object with `write(frame, timestamp)` and `release()`
+    (see `screenkit.live.LiveRenderSink`). With `segment_seconds` the capture
+    rotates to a new file every that many seconds and `on_segment` is told
+    about each finished one (see `SegmentWriter`).
+    """
+
+    def __init__(self, monitor: Dict[str, int], fps: int, video_path: str,
+                 grabber_factory: Optional[Callable[[], Any]] = None,
+                 on_frame: Optional[Callable[[float], None]] = None,
+                 buffer_mb: int = 512, metrics: Any = NULL_METRICS, dedupe: bool = False,
+                 writer: str = "auto", writer_options: Optional[Dict[str, Any]] = None,
+                 sink: Optional[Callable[[Tuple[int, int]], Any]] = None, segment_seconds: float = 0.0,
+                 on_segment: Optional[Callable[[int, str, float, float], None]] = None):
+        if sink is not None and segment_seconds:
+            raise ValueError("A capture sink cannot be combined with segmented capture")
+        self.monitor = monitor
+        self.fps = fps
+        self.video_path = video_path
+        self.grabber_factory = grabber_factory or _mss_factory
+        self.on_frame = on_frame
+        self.buffer_mb = buffer_mb
+        self.metrics = metrics
+        self.dedupe = dedupe
+        self.writer = writer
+        self.writer_options = writer_options
+        self.sink = sink
+        self.segment_seconds = segment_seconds
+        self.on_segment = on_segment
+        self.segments: List[str] = []
+
+        self.ring: Optional[FrameRing] = None
+        self.pacer = Pacer(fps)
+        self.frame_times = array("d")
+        self.repeat_times = array("d")
+        self.captured = 0
+        self.encoded = 0
+        self.start_time = 0.0
+        self._stop = threading.Event()
+        self._ring_ready = threading.Event()
+        self._errors: List[BaseException] = []
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def dropped(self) -> int:
+        return self.ring.dropped if self.ring else 0
+
+    def start(self) -> None:
+        self.start_time = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._guard(self._capture_loop), name="screenkit-capture", daemon=True),
+            threading.Thread(target=self._guard(self._encode_loop), name="screenkit-encode", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Stop capturing, flush every buffered frame to disk and re-raise thread errors."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def status(self) -> str:
+        elapsed = time.perf_counter() - self.start_time
+        ring = self.ring
+        queue = f"{ring.depth}/{ring.slots} (peak {ring.high_water})" if ring else "-"
+        repeats = f"Repeated: {len(self.repeat_times)} | " if self.dedupe else ""
+        repeats += f"Segments: {len(self.segments)} | " if self.segment_seconds else ""
+        return (f"Elapsed: {elapsed:.2f}s | Captured: {self.captured} | Encoded: {self.encoded} | {repeats}"
+                f"Dropped: {self.dropped} | Queue: {queue}")
+
+    def _guard(self, body: Callable[[], None]) -> Callable[[], None]:
+        def target() -> None:
+            try:
+                body()
+            except BaseException as e:
+                self._errors.append(e)
+                self._stop.set()
+            finally:
+                self._ring_ready.set()
+                if self.ring:
+                    self.ring.close()
+        return target
+
+    def _capture_loop(self) -> None:
+        with self.grabber_factory() as sct:
+            screenshot = np.asarray(sct.grab(self.monitor))
+            height, width = screenshot.shape[:2]
+            self.ring = FrameRing(slots_for(height * width * 3, self.buffer_mb), (height, width, 3))
+            self._ring_ready.set()
+
+            metrics = self.metrics
+            previous = None
+            segment = 0
+            tick_start = self.pacer.start()
+            self.start_time = tick_start
+            while not self._stop.is_set():
+                if screenshot is None:
+                    with metrics.stage("record.grab"):
+                        screenshot = np.asarray(sct.grab(self.monitor))
+                timestamp = tick_start - self.start_time
+                if self.segment_seconds and timestamp // self.segment_seconds != segment:
+                    # Repeats must not refer back to a frame in the previous segment's file
+                    segment = int(timestamp // self.segment_seconds)
+                    previous = None
+
+                repeat = False
+                if previous is not None:
+                    with metrics.stage("record.compare"):
+                        repeat = frames_equal(screenshot, previous)
+                if repeat:
+                    self.repeat_times.append(timestamp)
+                    metrics.count("record.repeated")
+                else:
+                    slot = self.ring.acquire()
+                    if slot is not None:
+                        with metrics.stage("record.convert"):
+                            cv2.cvtColor(screenshot, cv2.COLOR_BGRA2BGR, dst=self.ring.frames[slot])
+                        self.ring.publish(slot, timestamp)
+                        self.captured += 1
+                        # Repeats must refer to a frame that was actually encoded
+                        previous = screenshot if self.dedupe else None
+                    else:
+                        metrics.count("record.dropped")
+                metrics.gauge("record.ring_depth", self.ring.depth)
+                if self.on_frame:
+                    with metrics.stage("record.mouse"):
+                        self.on_frame(timestamp)
+
+                screenshot = None
+                tick_start = self.pacer.wait()
+
+    def _encode_loop(self) -> None:
+        self._ring_ready.wait()
+        ring = self.ring
+        if ring is None:
+            return
+        height, width = ring.frames.shape[1:3]
+        if self.sink is not None:
+            video_writer = self.sink((width, height))
+        else:
+            video_writer = SegmentWriter(self.video_path, self.fps, (width, height), self.writer, self.writer_options,
+                                         self.segment_seconds, self.on_segment)
+            self.segments = video_writer.segments
+        write = video_writer.write
+        try:
+            while True:
+                slot = ring.consume(timeout=0.1)
+                if slot is None:
+                    if ring.closed:
+                        break
+                    continue
+                with self.metrics.stage("record.encode"):
+                    write(ring.frames[slot], ring.timestamps[slot])
+                self.frame_times.append(ring.timestamps[slot])
+                ring.release(slot)
+                self.encoded += 1
+        finally:
+            video_writer.release()
+
+
+def _mss_factory():
+    import mss
+    return mss.mss()
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Callable, Dict, List, Optional
+
+import cv2
+from tqdm import tqdm
+
+from screenkit import config
+from screenkit.chunked import chunk_format, join_method, join_segments
+from screenkit.events import load_events
+from screenkit.metrics import Metrics, NULL_METRICS, profile_path
+from screenkit.plate_cache import PlateCache
+from screenkit.spool import open_video
+from screenkit.utils import pprint, pprint_table, Color
+from screenkit.writers import open_writer
+
+MANIFEST_VERSION = 1
+# Settings that change how a render runs but not the frames it produces
+EXECUTION_KEYS = {"workers", "queue_depth", "chunks", "profile", "plate_cache", "buffer_pool", "checkpoint_seconds",
+                  "resume"}
+# Bytes read from each end of the input for its fingerprint; hashing hours of video would take minutes
+SAMPLE_BYTES = 1024 * 1024
+
+
+def parts_dir(output_path: str) -> str:
+    """Folder holding the committed chunks and manifest of a checkpointed render of `output_path`."""
+    return f"{output_path}.parts"
+
+
+def fingerprint(video_path: str, data_path: Optional[str], enhance_params: Dict[str, Any]) -> str:
+    """Hash identifying a render: the input (size plus its first and last MiB), the sidecar and the settings."""
+    digest = hashlib.sha256()
+    size = os.path.getsize(video_path)
+    digest.update(str(size).encode())
+    with open(video_path, "rb") as f:
+        digest.update(f.read(SAMPLE_BYTES))
+        f.seek(max(size - SAMPLE_BYTES, 0))
+        digest.update(f.read(SAMPLE_BYTES))
+    if data_path and os.path.isfile(data_path):
+        with open(data_path, "rb") as f:
+            digest.update(f.read())
+    params = {key: value for key, value in enhance_params.items() if key not in EXECUTION_KEYS}
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Record of the chunks a checkpointed render has committed, kept as JSON next to them.
+
+    A chunk is committed once its file is complete: it is written under a
+    temporary name, renamed into place and only then listed here, and the
+    manifest itself is replaced atomically. `verified` re-checks a listed
+    chunk's size and frame count on disk, so a chunk damaged or removed after
+    it was committed is rendered again.
+    """
+
+    def __init__(self, directory: str, key: str, chunk_frames: int, extension: str):
+        self.directory = directory
+        self.path = os.path.join(directory, "manifest.json")
+        self.key = key
+        self.chunk_frames = chunk_frames
+        self.extension = extension
+        self.chunks: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def read(cls, directory: str) -> Optional["Manifest"]:
+        try:
+            with open(os.path.join(directory, "manifest.json")) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        manifest = cls(directory, data["key"], data["chunk_frames"], data["extension"])
+        manifest.chunks = data["chunks"]
+        return manifest
+
+    def chunk_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"chunk-{index:05d}{self.extension}")
+
+    def verified(self, index: int) -> bool:
+        entry = self.chunks.get(str(index))
+        path = self.chunk_path(index)
+        if entry is None or not os.path.isfile(path) or os.path.getsize(path) != entry["bytes"]:
+            return False
+        cap = open_video(path)
+        frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        return frames == entry["frames"]
+
+    def commit(self, index: int, partial_path: str, frames: int) -> None:
+        path = self.chunk_path(index)
+        os.replace(partial_path, path)
+        self.chunks[str(index)] = {"frames": frames, "bytes": os.path.getsize(path)}
+        self.write()
+
+    def write(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        data = {"version": MANIFEST_VERSION, "key": self.key, "chunk_frames": self.chunk_frames,
+                "extension": self.extension, "chunks": self.chunks}
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(self.path + ".tmp", self.path)
+
+
+def render_checkpointed(video_path: str, output_path: str, data_path: Optional[str] = None,
+                        enhance_params: Dict[str, Any] = {}, metrics: Optional[Metrics] = None,
+                        progress: Optional[Callable[[int, int], None]] = None, quiet: bool = False) -> str:
+    """Render in fixed-length chunks committed to `parts_dir(output_path)`, so a killed render can resume.
+
+    Chunks are `enhance_params["checkpoint_seconds"]` of output long. With
+    `enhance_params["resume"]`, chunks a previous run of the same input and
+    settings already committed are skipped after checking them on disk, and
+    the input is seeked to the first missing one. Frame indices stay global,
+    so the joined video matches an uninterrupted render. The chunks are
+    joined like chunked renders and removed once the output is written.
+    """
+    from screenkit.enhance import FrameRenderer, open_source, render_frames
+
+    profile = enhance_params.get("profile", False)
+    metrics = metrics if metrics is not None else Metrics() if profile else NULL_METRICS
+    cap, source_size, fps, total_frames = open_source(video_path)
+    plate_cache = PlateCache() if enhance_params.get("plate_cache", True) else None
+    renderer = FrameRenderer(enhance_params, source_size, fps, total_frames, load_events(data_path),
+                             plate_cache=plate_cache, metrics=metrics)
+    total_frames = renderer.total_frames
+
+    method = join_method(output_path, enhance_params.get("writer", config.DEFAULT_WRITER))
+    extension, writer, writer_options = chunk_format(method)
+    if writer == "ffmpeg":
+        writer_options = enhance_params.get("writer_options") or {}
+    key = fingerprint(video_path, data_path, enhance_params)
+    directory = parts_dir(output_path)
+
+    previous = Manifest.read(directory)
+    seconds = enhance_params.get("checkpoint_seconds") or 0
+    chunk_frames = max(1, round((seconds or config.DEFAULT_CHECKPOINT_SECONDS) * fps))
+    # Without an explicit chunk length, resume with whatever the interrupted run used
+    if enhance_params.get("resume") and previous is not None and previous.key == key \
+            and previous.extension == extension and (not seconds or chunk_frames == previous.chunk_frames):
+        manifest = previous
+    else:
+        if enhance_params.get("resume") and not quiet:
+            reason = "no checkpoint found" if previous is None else "the input or settings changed"
+            pprint(f"Nothing to resume ({reason}); rendering from the start.", Color.YELLOW)
+        shutil.rmtree(directory, ignore_errors=True)
+        manifest = Manifest(directory, key, chunk_frames, extension)
+        manifest.write()
+
+    ranges = [(start, min(start + manifest.chunk_frames, total_frames))
+              for start in range(0, total_frames, manifest.chunk_frames)] or [(0, None)]
+    # The last chunk runs to the end of the video, in case the frame count was an estimate
+    ranges = [(start, stop if i < len(ranges) - 1 else None) for i, (start, stop) in enumerate(ranges)]
+    resumed = [i for i in range(len(ranges)) if manifest.verified(i)]
+    done = sum(manifest.chunks[str(i)]["frames"] for i in resumed)
+    if resumed and not quiet:
+        pprint(f"Resuming: {len(resumed)} of {len(ranges)} chunks ({done} frames) already rendered.", Color.CYAN)
+
+    def advance() -> None:
+        nonlocal done, frames
+        done += 1
+        frames += 1
+        pbar.update(1)
+        if progress is not None:
+            progress(done, total_frames)
+
+    with tqdm(total=total_frames, initial=done, desc="Enhancing Video", unit="frame", disable=quiet) as pbar:
+        for index, (start, stop) in enumerate(ranges):
+            if index in resumed:
+                continue
+            partial_path = os.path.join(directory, f"chunk-{index:05d}.partial{extension}")
+            out = open_writer(partial_path, fps, renderer.canvas_size, writer, writer_options)
+            frames = 0
+            try:
+                render_frames(cap, renderer, out, enhance_params, metrics, start=start, stop=stop, advance=advance)
+            finally:
+                out.release()
+            manifest.commit(index, partial_path, frames)
+    cap.release()
+
+    chunks: List[str] = [manifest.chunk_path(i) for i in range(len(ranges))]
+    if not quiet:
+        pprint(f"Joining {len(chunks)} chunks ({method})...", Color.CYAN)
+    join_segments(chunks, output_path, method, enhance_params, quiet)
+    shutil.rmtree(directory, ignore_errors=True)
+
+    stats = {"chunks": len(ranges), "chunk_frames": manifest.chunk_frames, "resumed_chunks": len(resumed)}
+    metrics.attach("checkpoint", stats)
+    if not quiet:
+        pprint_table("Checkpoints", stats)
+    metrics.attach("cache", renderer.cache.stats())
+    if profile:
+        path = metrics.write(profile_path(output_path))
+        if not quiet:
+            pprint(f"Profile written to {path}", Color.CYAN)
+    return output_path
@@ -0,0 +1,192 @@
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+from tqdm import tqdm
+
+from screenkit import config
+from screenkit.events import load_events
+from screenkit.metrics import Metrics, NULL_METRICS, profile_path
+from screenkit.plate_cache import PlateCache
+from screenkit.spool import concat_spools, open_video
+from screenkit.utils import pprint, Color
+from screenkit.writers import ffmpeg_binary, open_writer, pick_backend
+
+
+def chunk_ranges(total_frames: int, chunks: int) -> List[Tuple[int, Optional[int]]]:
+    """Split [0, total_frames) into `chunks` contiguous ranges; the last one runs to the end of the video."""
+    chunks = max(1, min(chunks, total_frames))
+    bounds = [total_frames * i // chunks for i in range(chunks + 1)]
+    return [(bounds[i], bounds[i + 1] if i < chunks - 1 else None) for i in range(chunks)]
+
+
+def join_method(output_path: str, writer: str = config.DEFAULT_WRITER) -> str:
+    """How segments become the final file: "spool" (byte copy), "ffmpeg" (stream copy) or "encode"."""
+    backend = pick_backend(output_path) if writer == "auto" else writer
+    if backend == "spool":
+        return "spool"
+    return "ffmpeg" if backend == "ffmpeg" and ffmpeg_binary() else "encode"
+
+
+def chunk_format(method: str) -> Tuple[str, str, Dict[str, Any]]:
+    """Extension, writer backend and options for chunks that will be joined with `method`."""
+    if method == "spool":
+        return config.SPOOL_EXTENSION, "spool", {}
+    if method == "ffmpeg":
+        return ".mp4", "ffmpeg", {}
+    # Re-encoded once when joined, so keep them lossless. HuffYUV is a few times smaller than raw
+    # frames and, unlike FFV1, fast enough not to slow the render down.
+    return ".avi", "opencv", {"fourcc": "HFYU"}
+
+
+def render_chunk(video_path: str, segment_path: str, data_path: Optional[str], enhance_params: Dict[str, Any],
+                 index: int, start: int, stop: Optional[int], writer: str = "spool",
+                 writer_options: Optional[Dict[str, Any]] = None, progress_queue: Any = None,
+                 interval: float = 0.25) -> Tuple[int, Optional[Dict[str, Any]]]:
+    """Render output frames [start, stop) into `segment_path`, in a worker process.
+
+    Returns the frames written and, with `enhance_params["profile"]`, the
+    worker's `Metrics.state()` for the parent to merge.
+    """
+    from screenkit.enhance import FrameRenderer, open_source, render_frames
+
+    metrics = Metrics() if enhance_params.get("profile") else NULL_METRICS
+    cap, source_size, fps, total_frames = open_source(video_path)
+    plate_cache = PlateCache() if enhance_params.get("plate_cache", True) else None
+    renderer = FrameRenderer(enhance_params, source_size, fps, total_frames, load_events(data_path),
+                             plate_cache=plate_cache, metrics=metrics)
+    out = open_writer(segment_path, fps, renderer.canvas_size, writer, writer_options)
+    done, reported, last_report = 0, 0, time.perf_counter()
+
+    def advance() -> None:
+        nonlocal done, reported, last_report
+        done += 1
+        now = time.perf_counter()
+        if progress_queue is not None and now - last_report >= interval:
+            progress_queue.put((index, done - reported))
+            reported, last_report = done, now
+
+    try:
+        render_frames(cap, renderer, out, enhance_params, metrics, start=start, stop=stop, advance=advance)
+    finally:
+        cap.release()
+        out.release()
+    if progress_queue is not None and done > reported:
+        progress_queue.put((index, done - reported))
+    return done, metrics.state() if metrics.enabled else None
+
+
+def join_segments(segments: List[str], output_path: str, method: str, enhance_params: Dict[str, Any],
+                  quiet: bool = False) -> None:
+    if method == "spool":
+        concat_spools(segments, output_path)
+    elif method == "ffmpeg":
+        # The same binary `join_method` found, which may be a SCREENKIT_FFMPEG path outside PATH
+        binary = ffmpeg_binary()
+        if binary is None:
+            raise RuntimeError("ffmpeg not found")
+        list_path = os.path.join(os.path.dirname(segments[0]), "segments.txt")
+        with open(list_path, "w") as f:
+            f.writelines(f"file '{os.path.abspath(segment)}'\n" for segment in segments)
+        subprocess.run([binary, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path,
+                        "-c", "copy", output_path], check=True)
+    else:
+        # No stream-copy tool: encode the lossless segments (spool files or HuffYUV) once, in order
+        readers = [open_video(segment) for segment in segments]
+        first = readers[0]
+        size = (int(first.get(cv2.CAP_PROP_FRAME_WIDTH)), int(first.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        out = open_writer(output_path, first.get(cv2.CAP_PROP_FPS), size,
+                          enhance_params.get("writer", config.DEFAULT_WRITER), enhance_params.get("writer_options"))
+        try:
+            with tqdm(total=sum(int(reader.get(cv2.CAP_PROP_FRAME_COUNT)) for reader in readers),
+                      desc="Joining segments", unit="frame", disable=quiet) as pbar:
+                for reader in readers:
+                    ok, frame = reader.read()
+                    while ok:
+                        out.write(frame)
+                        pbar.update(1)
+                        ok, frame = reader.read()
+                    reader.release()
+        finally:
+            out.release()
+
+
+def render_chunked(video_path: str, output_path: str, data_path: Optional[str] = None,
+                   enhance_params: Dict[str, Any] = {}, metrics: Optional[Metrics] = None,
+                   progress: Optional[Callable[[int, int], None]] = None, quiet: bool = False) -> str:
+    """Render one video as `enhance_params["chunks"]` frame ranges in parallel worker processes.
+
+    Each worker seeks to its range and renders it with global frame indices,
+    so cursor timing and frame boundaries match a single-process render. The
+    segments are joined without re-encoding when the output is a spool file
+    or is written by the ffmpeg backend; otherwise they are kept losslessly
+    as HuffYUV (see `chunk_format`) and encoded once at the end with the
+    chosen writer. Each
+    worker's timings are merged into `metrics`, and with
+    `enhance_params["profile"]` the report is written next to the output.
+    """
+    from screenkit.enhance import FrameRenderer, open_source
+
+    profile = enhance_params.get("profile", False)
+    if metrics is None:
+        metrics = Metrics() if profile else NULL_METRICS
+    # Built once up front for the frame count, and so the plate is in the disk cache before workers start
+    cap, source_size, fps, total_frames = open_source(video_path)
+    cap.release()
+    plate_cache = PlateCache() if enhance_params.get("plate_cache", True) else None
+    renderer = FrameRenderer(enhance_params, source_size, fps, total_frames, load_events(data_path),
+                             plate_cache=plate_cache)
+    total_frames = renderer.total_frames
+    ranges = chunk_ranges(total_frames, enhance_params["chunks"])
+    method = join_method(output_path, enhance_params.get("writer", config.DEFAULT_WRITER))
+    segment_extension, segment_writer, segment_options = chunk_format(method)
+    if segment_writer == "ffmpeg":
+        segment_options = enhance_params.get("writer_options") or {}
+
+    segment_dir = tempfile.mkdtemp(prefix="screenkit-chunks-", dir=os.path.dirname(os.path.abspath(output_path)))
+    segments = [os.path.join(segment_dir, f"segment-{i:04d}{segment_extension}") for i in range(len(ranges))]
+    try:
+        with Manager() as manager, ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            progress_queue = manager.Queue()
+            # Workers only collect timings when there is somewhere for them to go
+            chunk_params = {**enhance_params, "profile": metrics.enabled}
+            futures = [pool.submit(render_chunk, video_path, segment, data_path, chunk_params, i, start, stop,
+                                   segment_writer, segment_options, progress_queue)
+                       for i, (segment, (start, stop)) in enumerate(zip(segments, ranges))]
+            done = 0
+            with tqdm(total=total_frames, desc=f"Enhancing Video ({len(ranges)} chunks)", unit="frame",
+                      disable=quiet) as pbar:
+                while not all(future.done() for future in futures):
+                    try:
+                        _, frames = progress_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    done += frames
+                    pbar.update(frames)
+                    if progress is not None:
+                        progress(done, total_frames)
+                for future in futures:
+                    _, state = future.result()
+                    if state is not None:
+                        metrics.merge(state)
+
+        if not quiet:
+            pprint(f"Joining {len(segments)} segments ({method})...", Color.CYAN)
+        join_segments(segments, output_path, method, enhance_params, quiet)
+    finally:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+
+    metrics.attach("chunks", {"chunks": len(ranges), "join": method})
+    metrics.attach("cache", renderer.cache.stats())
+    if profile:
+        path = metrics.write(profile_path(output_path))
+        if not quiet:
+            pprint(f"Profile written to {path}", Color.CYAN)
+    return output_path
@@ -11,6 +11,28 @@ DEFAULT_SHADOW_BLUR = 10
 DEFAULT_SHADOW_OPACITY = 0.5
 DEFAULT_COUNTDOWN = 3
 DEFAULT_CACHE_DIR = os.path.expanduser("~/.screenkit/")
+DEFAULT_CACHE_MAX_MB = 256
+PLATE_CACHE_DIR = os.path.join(DEFAULT_CACHE_DIR, "plates")
+DEFAULT_PLATE_CACHE_MB = 2048
+DEFAULT_WORKERS = 0
+DEFAULT_QUEUE_DEPTH = 8
+DEFAULT_RING_BUFFER_MB = 512
+SPOOL_EXTENSION = ".skspool"
+SPOOL_WRITE_BUFFER = 16 * 1024 * 1024
+DEFAULT_WRITER = "auto"
+WRITER_BACKENDS = ("auto", "opencv", "ffmpeg", "sequence", "y4m", "spool")
+DEFAULT_FFMPEG_CODEC = "libx264"
+DEFAULT_CRF = 20
+DEFAULT_PRESET = "veryfast"
+CAPTURE_WRITER_OPTIONS = {"preset": "ultrafast", "crf": 16}  # the raw capture must keep up in real time
+DEFAULT_SEGMENT_SECONDS = 0  # 0 records one file; otherwise rotate and enhance segments while recording
+DEFAULT_CHECKPOINT_SECONDS = 60  # output length per committed chunk of a resumable enhance
+PREVIEW_SCALE = 0.25  # draft previews render at this fraction of the full size
+PREVIEW_FRAMES = 9  # frames in a preview contact sheet when no stride or timestamps are given
+LIVE_MAX_STRIDE = 4  # live rendering may drop to fps / 4 before frames are dropped outright
+SIDECAR_EXTENSION = ".npz"
+DEFAULT_CURSOR_RATE = 240  # Hz; pointer moves above this rate are coalesced
+CURSOR_MAX_GAP = 0.25  # seconds between moves beyond which the cursor is treated as resting
 
 CURSOR_IMAGE_PATH = "images/cursor.png"
 CURSOR_SCALE = 0.3
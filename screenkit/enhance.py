@@ -1,8 +1,11 @@
 import re
 import os
-import json
+import sys
+import threading
+from collections import OrderedDict
+from itertools import islice
 from pathlib import Path
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Callable, Iterator, Optional, Union
 
 import cv2
 import numpy as np
@@ -10,16 +13,108 @@ from tqdm import tqdm
 from PIL import Image, ImageDraw, ImageFilter
 
 from screenkit import config
+from screenkit.buffers import FramePool
+from screenkit.events import CursorTimeline, EventStore, expand_frames, load_events
+from screenkit.metrics import Metrics, NULL_METRICS, profile_path
+from screenkit.pipeline import FramePipeline
+from screenkit.plate_cache import PlateCache
+from screenkit.spool import SpoolReader, open_video
+from screenkit.writers import open_writer
+from screenkit.utils import pprint, pprint_table, Color
 
 class CacheManager:
-    def __init__(self):
-        self.mask: Dict[Tuple, np.ndarray] = {}
-        self.shadow: Dict[Tuple, Image.Image] = {}
-
-    def get_cache_key(self, x_offset: int, y_offset: int, radius: int, shadow_blur: int, shadow_opacity: float) -> Tuple:
-        return (x_offset, y_offset, radius, shadow_blur, shadow_opacity)
-
-cache = CacheManager()
+    """Byte-bounded LRU for prepared render layers (masks, shadows, plates, cursor sprites).
+
+    Keys carry the full geometry of what was built, so layers for different
+    canvas or foreground sizes never collide. Pass an instance explicitly to
+    share it between runs; every `enhance` call otherwise gets its own.
+    """
+
+    def __init__(self, max_bytes: int = config.DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def mask_key(size: Tuple[int, int], radius: int) -> Tuple:
+        return ("mask", tuple(size), radius)
+
+    @staticmethod
+    def shadow_key(canvas_size: Tuple[int, int], x_offset: int, y_offset: int, size: Tuple[int, int],
+                   radius: int, shadow_blur: int, shadow_opacity: float) -> Tuple:
+        return ("shadow", tuple(canvas_size), x_offset, y_offset, tuple(size), radius, shadow_blur, shadow_opacity)
+
+    @staticmethod
+    def plate_key(fingerprint: Tuple) -> Tuple:
+        return ("plate",) + tuple(fingerprint)
+
+    @staticmethod
+    def sprite_key(cursor_image: np.ndarray, scale: float) -> Tuple:
+        return ("sprite", id(cursor_image), cursor_image.shape, scale)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, value: Any) -> Any:
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_create(self, key: Tuple, factory: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        return self.put(key, factory()) if value is None else value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def _sizeof(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, Image.Image):
+        return value.width * value.height * len(value.getbands())
+    if isinstance(value, CursorSprite):
+        return value.premultiplied.nbytes + value.inverse_alpha.nbytes
+    return sys.getsizeof(value)
+
+default_cache = CacheManager()
 
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     """Convert HEX color to RGB tuple"""
@@ -84,33 +179,40 @@ def draw_filled_rounded_rectangle(img: np.ndarray, pt1: Tuple[int, int], pt2: Tu
 
     return img
 
-def apply_border_radius_with_shadow(background: Image.Image, foreground: Image.Image, x_offset: int, y_offset: int, radius: int, shadow_blur: int, shadow_opacity: float) -> np.ndarray:
+def create_corner_mask(size: Tuple[int, int], radius: int) -> np.ndarray:
+    """Anti-aliased rounded-rectangle alpha mask for a foreground of `size`"""
+    mask = np.zeros(shape=(size[1], size[0]), dtype=np.uint8)
+    return draw_filled_rounded_rectangle(mask, (0, 0), size, radius, 255)
+
+def create_shadow_layer(canvas_size: Tuple[int, int], x_offset: int, y_offset: int, size: Tuple[int, int], radius: int, shadow_blur: int, shadow_opacity: float) -> Image.Image:
+    """Blurred RGBA drop shadow for a foreground of `size` placed on the canvas"""
+    shadow = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
+    shadow_draw = ImageDraw.Draw(shadow)
+    shadow_draw.rounded_rectangle([(x_offset, y_offset),
+                                   (x_offset + size[0], y_offset + size[1])],
+                                   radius, fill=(0, 0, 0, int(255 * shadow_opacity)))
+    return shadow.filter(ImageFilter.GaussianBlur(shadow_blur))
+
+def apply_border_radius_with_shadow(background: Image.Image, foreground: Image.Image, x_offset: int, y_offset: int, radius: int, shadow_blur: int, shadow_opacity: float,
+                                    cache: Optional[CacheManager] = None) -> np.ndarray:
     if isinstance(background, np.ndarray):
         background = Image.fromarray(cv2.cvtColor(background, cv2.COLOR_BGR2RGB))
     if isinstance(foreground, np.ndarray):
         foreground = Image.fromarray(cv2.cvtColor(foreground, cv2.COLOR_BGR2RGB))
 
-    cache_key = cache.get_cache_key(x_offset, y_offset, radius, shadow_blur, shadow_opacity)
+    cache = default_cache if cache is None else cache
 
     if radius > 0:
-        if cache_key not in cache.mask:
-            mask = np.zeros(shape=(foreground.size[1], foreground.size[0]), dtype=np.uint8)
-            mask = draw_filled_rounded_rectangle(mask, (0, 0), foreground.size, radius, 255)
-            cache.mask[cache_key] = Image.fromarray(mask)
-        foreground.putalpha(cache.mask[cache_key])
+        mask = cache.get_or_create(cache.mask_key(foreground.size, radius),
+                                   lambda: create_corner_mask(foreground.size, radius))
+        foreground.putalpha(Image.fromarray(mask))
     else:
         foreground.putalpha(Image.new("L", foreground.size, 255))
 
     if shadow_blur > 0:
-        if cache_key not in cache.shadow:
-            shadow = Image.new("RGBA", background.size, (0, 0, 0, 0))
-            shadow_draw = ImageDraw.Draw(shadow)
-            shadow_draw.rounded_rectangle([(x_offset, y_offset),
-                                           (x_offset + foreground.width, y_offset + foreground.height)],
-                                           radius, fill=(0, 0, 0, int(255 * shadow_opacity)))
-            shadow = shadow.filter(ImageFilter.GaussianBlur(shadow_blur))
-            cache.shadow[cache_key] = shadow
-        shadow = cache.shadow[cache_key]
+        shadow_key = cache.shadow_key(background.size, x_offset, y_offset, foreground.size, radius, shadow_blur, shadow_opacity)
+        shadow = cache.get_or_create(shadow_key, lambda: create_shadow_layer(background.size, x_offset, y_offset, foreground.size,
+                                                                              radius, shadow_blur, shadow_opacity))
     else:
         shadow = Image.new("RGBA", background.size, (0, 0, 0, 0))
 
@@ -119,33 +221,112 @@ def apply_border_radius_with_shadow(background: Image.Image, foreground: Image.I
 
     return cv2.cvtColor(np.array(result), cv2.COLOR_RGBA2BGR)
 
-def render_cursor(frame: np.ndarray, cursor_image: np.ndarray, x_offset: int, y_offset: int, scale: float = 1.0) -> np.ndarray:
-    if cursor_image.ndim < 3 or cursor_image.shape[2] != 4:
-        raise ValueError("Cursor image must be BGRA")
-
-    frame_height, frame_width = frame.shape[:2]
-    if x_offset < 0 or x_offset > frame_width or y_offset < 0 or y_offset > frame_height:
+def create_plate(background: np.ndarray, foreground_size: Tuple[int, int], x_offset: int, y_offset: int,
+                 radius: int, shadow_blur: int, shadow_opacity: float, cache: Optional[CacheManager] = None) -> np.ndarray:
+    """Flatten the drop shadow onto the background, giving the BGR plate frames are blended onto"""
+    if shadow_blur <= 0:
+        return background.copy()
+
+    cache = CacheManager() if cache is None else cache
+    canvas_size = (background.shape[1], background.shape[0])
+    shadow_key = cache.shadow_key(canvas_size, x_offset, y_offset, foreground_size, radius, shadow_blur, shadow_opacity)
+    shadow = cache.get_or_create(shadow_key, lambda: create_shadow_layer(canvas_size, x_offset, y_offset, foreground_size,
+                                                                          radius, shadow_blur, shadow_opacity))
+    plate = Image.fromarray(cv2.cvtColor(background, cv2.COLOR_BGR2RGB)).convert("RGBA")
+    return cv2.cvtColor(np.array(Image.alpha_composite(plate, shadow)), cv2.COLOR_RGBA2BGR)
+
+class Compositor:
+    """NumPy replacement for `apply_border_radius_with_shadow`, prepared once per video.
+
+    The background and shadow are flattened into a single BGR plate up front. Since
+    everything outside the foreground rectangle is identical for every frame, the
+    output buffer only needs the foreground copied in, plus a fixed-point blend for
+    the few anti-aliased corner pixels whose alpha is below 255.
+    """
+
+    def __init__(self, background: Optional[np.ndarray], foreground_size: Tuple[int, int], x_offset: int, y_offset: int,
+                 radius: int, shadow_blur: int, shadow_opacity: float, cache: Optional[CacheManager] = None,
+                 plate: Optional[np.ndarray] = None):
+        cache = CacheManager() if cache is None else cache
+        width, height = foreground_size
+
+        if plate is None:
+            plate = create_plate(background, foreground_size, x_offset, y_offset, radius, shadow_blur, shadow_opacity, cache)
+        self.plate = np.ascontiguousarray(plate)
+        self.region = (slice(y_offset, y_offset + height), slice(x_offset, x_offset + width))
+
+        if radius > 0:
+            mask = cache.get_or_create(cache.mask_key(foreground_size, radius),
+                                       lambda: create_corner_mask(foreground_size, radius))
+            self.edge_rows, self.edge_cols = np.nonzero(mask != 255)
+            # Q8 fixed-point weights in [0, 256] so the blend is a multiply-add and a shift
+            alpha = mask[self.edge_rows, self.edge_cols].astype(np.uint32)
+            self.edge_weight = ((alpha * 256 + 127) // 255)[:, None]
+            plate_edge = self.plate[self.region][self.edge_rows, self.edge_cols].astype(np.uint32)
+            self.edge_base = plate_edge * (256 - self.edge_weight) + 128
+        else:
+            self.edge_rows = self.edge_cols = np.empty(0, dtype=np.intp)
+
+        self.output = self.new_output()
+
+    def new_output(self) -> np.ndarray:
+        """A fresh output buffer; `compose` only rewrites the foreground rectangle of it."""
+        return self.plate.copy()
+
+    def compose(self, foreground: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Blend `foreground` onto the plate, writing into `out` (or the shared output buffer)."""
+        out = self.output if out is None else out
+        roi = out[self.region]
+        np.copyto(roi, foreground)
+        if len(self.edge_rows):
+            edge = foreground[self.edge_rows, self.edge_cols].astype(np.uint32)
+            roi[self.edge_rows, self.edge_cols] = (edge * self.edge_weight + self.edge_base) >> 8
+        return out
+
+class CursorSprite:
+    """Cursor image scaled once and stored as premultiplied BGR plus an inverse-alpha plane.
+
+    Blending is then `roi = roi * (255 - a) / 255 + premultiplied`, done in place on
+    the frame with two OpenCV calls, so edges keep their anti-aliasing and no
+    temporary masks are allocated per frame.
+    """
+
+    def __init__(self, cursor_image: np.ndarray, scale: float = 1.0):
+        if cursor_image.ndim < 3 or cursor_image.shape[2] != 4:
+            raise ValueError("Cursor image must be BGRA")
+
+        # Keeping a reference pins the source image, so cache keys built from its id stay unique
+        self.source = cursor_image
+        if scale > 0:
+            new_size = (int(cursor_image.shape[1] * scale * config.CURSOR_SCALE),
+                        int(cursor_image.shape[0] * scale * config.CURSOR_SCALE))
+            cursor_image = cv2.resize(cursor_image, new_size)
+
+        alpha = cv2.merge([cursor_image[:, :, 3]] * 3)
+        self.premultiplied = cv2.multiply(np.ascontiguousarray(cursor_image[:, :, :3]), alpha, scale=1 / 255)
+        self.inverse_alpha = cv2.bitwise_not(alpha)
+        self.height, self.width = self.premultiplied.shape[:2]
+
+    def blend(self, frame: np.ndarray, x_offset: int, y_offset: int) -> np.ndarray:
+        """Draw the cursor with its top-left corner at (x_offset, y_offset), clipping at every edge."""
+        frame_height, frame_width = frame.shape[:2]
+        x_start, y_start = max(x_offset, 0), max(y_offset, 0)
+        x_end = min(x_offset + self.width, frame_width)
+        y_end = min(y_offset + self.height, frame_height)
+        if x_start >= x_end or y_start >= y_end:
+            return frame
+
+        sprite = (slice(y_start - y_offset, y_end - y_offset), slice(x_start - x_offset, x_end - x_offset))
+        roi = frame[y_start:y_end, x_start:x_end]
+        cv2.multiply(roi, self.inverse_alpha[sprite], dst=roi, scale=1 / 255)
+        cv2.add(roi, self.premultiplied[sprite], dst=roi)
         return frame
 
-    if scale > 0:
-        new_size = (int(cursor_image.shape[1] * scale * config.CURSOR_SCALE),
-                    int(cursor_image.shape[0] * scale * config.CURSOR_SCALE))
-        cursor_image = cv2.resize(cursor_image, new_size)
-
-    cursor_height, cursor_width = cursor_image.shape[:2]
-    x_end = min(x_offset + cursor_width, frame_width)
-    y_end = min(y_offset + cursor_height, frame_height)
-
-    cropped_cursor = cursor_image[:y_end-y_offset, :x_end-x_offset, :]
-    mask = cropped_cursor[:, :, 3]
-    cursor_rgb = cropped_cursor[:, :, :3]
-
-    roi = frame[y_offset:y_end, x_offset:x_end, :]
-    frame[y_offset:y_end, x_offset:x_end, :] = cv2.add(
-        cv2.bitwise_and(cursor_rgb, cursor_rgb, mask=mask),
-        cv2.bitwise_and(roi, roi, mask=cv2.bitwise_not(mask))
-    )
-    return frame
+def render_cursor(frame: np.ndarray, cursor_image: np.ndarray, x_offset: int, y_offset: int, scale: float = 1.0,
+                  cache: Optional[CacheManager] = None) -> np.ndarray:
+    cache = default_cache if cache is None else cache
+    sprite = cache.get_or_create(cache.sprite_key(cursor_image, scale), lambda: CursorSprite(cursor_image, scale))
+    return sprite.blend(frame, x_offset, y_offset)
 
 def render_traffic_light_buttons(frame: np.ndarray, color: Tuple[int, int, int] = (255, 255, 255), height: int = 42) -> np.ndarray:
     _, width = frame.shape[:2]
@@ -160,99 +341,417 @@ def render_traffic_light_buttons(frame: np.ndarray, color: Tuple[int, int, int]
 
     return frame
 
-def enhance(video_path: str, output_path: str, data_path: Optional[str] = None, enhance_params: Dict[str, Any] = {}) -> str:
-    screen_width = enhance_params.get("screen_width")
-    screen_height = enhance_params.get("screen_height")
-    record_region = enhance_params.get("record_region", {})
-    padding = enhance_params.get("padding", 0)
-    background = enhance_params.get("background", "default-wallpaper-1")
-    macos_titlebar = enhance_params.get("macos_titlebar")
-    border_radius = enhance_params.get("border_radius", 0)
-    cursor_scale = enhance_params.get("cursor_scale", 1.0)
-    shadow_blur = enhance_params.get("shadow_blur", 0)
-    shadow_opacity = enhance_params.get("shadow_opacity", 0)
-
-    mouse_events = {}
-    if data_path and os.path.isfile(data_path):
-        with open(data_path, "r") as f:
-            mouse_events = json.load(f)
-
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError("Error opening video file")
-
-    orig_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    orig_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-    min_height = 100
-    padding_y = int(padding * screen_height) if isinstance(padding, float) and 0 <= padding <= 1 else int(padding)
-    padding_x = int(padding_y * orig_width / orig_height)
-    new_width = orig_width - 2 * padding_x
-    new_height = orig_height - 2 * padding_y
-    print('ori', orig_width, orig_height, padding_x, padding_y, new_width, new_height)
-
-    fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-    out = cv2.VideoWriter(output_path, fourcc, fps, (screen_width, screen_height))
+def load_background(background: Any, size: Tuple[int, int], draft: bool = False) -> np.ndarray:
+    """Resolve a wallpaper name/path, HEX code or RGB tuple to a BGR canvas of `size`.
 
+    With `draft`, JPEG wallpapers are scaled down by the decoder itself (to no
+    less than `size`), which is several times faster for small canvases.
+    """
     if isinstance(background, str):
         if path := get_wallpaper_path(background):
-            background_frame = cv2.imread(str(path))
-            background_frame = cv2.resize(background_frame, (screen_width, screen_height))
+            if draft:
+                with Image.open(path) as image:
+                    image.draft("RGB", size)
+                    return cv2.resize(cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2BGR), size)
+            return cv2.resize(cv2.imread(str(path)), size)
         elif is_hex_color(background):
-            background_frame = create_background((screen_width, screen_height), hex_to_rgb(background))
+            return create_background(size, hex_to_rgb(background))
         else:
-            background_frame = create_background((screen_width, screen_height), (255, 255, 255))
+            return create_background(size, (255, 255, 255))
     elif isinstance(background, tuple) and len(background) == 3:
-        background_frame = create_background((screen_width, screen_height), background)
+        return create_background(size, background)
+    raise ValueError("Invalid background input. Provide an image path, HEX code, or RGB tuple.")
+
+def background_fingerprint(background: Any) -> Tuple:
+    """Identify a background for the plate cache; wallpaper files are tracked by mtime and size"""
+    if isinstance(background, str) and (path := get_wallpaper_path(background)):
+        stat = path.stat()
+        return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    return (background,)
+
+class FrameRenderer:
+    """Everything an enhance run prepares up front, shared by all frames.
+
+    `render` is safe to call from several threads as long as each call passes
+    its own `out` buffer (see `Compositor.new_output`).
+    """
+
+    def __init__(self, enhance_params: Dict[str, Any], source_size: Tuple[int, int], fps: float,
+                 total_frames: int = 0, mouse_events: Optional[Union[EventStore, Dict[str, Any]]] = None,
+                 cache: Optional[CacheManager] = None, plate_cache: Optional[PlateCache] = None,
+                 metrics: Any = NULL_METRICS):
+        self.cache = CacheManager() if cache is None else cache
+        self.metrics = metrics
+        events = EventStore.coerce(mouse_events)
+        # Sidecars written by `record` carry the capture geometry for standalone enhance runs
+        screen = events.metadata.get("screen", {})
+        self.screen_width = enhance_params.get("screen_width") or screen.get("width") or source_size[0]
+        self.screen_height = enhance_params.get("screen_height") or screen.get("height") or source_size[1]
+        self.record_region = enhance_params.get("record_region") or events.metadata.get("record_region") or {"left": 0, "top": 0}
+        self.output_raw = enhance_params.get("output_raw")
+        self.macos_titlebar = enhance_params.get("macos_titlebar")
+        self.cursor_scale = enhance_params.get("cursor_scale", 1.0)
+        self.fps = fps
+        padding = enhance_params.get("padding", 0)
+
+        orig_width, orig_height = source_size
+        padding_y = int(padding * self.screen_height) if isinstance(padding, float) and 0 <= padding <= 1 else int(padding)
+        padding_x = int(padding_y * orig_width / orig_height)
+        self.foreground_size = (orig_width - 2 * padding_x, orig_height - 2 * padding_y)
+        self.canvas_size = (self.screen_width, self.screen_height)
+
+        background = enhance_params.get("background", "default-wallpaper-1")
+        layout = dict(
+            foreground_size=self.foreground_size,
+            x_offset=(self.screen_width - self.foreground_size[0]) // 2,
+            y_offset=(self.screen_height - self.foreground_size[1]) // 2,
+            radius=enhance_params.get("border_radius", 0),
+            shadow_blur=enhance_params.get("shadow_blur", 0),
+            shadow_opacity=enhance_params.get("shadow_opacity", 0)
+        )
+
+        # Draft plates (previews) decode the wallpaper at reduced quality, so never share them with full renders
+        draft = bool(enhance_params.get("draft"))
+        # Memory first (a long-lived cache shared by several videos), then disk, then build it
+        fingerprint = (background_fingerprint(background), self.canvas_size, *layout.values()) + (("draft",) if draft else ())
+        plate = self.cache.get(self.cache.plate_key(fingerprint))
+        if plate is None and plate_cache is not None:
+            plate_key = plate_cache.key(*fingerprint)
+            plate = plate_cache.load(plate_key, (self.screen_height, self.screen_width, 3))
+            metrics.count("plate_cache.miss" if plate is None else "plate_cache.hit")
+            if plate is None:
+                # A new layout over a known background skips decoding the wallpaper, which dominates
+                # building small plates
+                background_key = plate_cache.key("background", background_fingerprint(background), self.canvas_size, draft)
+                canvas = plate_cache.load(background_key, (self.screen_height, self.screen_width, 3))
+                if canvas is None:
+                    canvas = load_background(background, self.canvas_size, draft)
+                    plate_cache.store(background_key, canvas)
+                plate = create_plate(canvas, cache=self.cache, **layout)
+                plate_cache.store(plate_key, plate)
+        elif plate is None:
+            plate = create_plate(load_background(background, self.canvas_size, draft), cache=self.cache, **layout)
+        self.cache.put(self.cache.plate_key(fingerprint), plate)
+        self.compositor = Compositor(None, cache=self.cache, plate=plate, **layout)
+        cursor_path = str(Path(__file__).parent / config.CURSOR_IMAGE_PATH)
+        self.cursor_image = self.cache.get_or_create(("cursor_image", cursor_path),
+                                                     lambda: cv2.imread(cursor_path, cv2.IMREAD_UNCHANGED))
+        self.cursor_sprite = self.cache.get_or_create(self.cache.sprite_key(self.cursor_image, self.cursor_scale),
+                                                      lambda: CursorSprite(self.cursor_image, self.cursor_scale))
+
+        self.timeline = CursorTimeline.from_store(events)
+        # Recordings with per-frame capture timestamps share a clock with the move events;
+        # older ones only let us assume frame N was captured at start + N / fps.
+        self.frame_times, self.source_index = events.frame_schedule()
+        # Deduplicated recordings hold fewer frames than the video they expand back into
+        self.total_frames = total_frames if self.source_index is None else len(self.source_index)
+        self.start_time = 0.0 if len(self.frame_times) else self.timeline.start_time
+        self.cursor_positions = self.timeline.interpolate_at(self.frame_time(np.arange(max(self.total_frames, 0))),
+                                                             config.CURSOR_MAX_GAP)
+
+    def frame_time(self, index: Any) -> Any:
+        """Capture time of frame `index` (scalar or array) on the move-event clock."""
+        count = len(self.frame_times)
+        if not count:
+            return self.start_time + index / self.fps
+        index = np.asarray(index)
+        extrapolated = self.frame_times[-1] + (index - (count - 1)) / self.fps
+        return np.where(index < count, self.frame_times[np.minimum(index, count - 1)], extrapolated)
+
+    def cursor_position(self, index: int) -> Optional[Tuple[int, int]]:
+        """Cursor position for frame `index`, in record-region pixels."""
+        if index < len(self.cursor_positions):
+            position = self.cursor_positions[index]
+        else:
+            # CAP_PROP_FRAME_COUNT is only an estimate for some containers
+            position = self.timeline.interpolate_at([float(self.frame_time(index))], config.CURSOR_MAX_GAP)[0]
+        return self.region_position(position[0], position[1])
+
+    def region_position(self, x: float, y: float) -> Optional[Tuple[int, int]]:
+        """Record-region pixels for a normalized screen position (None if it is NaN, i.e. unknown)."""
+        if np.isnan(x):
+            return None
+        return (int(x * self.screen_width) - self.record_region["left"],
+                int(y * self.screen_height) - self.record_region["top"])
+
+    def render(self, frame: np.ndarray, index: int, out: Optional[np.ndarray] = None,
+               resized: Optional[np.ndarray] = None) -> np.ndarray:
+        """Render one frame into `out` (default: the compositor's shared buffer).
+
+        `resized` is an optional foreground-sized scratch buffer for the scaled
+        frame; callers rendering concurrently must each pass their own.
+        """
+        return self.render_with_cursor(frame, self.cursor_position(index), out, resized)
+
+    def render_with_cursor(self, frame: np.ndarray, cursor: Optional[Tuple[int, int]],
+                           out: Optional[np.ndarray] = None, resized: Optional[np.ndarray] = None) -> np.ndarray:
+        """`render` with the cursor position (record-region pixels, or None) given directly."""
+        metrics = self.metrics
+        with metrics.stage("enhance.resize"):
+            resized_frame = cv2.resize(frame, self.foreground_size, dst=resized)
+        if self.output_raw:
+            return resized_frame
+
+        if self.macos_titlebar:
+            with metrics.stage("enhance.titlebar"):
+                resized_frame = render_traffic_light_buttons(resized_frame)
+
+        with metrics.stage("enhance.cursor"):
+            if cursor is not None:
+                resized_frame = self.cursor_sprite.blend(resized_frame, cursor[0], cursor[1])
+
+        with metrics.stage("enhance.composite"):
+            return self.compositor.compose(resized_frame, out)
+
+class StaticFrameFilter:
+    """Spots frames that would render exactly like the one before them.
+
+    A frame is static when the cursor has not moved and no source pixel differs
+    from the last rendered frame by more than `threshold` (0 means bit-identical,
+    so skipping never changes the output). The comparison is a single SIMD
+    max-abs-diff pass, far cheaper than resizing and compositing. Frames from a
+    `pool` are retained while they are the reference, so the decoder cannot
+    overwrite them; with `copy` the reference is copied instead, for frames
+    whose buffer the caller reuses (such as capture ring slots).
+    """
+
+    def __init__(self, threshold: int = 0, pool: Optional[FramePool] = None, copy: bool = False):
+        self.threshold = threshold
+        self.pool = pool
+        self.copy = copy
+        self.frames = 0
+        self.hits = 0
+        self._previous: Optional[np.ndarray] = None
+        self._previous_cursor: Optional[Tuple[int, int]] = None
+
+    def is_static(self, frame: np.ndarray, cursor: Optional[Tuple[int, int]]) -> bool:
+        self.frames += 1
+        previous = self._previous
+        static = (previous is not None and cursor == self._previous_cursor and frame.shape == previous.shape
+                  and cv2.norm(frame.reshape(frame.shape[0], -1), previous.reshape(previous.shape[0], -1),
+                               cv2.NORM_INF) <= self.threshold)
+        if static:
+            self.hits += 1
+        else:
+            # Compare against the last frame actually rendered, so small changes cannot add up unnoticed
+            if self.copy:
+                if previous is None or previous.shape != frame.shape:
+                    previous = np.empty_like(frame)
+                np.copyto(previous, frame)
+                frame = previous
+            elif self.pool is not None:
+                self.pool.release(previous)
+                self.pool.retain(frame)
+            self._previous = frame
+            self._previous_cursor = cursor
+        return static
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "reused": self.hits,
+            "hit_rate": f"{self.hits / self.frames * 100:.1f}%" if self.frames else "0.0%",
+        }
+
+
+def read_frames(cap: Any, metrics: Any = NULL_METRICS, pool: Optional[FramePool] = None) -> Iterator[np.ndarray]:
+    """Decode every remaining frame of `cap`.
+
+    With a `pool`, frames are decoded into pooled buffers. The reader holds
+    one reference to each and drops it when the next frame is requested, so
+    a consumer keeping a frame longer must `retain` it.
+    """
+    buffer = None
+    while cap.isOpened():
+        if pool is not None:
+            pool.release(buffer)
+            buffer = pool.acquire()
+        with metrics.stage("enhance.decode"):
+            ret, frame = cap.read() if buffer is None else cap.read(image=buffer)
+        if not ret:
+            break
+        yield frame
+    if pool is not None:
+        pool.release(buffer)
+
+def open_source(video_path: str) -> Tuple[Any, Tuple[int, int], float, int]:
+    """Open a raw recording; returns the capture, frame size, fps and (estimated) frame count."""
+    cap = open_video(video_path)
+    if not cap.isOpened():
+        raise ValueError("Error opening video file")
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    return cap, size, cap.get(cv2.CAP_PROP_FPS), int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+def render_frames(cap: Any, renderer: FrameRenderer, out: Any, enhance_params: Dict[str, Any],
+                  metrics: Any = NULL_METRICS, start: int = 0, stop: Optional[int] = None,
+                  advance: Callable[[], None] = lambda: None) -> Tuple[Optional[StaticFrameFilter], Optional[FramePipeline]]:
+    """Render output frames [start, stop) of `cap` into `out` (to the end of the video if `stop` is None).
+
+    Output frame indices are global, so a range renders exactly as it would
+    inside a full run. Returns the static-frame filter and pipeline used, for
+    reporting.
+    """
+    workers = enhance_params.get("workers", 0)
+    queue_depth = enhance_params.get("queue_depth", config.DEFAULT_QUEUE_DEPTH)
+    pipeline = FramePipeline(workers=workers, queue_depth=queue_depth) if workers > 0 else None
+
+    # Decoded frames and (with a pipeline) output canvases are recycled instead of allocated per
+    # frame. Spool frames are already zero-copy views, so they skip the decode pool. Output buffers
+    # start as a copy of the plate; compose only ever rewrites the foreground rectangle.
+    pooled = enhance_params.get("buffer_pool", True)
+    width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    decode_pool = FramePool((height, width, 3)) if pooled and not isinstance(cap, SpoolReader) else None
+    output_pool = FramePool(renderer.compositor.plate.shape,
+                            fill=lambda buffer: np.copyto(buffer, renderer.compositor.plate)) \
+        if pooled and pipeline and not renderer.output_raw else None
+    scratch = threading.local()
+
+    def resize_buffer() -> Optional[np.ndarray]:
+        """Per-thread destination for the scaled foreground."""
+        if not pooled or renderer.output_raw:
+            return None
+        if not hasattr(scratch, "resized"):
+            width, height = renderer.foreground_size
+            scratch.resized = np.empty((height, width, 3), dtype=np.uint8)
+        return scratch.resized
+
+    static_filter = StaticFrameFilter(enhance_params.get("static_threshold", 0), decode_pool) \
+        if enhance_params.get("static_skip", True) else None
+
+    sources = renderer.source_index
+    if sources is not None:
+        sources = sources[start:stop]
+        first_source = int(sources[0]) if len(sources) else 0
+        sources = sources - first_source
+    else:
+        first_source = start
+    # A range after the first always seeks: callers may share `cap` between consecutive ranges, and
+    # a deduplicated recording that starts idle can begin a later range on source frame 0
+    if start or first_source:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_source)
+    frames = expand_frames(read_frames(cap, metrics, decode_pool), sources)
+    if stop is not None and sources is None:
+        frames = islice(frames, stop - start)
+
+    def classify(frames: Iterator[np.ndarray]) -> Iterator[Tuple[np.ndarray, bool]]:
+        """Tag each decoded frame with whether the previous output can be reused for it."""
+        for index, frame in enumerate(frames, start):
+            static = False
+            if static_filter is not None:
+                with metrics.stage("enhance.static_check"):
+                    static = static_filter.is_static(frame, renderer.cursor_position(index))
+            yield frame, static
+
+    if pipeline:
+        last_output = None
+
+        def queued(items: Iterator[Tuple[np.ndarray, bool]]) -> Iterator[Tuple[np.ndarray, bool]]:
+            """Hold decoded frames until a compose worker is done with them."""
+            for frame, static in items:
+                if decode_pool is not None:
+                    decode_pool.retain(frame)
+                yield frame, static
+
+        def compose(seq: int, item: Tuple[np.ndarray, bool]) -> Optional[np.ndarray]:
+            frame, static = item
+            try:
+                if static:
+                    return None
+                output = output_pool.acquire() if output_pool is not None else renderer.compositor.new_output()
+                return renderer.render(frame, start + seq, output, resize_buffer())
+            finally:
+                if decode_pool is not None:
+                    decode_pool.release(frame)
+
+        def encode(frame: Optional[np.ndarray]) -> None:
+            nonlocal last_output
+            # Results arrive in order, so None always refers to the frame written just before
+            if frame is not None:
+                if output_pool is not None:
+                    output_pool.release(last_output)
+                last_output = frame
+            with metrics.stage("enhance.encode"):
+                out.write(last_output)
+            advance()
+
+        pipeline.run(queued(classify(frames)), compose, encode)
+        if output_pool is not None:
+            output_pool.release(last_output)
     else:
-        raise ValueError("Invalid background input. Provide an image path, HEX code, or RGB tuple.")
-
-    cursor_image = cv2.imread(str(Path(__file__).parent / config.CURSOR_IMAGE_PATH), cv2.IMREAD_UNCHANGED)
-
-    frame_count = 0
-    start_time = mouse_events.get("move", [{}])[0].get("time", 0)
-
-    with tqdm(total=total_frames, desc="Enhancing Video", unit="frame") as pbar:
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            resized_frame = cv2.resize(frame, (new_width, new_height))
-            if enhance_params.get("output_raw"):
-                background_with_frame = resized_frame
-            else:
-                if macos_titlebar:
-                    resized_frame = render_traffic_light_buttons(resized_frame)
-
-                current_time = start_time + (frame_count / fps)
-
-                latest_mouse_event = next((event for event in reversed(mouse_events.get("move", []))
-                                           if event["time"] <= current_time), None)
-
-                if latest_mouse_event:
-                    cursor_x = int(latest_mouse_event["x"] * screen_width) - record_region["left"]
-                    cursor_y = int(latest_mouse_event["y"] * screen_height) - record_region["top"]
-                    resized_frame = render_cursor(resized_frame, cursor_image, cursor_x, cursor_y, cursor_scale)
-
-                background_with_frame = apply_border_radius_with_shadow(
-                    background=background_frame.copy(),
-                    foreground=resized_frame,
-                    x_offset=(screen_width - new_width) // 2,
-                    y_offset=(screen_height - new_height) // 2,
-                    radius=border_radius,
-                    shadow_blur=shadow_blur,
-                    shadow_opacity=shadow_opacity
-                )
-
-            out.write(background_with_frame)
-            frame_count += 1
-            pbar.update(1)
+        frame = None
+        for frame_count, (source, static) in enumerate(classify(frames), start):
+            if not static:
+                frame = renderer.render(source, frame_count, resized=resize_buffer())
+            with metrics.stage("enhance.encode"):
+                out.write(frame)
+            advance()
+
+    metrics.attach("buffer_pools", {name: pool.stats() for name, pool in
+                                    (("decode", decode_pool), ("output", output_pool)) if pool is not None})
+    return static_filter, pipeline
+
+def enhance(video_path: str, output_path: str, data_path: Optional[str] = None, enhance_params: Dict[str, Any] = {},
+            cache: Optional[CacheManager] = None, plate_cache: Optional[PlateCache] = None,
+            metrics: Optional[Metrics] = None, progress: Optional[Callable[[int, int], None]] = None,
+            quiet: bool = False) -> str:
+    """Render `video_path` into the final video at `output_path`.
+
+    Pass `metrics` to receive per-stage timings (and live callbacks, see
+    `Metrics`); with `enhance_params["profile"]` the report is also written
+    next to the output video. `progress(done, total)` is called after every
+    frame, and `quiet` hides the progress bar and summary tables. With
+    `enhance_params["chunks"]` above 1 the video is split across worker
+    processes instead (see `screenkit.chunked`), and with
+    `enhance_params["checkpoint_seconds"]` or `["resume"]` it is rendered in
+    resumable chunks (see `screenkit.checkpoint`).
+    """
+    if enhance_params.get("checkpoint_seconds") or enhance_params.get("resume"):
+        from screenkit.checkpoint import render_checkpointed
+        return render_checkpointed(video_path, output_path, data_path, enhance_params, metrics, progress, quiet)
+    if enhance_params.get("chunks", 1) > 1:
+        from screenkit.chunked import render_chunked
+        return render_chunked(video_path, output_path, data_path, enhance_params, metrics, progress, quiet)
+
+    profile = enhance_params.get("profile", False)
+    if metrics is None:
+        metrics = Metrics() if profile else NULL_METRICS
+
+    mouse_events = load_events(data_path)
+    cap, source_size, fps, total_frames = open_source(video_path)
+
+    if plate_cache is None and enhance_params.get("plate_cache", True):
+        plate_cache = PlateCache()
+    renderer = FrameRenderer(enhance_params, source_size, fps, total_frames, mouse_events, cache, plate_cache, metrics)
+
+    out = open_writer(output_path, fps, renderer.canvas_size, enhance_params.get("writer", config.DEFAULT_WRITER),
+                      enhance_params.get("writer_options"))
+    done = 0
+
+    def advance() -> None:
+        nonlocal done
+        done += 1
+        pbar.update(1)
+        if progress is not None:
+            progress(done, renderer.total_frames)
+
+    with tqdm(total=renderer.total_frames, desc="Enhancing Video", unit="frame", disable=quiet) as pbar:
+        static_filter, pipeline = render_frames(cap, renderer, out, enhance_params, metrics, advance=advance)
 
     cap.release()
     out.release()
-    cv2.destroyAllWindows()
 
-    return output_path
\ No newline at end of file
+    if static_filter is not None:
+        if not quiet:
+            pprint_table("Static Frames", static_filter.stats())
+        metrics.attach("static_frames", static_filter.stats())
+    if pipeline:
+        if not quiet:
+            pprint_table("Enhance Throughput", pipeline.summary())
+        metrics.attach("pipeline", {name: stats.as_dict() for name, stats in pipeline.stats.items()})
+    metrics.attach("cache", renderer.cache.stats())
+    if profile:
+        path = metrics.write(profile_path(output_path))
+        if not quiet:
+            pprint(f"Profile written to {path}", Color.CYAN)
+
+    return output_path
@@ -0,0 +1,297 @@
+import json
+import os
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+SIDECAR_VERSION = 1
+BUTTONS = ("unknown", "Button.left", "Button.right", "Button.middle")
+
+
+class EventStore:
+    """Column-oriented store for everything recorded alongside the video.
+
+    Moves, clicks and frame timestamps are appended to growable `array`
+    columns instead of one dict per event, and saved as a compact `.npz`
+    sidecar. Legacy JSON sidecars can still be loaded.
+    """
+
+    def __init__(self):
+        self.move_time = array("d")
+        self.move_x = array("d")
+        self.move_y = array("d")
+        self.click_time = array("d")
+        self.click_x = array("d")
+        self.click_y = array("d")
+        self.click_button = array("b")
+        self.click_pressed = array("b")
+        self.frame_times = array("d")
+        # Capture ticks where the screen had not changed and no frame was encoded
+        self.repeat_times = array("d")
+        self.metadata: Dict[str, Any] = {}
+
+    def add_move(self, t: float, x: float, y: float) -> None:
+        self.move_time.append(t)
+        self.move_x.append(x)
+        self.move_y.append(y)
+
+    def add_click(self, t: float, x: float, y: float, button: str, pressed: bool) -> None:
+        self.click_time.append(t)
+        self.click_x.append(x)
+        self.click_y.append(y)
+        self.click_button.append(BUTTONS.index(button) if button in BUTTONS else 0)
+        self.click_pressed.append(bool(pressed))
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Zero-copy NumPy views of every column."""
+        return {name: np.frombuffer(column, dtype=column.typecode) if len(column) else np.empty(0, dtype=column.typecode)
+                for name, column in vars(self).items() if isinstance(column, array)}
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in vars(self).values() if isinstance(column, array))
+
+    def frame_schedule(self) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Timestamps of every output frame, and which encoded frame each one shows.
+
+        Without repeat entries the video already has one frame per capture tick
+        and the index array is None. Otherwise repeats are merged back in, each
+        showing the last encoded frame captured before it.
+        """
+        columns = self.columns()
+        frame_times, repeat_times = columns["frame_times"], columns["repeat_times"]
+        if not len(repeat_times):
+            return frame_times, None
+        times = np.concatenate([frame_times, repeat_times])
+        order = np.argsort(times, kind="stable")
+        sources = np.concatenate([np.arange(len(frame_times)),
+                                  np.searchsorted(frame_times, repeat_times, side="right") - 1])
+        return times[order], np.maximum(sources[order], 0)
+
+    def slice(self, start: float, end: float) -> "EventStore":
+        """Copy of the events in the time range [start, end), e.g. for one segment of a rotating recording.
+
+        Moves keep one sample on each side of the range so the cursor at its
+        edges interpolates as it would over the whole recording. Columns are
+        copied by plain slicing, which is safe while listener threads are still
+        appending to this store.
+        """
+        store = EventStore()
+        store.metadata = dict(self.metadata)
+        # A concurrent append may have grown one column of a row but not the next yet
+        moves = min(len(self.move_time), len(self.move_x), len(self.move_y))
+        first = max(bisect_left(self.move_time, start, 0, moves) - 1, 0)
+        last = min(bisect_left(self.move_time, end, 0, moves) + 1, moves)
+        for name in ("move_time", "move_x", "move_y"):
+            getattr(store, name).extend(getattr(self, name)[first:last])
+        clicks = min(len(self.click_time), len(self.click_x), len(self.click_y), len(self.click_button),
+                     len(self.click_pressed))
+        first, last = bisect_left(self.click_time, start, 0, clicks), bisect_left(self.click_time, end, 0, clicks)
+        for name in ("click_time", "click_x", "click_y", "click_button", "click_pressed"):
+            getattr(store, name).extend(getattr(self, name)[first:last])
+        for name in ("frame_times", "repeat_times"):
+            column = getattr(self, name)
+            getattr(store, name).extend(column[bisect_left(column, start):bisect_left(column, end)])
+        return store
+
+    def save(self, path: str) -> str:
+        """Write an `.npz` sidecar (uncompressed, so loading is a straight read)."""
+        meta = dict(self.metadata, version=SIDECAR_VERSION, buttons=list(BUTTONS))
+        with open(path, "wb") as f:
+            np.savez(f, metadata=np.array(json.dumps(meta)), **self.columns())
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "EventStore":
+        """Load an `.npz` sidecar or a legacy JSON one."""
+        with open(path, "rb") as f:
+            is_npz = f.read(4) == b"PK\x03\x04"
+        if not is_npz:
+            with open(path, "r") as f:
+                return cls.from_dict(json.load(f))
+
+        store = cls()
+        with np.load(path, allow_pickle=False) as data:
+            store.metadata = json.loads(str(data["metadata"]))
+            for name, column in vars(store).items():
+                if isinstance(column, array) and name in data:
+                    column.frombytes(np.ascontiguousarray(data[name], dtype=column.typecode).tobytes())
+        store.metadata.pop("version", None)
+        store.metadata.pop("buttons", None)
+        return store
+
+    @classmethod
+    def from_dict(cls, mouse_events: Dict[str, Any]) -> "EventStore":
+        """Build a store from the legacy `{"move": [...], "click": [...]}` layout."""
+        store = cls()
+        for event in mouse_events.get("move", []):
+            store.add_move(event["time"], event["x"], event["y"])
+        for event in mouse_events.get("click", []):
+            store.add_click(event["time"], event["x"], event["y"], event.get("button", ""), event.get("pressed", False))
+        store.frame_times.extend(mouse_events.get("frame_times", []))
+        store.repeat_times.extend(mouse_events.get("repeat_times", []))
+        store.metadata = {key: value for key, value in mouse_events.items()
+                          if key not in ("move", "click", "frame_times", "repeat_times")}
+        return store
+
+    @classmethod
+    def coerce(cls, events: Union["EventStore", Dict[str, Any], None]) -> "EventStore":
+        if isinstance(events, EventStore):
+            return events
+        return cls.from_dict(events or {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The legacy JSON layout, for tools that still expect it."""
+        return {
+            "move": [{"x": x, "y": y, "time": t} for t, x, y in zip(self.move_time, self.move_x, self.move_y)],
+            "click": [{"x": x, "y": y, "button": BUTTONS[button], "pressed": bool(pressed), "time": t}
+                      for t, x, y, button, pressed in zip(self.click_time, self.click_x, self.click_y,
+                                                          self.click_button, self.click_pressed)],
+            "frame_times": list(self.frame_times),
+            "repeat_times": list(self.repeat_times),
+            **self.metadata,
+        }
+
+
+class MoveSampler:
+    """Feeds pointer moves from a `mouse.Listener` `on_move` callback into an `EventStore`.
+
+    Moves closer than `min_interval` seconds to the last stored sample are
+    coalesced: only the latest one is kept, and it is written (with its own
+    timestamp) once the interval has passed, so the resting position after a
+    fast gesture is never lost. Call `flush` when recording stops.
+    """
+
+    def __init__(self, store: EventStore, clock: Callable[[], float] = time.perf_counter, min_interval: float = 0.0):
+        self.store = store
+        self.clock = clock
+        self.min_interval = min_interval
+        self.received = 0
+        self.coalesced = 0
+        self._last_time = float("-inf")
+        self._pending: Optional[Tuple[float, float, float]] = None
+
+    def add(self, x: float, y: float, t: Optional[float] = None) -> None:
+        t = self.clock() if t is None else t
+        self.received += 1
+        if self._pending is not None and t - self._last_time >= self.min_interval:
+            self._write(*self._pending)
+        if t - self._last_time >= self.min_interval:
+            self._write(t, x, y)
+        else:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = (t, x, y)
+
+    def flush(self) -> None:
+        if self._pending is not None:
+            self._write(*self._pending)
+
+    def _write(self, t: float, x: float, y: float) -> None:
+        self.store.add_move(t, x, y)
+        self._last_time = t
+        self._pending = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"received": self.received, "stored": len(self.store.move_time), "coalesced": self.coalesced}
+
+
+def expand_frames(frames: Iterator[np.ndarray], sources: Optional[np.ndarray]) -> Iterator[np.ndarray]:
+    """Yield decoded `frames` once per output frame, repeating them as `sources` says."""
+    frames = iter(frames)
+    if sources is None:
+        yield from frames
+        return
+    frame, position = None, -1
+    for source in sources:
+        while position < source:
+            frame = next(frames, frame)
+            position += 1
+        if frame is not None:
+            yield frame
+
+
+def load_events(data_path: Optional[str]) -> EventStore:
+    """Sidecar at `data_path`, or an empty store if there is none."""
+    if data_path and os.path.isfile(data_path):
+        return EventStore.load(data_path)
+    return EventStore()
+
+
+class CursorTimeline:
+    """Sorted, column-oriented view of recorded mouse moves.
+
+    Built once from the sidecar data so that looking up the cursor position
+    for a frame is a binary search instead of a scan over every event.
+    """
+
+    def __init__(self, times: np.ndarray, xs: np.ndarray, ys: np.ndarray):
+        times = np.asarray(times, dtype=np.float64)
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.xs = np.asarray(xs, dtype=np.float64)[order]
+        self.ys = np.asarray(ys, dtype=np.float64)[order]
+
+    @classmethod
+    def from_events(cls, mouse_events: Dict[str, List[Dict[str, Any]]]) -> "CursorTimeline":
+        moves = mouse_events.get("move", [])
+        times = np.fromiter((event["time"] for event in moves), dtype=np.float64, count=len(moves))
+        xs = np.fromiter((event["x"] for event in moves), dtype=np.float64, count=len(moves))
+        ys = np.fromiter((event["y"] for event in moves), dtype=np.float64, count=len(moves))
+        return cls(times, xs, ys)
+
+    @classmethod
+    def from_store(cls, store: EventStore) -> "CursorTimeline":
+        columns = store.columns()
+        return cls(columns["move_time"], columns["move_x"], columns["move_y"])
+
+    @classmethod
+    def from_file(cls, data_path: str) -> "CursorTimeline":
+        return cls.from_store(EventStore.load(data_path))
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def start_time(self) -> float:
+        return float(self.times[0]) if len(self.times) else 0.0
+
+    def position_at(self, t: float) -> Optional[Tuple[float, float]]:
+        """Return the relative (x, y) of the latest move at or before `t`."""
+        index = int(np.searchsorted(self.times, t, side="right")) - 1
+        if index < 0:
+            return None
+        return float(self.xs[index]), float(self.ys[index])
+
+    def interpolate_at(self, times: np.ndarray, max_gap: float = float("inf")) -> np.ndarray:
+        """Cursor positions at `times`, linearly interpolated between moves.
+
+        Across gaps longer than `max_gap` seconds the cursor was resting, so the
+        earlier position is held instead of drifting towards the next move.
+        Rows before the first move are NaN.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        positions = np.full((len(times), 2), np.nan)
+        if not len(self.times):
+            return positions
+        positions[:, 0] = np.interp(times, self.times, self.xs)
+        positions[:, 1] = np.interp(times, self.times, self.ys)
+
+        indices = np.searchsorted(self.times, times, side="right") - 1
+        after = np.minimum(indices + 1, len(self.times) - 1)
+        resting = (indices >= 0) & (self.times[after] - self.times[np.maximum(indices, 0)] > max_gap)
+        positions[resting, 0] = self.xs[indices[resting]]
+        positions[resting, 1] = self.ys[indices[resting]]
+        positions[indices < 0] = np.nan
+        return positions
+
+    def positions_at(self, times: np.ndarray) -> np.ndarray:
+        """Vectorized `position_at`; rows without a prior move are NaN."""
+        indices = np.searchsorted(self.times, np.asarray(times, dtype=np.float64), side="right") - 1
+        positions = np.full((len(indices), 2), np.nan)
+        valid = indices >= 0
+        positions[valid, 0] = self.xs[indices[valid]]
+        positions[valid, 1] = self.ys[indices[valid]]
+        return positions
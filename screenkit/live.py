@@ -0,0 +1,152 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from screenkit import config
+from screenkit.enhance import FrameRenderer, StaticFrameFilter
+from screenkit.events import EventStore
+from screenkit.metrics import NULL_METRICS
+from screenkit.plate_cache import PlateCache
+from screenkit.writers import open_writer
+
+
+class Backoff:
+    """Chooses how often to render so a live render keeps up with the capture rate.
+
+    At stride `s` one captured frame in `s` is rendered and the others repeat
+    the previous output, so the frame count and timing of the video are kept
+    while the effective frame rate drops to fps / s. The stride is the
+    smallest one whose estimated cost per frame (render / s + encode) fits in
+    `target` of the frame budget; it only goes back down once the smaller
+    stride would fit in `relax` of the budget, so it does not flap.
+    """
+
+    def __init__(self, fps: float, max_stride: int = config.LIVE_MAX_STRIDE, target: float = 0.8,
+                 relax: float = 0.6, smoothing: float = 0.1):
+        self.budget = 1 / fps
+        self.max_stride = max_stride
+        self.target = target
+        self.relax = relax
+        self.smoothing = smoothing
+        self.stride = 1
+        self.render_cost = 0.0
+        self.encode_cost = 0.0
+        self.changes: List[Tuple[int, int]] = []
+
+    def _smooth(self, average: float, value: float) -> float:
+        return value if average == 0.0 else average + self.smoothing * (value - average)
+
+    def observe(self, frame: int, render_seconds: Optional[float], encode_seconds: float) -> int:
+        """Record the cost of frame `frame` (render None if it was not rendered) and return the stride to use next."""
+        if render_seconds is not None:
+            self.render_cost = self._smooth(self.render_cost, render_seconds)
+        self.encode_cost = self._smooth(self.encode_cost, encode_seconds)
+
+        def fits(stride: int, share: float) -> bool:
+            return self.render_cost / stride + self.encode_cost <= share * self.budget
+
+        stride = self.stride
+        if not fits(stride, self.target):
+            while stride < self.max_stride and not fits(stride, self.target):
+                stride += 1
+        else:
+            while stride > 1 and fits(stride - 1, self.relax):
+                stride -= 1
+        if stride != self.stride:
+            self.changes.append((frame, stride))
+            self.stride = stride
+        return stride
+
+
+class LiveRenderSink:
+    """Renders captured frames into the final video while the recording runs.
+
+    Plug it into `CaptureSession(sink=...)`: each frame is composited with the
+    cursor position sampled at its capture time and encoded straight away, so
+    the video is ready as soon as capture stops. The cursor is the latest
+    sample at or before the frame (later moves are not known yet, so unlike
+    `enhance` it is held rather than interpolated). Unchanged frames reuse the
+    previous output, and when rendering cannot keep up `Backoff` lowers the
+    rate at which frames are rendered.
+    """
+
+    def __init__(self, output_path: str, fps: float, source_size: Tuple[int, int], enhance_params: Dict[str, Any],
+                 events: Optional[EventStore] = None, metrics: Any = NULL_METRICS,
+                 plate_cache: Optional[PlateCache] = None):
+        if plate_cache is None and enhance_params.get("plate_cache", True):
+            plate_cache = PlateCache()
+        self.events = events if events is not None else EventStore()
+        self.metrics = metrics
+        self.renderer = FrameRenderer(enhance_params, source_size, fps, 0, None, plate_cache=plate_cache,
+                                      metrics=metrics)
+        self.out = open_writer(output_path, fps, self.renderer.canvas_size,
+                               enhance_params.get("writer", config.DEFAULT_WRITER), enhance_params.get("writer_options"))
+        self.static_filter = StaticFrameFilter(enhance_params.get("static_threshold", 0), copy=True) \
+            if enhance_params.get("static_skip", True) else None
+        self.backoff = Backoff(fps, enhance_params.get("live_max_stride", config.LIVE_MAX_STRIDE))
+        width, height = self.renderer.foreground_size
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._output: Optional[np.ndarray] = None
+        self._move_index = 0
+        self.frames = 0
+        self.rendered = 0
+        self.reused = 0
+        self.held = 0
+        self.started = time.perf_counter()
+
+    def cursor_at(self, timestamp: float) -> Optional[Tuple[int, int]]:
+        """Latest sampled cursor position at or before `timestamp`, in record-region pixels."""
+        events = self.events
+        times = events.move_time
+        # Samples arrive in time order from the listener thread, which appends each column in turn;
+        # only look at ones already stored in all three
+        index, count = self._move_index, min(len(times), len(events.move_x), len(events.move_y))
+        while index < count and times[index] <= timestamp:
+            index += 1
+        self._move_index = index
+        if not index:
+            return None
+        return self.renderer.region_position(events.move_x[index - 1], events.move_y[index - 1])
+
+    def write(self, frame: np.ndarray, timestamp: float) -> None:
+        cursor = self.cursor_at(timestamp)
+        render_seconds = None
+        if self._output is not None and self.frames % self.backoff.stride:
+            self.held += 1
+        else:
+            static = False
+            if self.static_filter is not None:
+                with self.metrics.stage("live.static_check"):
+                    static = self.static_filter.is_static(frame, cursor)
+            if static:
+                self.reused += 1
+            else:
+                started = time.perf_counter()
+                with self.metrics.stage("live.render"):
+                    self._output = self.renderer.render_with_cursor(frame, cursor, resized=self._resized)
+                render_seconds = time.perf_counter() - started
+                self.rendered += 1
+
+        started = time.perf_counter()
+        with self.metrics.stage("live.encode"):
+            self.out.write(self._output)
+        self.backoff.observe(self.frames, render_seconds, time.perf_counter() - started)
+        self.frames += 1
+
+    def release(self) -> None:
+        self.out.release()
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "frames": self.frames,
+            "rendered": self.rendered,
+            "reused (static)": self.reused,
+            "held (back-off)": self.held,
+            "stride now": self.backoff.stride,
+            "stride changes": len(self.backoff.changes),
+            "render ms": f"{self.backoff.render_cost * 1e3:.1f}",
+            "encode ms": f"{self.backoff.encode_cost * 1e3:.1f}",
+            "render fps": f"{self.rendered / elapsed:.1f}" if elapsed else "0.0",
+        }
@@ -0,0 +1,224 @@
+import bisect
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Upper bounds of the histogram buckets, in milliseconds
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, float("inf"))
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process, or None where `resource` is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with count, sum, min and max."""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+
+    def merge(self, other: "Histogram") -> None:
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (clamped to the observed max)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS_MS, self.buckets):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total, 3),
+            "mean_ms": round(self.total / self.count, 4) if self.count else 0.0,
+            "min_ms": round(self.min, 4) if self.count else 0.0,
+            "max_ms": round(self.max, 4),
+            "p50_ms": round(self.percentile(50), 4),
+            "p95_ms": round(self.percentile(95), 4),
+            "p99_ms": round(self.percentile(99), 4),
+            "buckets_ms": {str(bound): n for bound, n in zip(BUCKETS_MS, self.buckets) if n},
+        }
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_StageTimer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.started)
+
+
+class Metrics:
+    """Per-stage timing histograms, counters and high-water gauges for `record` and `enhance`.
+
+    Thread-safe. If `callback` is given it receives a `snapshot()` at most every
+    `interval` seconds, from whichever thread happens to record a value, so an
+    embedding application can show live progress.
+    """
+
+    enabled = True
+
+    def __init__(self, callback: Optional[Callable[[Dict[str, Any]], None]] = None, interval: float = 1.0):
+        self.callback = callback
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, Dict[str, float]] = {}
+        self.extra: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._last_callback = self.started
+
+    def stage(self, name: str) -> _StageTimer:
+        """Context manager timing one execution of stage `name`."""
+        return _StageTimer(self, name)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = Histogram()
+            histogram.add(seconds * 1e3)
+        self._maybe_callback()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, value: float) -> None:
+        """Record the current value of `name`, keeping its high-water mark."""
+        with self._lock:
+            gauge = self.gauges.get(name)
+            if gauge is None:
+                self.gauges[name] = {"value": value, "max": value}
+            else:
+                gauge["value"] = value
+                gauge["max"] = max(gauge["max"], value)
+
+    def attach(self, name: str, data: Any) -> None:
+        """Add a free-form section (cache stats, pipeline throughput...) to the report."""
+        with self._lock:
+            self.extra[name] = data
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.gauge("peak_rss_mb", peak_rss_mb() or 0.0)
+        with self._lock:
+            return {
+                "elapsed_s": round(time.perf_counter() - self.started, 3),
+                "stages": {name: histogram.as_dict() for name, histogram in self.stages.items()},
+                "counters": dict(self.counters),
+                "gauges": {name: dict(gauge) for name, gauge in self.gauges.items()},
+                **self.extra,
+            }
+
+    def state(self) -> Dict[str, Any]:
+        """Histograms, counters and gauges as plain picklable data, for `merge` in another process."""
+        with self._lock:
+            return {"stages": dict(self.stages), "counters": dict(self.counters),
+                    "gauges": {name: dict(gauge) for name, gauge in self.gauges.items()}}
+
+    def merge(self, state: Dict[str, Any]) -> None:
+        """Fold in the `state()` of another `Metrics`, such as a worker process rendering one chunk."""
+        with self._lock:
+            for name, histogram in state["stages"].items():
+                self.stages.setdefault(name, Histogram()).merge(histogram)
+            for name, n in state["counters"].items():
+                self.counters[name] = self.counters.get(name, 0) + n
+            for name, gauge in state["gauges"].items():
+                mine = self.gauges.setdefault(name, dict(gauge))
+                mine["max"] = max(mine["max"], gauge["max"])
+
+    def write(self, path: str) -> str:
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        return path
+
+    def _maybe_callback(self) -> None:
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        with self._lock:
+            if now - self._last_callback < self.interval:
+                return
+            self._last_callback = now
+        self.callback(self.snapshot())
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+class NullMetrics:
+    """Drop-in for `Metrics` when profiling is off; every call is a no-op."""
+
+    enabled = False
+    _timer = _NullTimer()
+
+    def stage(self, name: str) -> _NullTimer:
+        return self._timer
+
+    def observe(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+    def gauge(self, name: str, value: float) -> None:
+        pass
+
+    def attach(self, name: str, data: Any) -> None:
+        pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {}
+
+
+NULL_METRICS = NullMetrics()
+
+
+def profile_path(output_path: str) -> str:
+    """Where the `--profile` report for `output_path` goes."""
+    return f"{os.path.splitext(output_path)[0]}.profile.json"
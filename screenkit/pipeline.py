@@ -0,0 +1,176 @@
+import heapq
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Throughput counters for one pipeline stage (summed over its threads)."""
+    name: str
+    threads: int = 1
+    items: int = 0
+    busy: float = 0.0
+    wall: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.items += 1
+            self.busy += seconds
+
+    @property
+    def fps(self) -> float:
+        """Items per second of wall time while the stage was running."""
+        return self.items / self.wall if self.wall > 0 else 0.0
+
+    @property
+    def capacity_fps(self) -> float:
+        """Items per second the stage could sustain if it never waited on its neighbours."""
+        return self.items * self.threads / self.busy if self.busy > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"threads": self.threads, "items": self.items, "busy_s": round(self.busy, 3),
+                "wall_s": round(self.wall, 3), "fps": round(self.fps, 2), "capacity_fps": round(self.capacity_fps, 2)}
+
+
+class FramePipeline:
+    """Decode -> compose -> encode with one decoder thread, a pool of compose
+    workers and one encoder thread, connected by bounded queues.
+
+    Items are tagged with a sequence number when decoded and the encoder
+    restores that order before writing. A semaphore caps the number of frames
+    in flight, so a slow frame cannot make the reorder buffer grow without bound.
+    """
+
+    def __init__(self, workers: int = 4, queue_depth: int = 8):
+        if workers < 1:
+            raise ValueError("FramePipeline needs at least one worker")
+        self.workers = workers
+        self.queue_depth = max(1, queue_depth)
+        self.stats = {
+            "decode": StageStats("decode"),
+            "compose": StageStats("compose", threads=workers),
+            "encode": StageStats("encode"),
+        }
+
+    def run(self, source: Iterable[Any], compose: Callable[[int, Any], Any], encode: Callable[[Any], None]) -> Dict[str, StageStats]:
+        """Pull items from `source`, map them with `compose(seq, item)` and pass results to `encode` in order."""
+        decoded: "queue.Queue" = queue.Queue(self.queue_depth)
+        composed: "queue.Queue" = queue.Queue(self.queue_depth)
+        in_flight = threading.Semaphore(self.queue_depth + self.workers)
+        stop = threading.Event()
+        errors: List[BaseException] = []
+
+        def put(q: "queue.Queue", item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(q: "queue.Queue") -> Any:
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return _DONE
+
+        def guarded(stage: str, body: Callable[[], None]) -> Callable[[], None]:
+            def target() -> None:
+                started = time.perf_counter()
+                try:
+                    body()
+                except BaseException as e:
+                    errors.append(e)
+                    stop.set()
+                finally:
+                    stats = self.stats[stage]
+                    with stats._lock:
+                        stats.wall = max(stats.wall, time.perf_counter() - started)
+            return target
+
+        def decode_loop() -> None:
+            iterator = iter(source)
+            seq = 0
+            while not stop.is_set():
+                while not in_flight.acquire(timeout=0.1):
+                    if stop.is_set():
+                        return
+                started = time.perf_counter()
+                item = next(iterator, _DONE)
+                if item is _DONE:
+                    break
+                self.stats["decode"].add(time.perf_counter() - started)
+                if not put(decoded, (seq, item)):
+                    return
+                seq += 1
+            for _ in range(self.workers):
+                put(decoded, _DONE)
+
+        def compose_loop() -> None:
+            while True:
+                entry = get(decoded)
+                if entry is _DONE:
+                    put(composed, _DONE)
+                    return
+                seq, item = entry
+                started = time.perf_counter()
+                result = compose(seq, item)
+                self.stats["compose"].add(time.perf_counter() - started)
+                if not put(composed, (seq, result)):
+                    return
+
+        def encode_loop() -> None:
+            pending: List[Tuple[int, int, Any]] = []
+            next_seq, finished, tiebreak = 0, 0, 0
+            while finished < self.workers:
+                entry = get(composed)
+                if entry is _DONE:
+                    if stop.is_set():
+                        return
+                    finished += 1
+                    continue
+                heapq.heappush(pending, (entry[0], tiebreak, entry[1]))
+                tiebreak += 1
+                while pending and pending[0][0] == next_seq:
+                    _, _, result = heapq.heappop(pending)
+                    started = time.perf_counter()
+                    encode(result)
+                    self.stats["encode"].add(time.perf_counter() - started)
+                    in_flight.release()
+                    next_seq += 1
+
+        threads = [threading.Thread(target=guarded("decode", decode_loop), name="screenkit-decode", daemon=True)]
+        threads += [threading.Thread(target=guarded("compose", compose_loop), name=f"screenkit-compose-{i}", daemon=True)
+                    for i in range(self.workers)]
+        threads.append(threading.Thread(target=guarded("encode", encode_loop), name="screenkit-encode", daemon=True))
+
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.1)
+        except KeyboardInterrupt:
+            stop.set()
+            raise
+
+        if errors:
+            raise errors[0]
+        return self.stats
+
+    def summary(self) -> Dict[str, str]:
+        """Per-stage throughput formatted for `pprint_table`."""
+        return {
+            f"{stats.name} ({stats.threads} thread{'s' if stats.threads > 1 else ''})":
+                f"{stats.fps:.1f} fps (capacity {stats.capacity_fps:.1f} fps)"
+            for stats in self.stats.values()
+        }
@@ -0,0 +1,111 @@
+import hashlib
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from screenkit import config
+
+
+class PlateCache:
+    """On-disk cache of ready-to-blend background+shadow plates.
+
+    Plates are stored as uncompressed `.npy` files and loaded memory-mapped, so
+    a hit costs a page-cache read instead of decoding, resizing and blurring.
+    Files are evicted least-recently-used first (by mtime, refreshed on every
+    hit) once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, directory: str = config.PLATE_CACHE_DIR, max_bytes: int = config.DEFAULT_PLATE_CACHE_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def load(self, key: str, shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        """Memory-mapped plate for `key`, or None if missing or unreadable."""
+        path = self.path(key)
+        try:
+            plate = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if plate.shape != tuple(shape) or plate.dtype != np.uint8:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return plate
+
+    def store(self, key: str, plate: np.ndarray) -> None:
+        """Write `plate` atomically, then trim the cache to its budget. Failures are not fatal."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(plate))
+            os.replace(temp_path, self.path(key))
+        except BaseException as e:
+            # Eviction only sees .npy files, so a partial write would never be cleaned up
+            self._remove(temp_path)
+            if isinstance(e, OSError):
+                return
+            raise
+        self.evict()
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """(path, size, mtime) of every cached plate, least recently used first."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self) -> int:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if self._remove(path):
+                total -= size
+                removed += 1
+        return removed
+
+    def clear(self) -> int:
+        return sum(self._remove(path) for path, _, _ in self.entries())
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.entries()
+        return {
+            "directory": self.directory,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,165 @@
+import math
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from screenkit import config
+from screenkit.enhance import FrameRenderer, open_source
+from screenkit.events import EventStore, load_events
+from screenkit.plate_cache import PlateCache
+from screenkit.utils import pprint, Color
+from screenkit.writers import open_writer
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp")
+# Forward gaps up to this many frames are decoded through rather than seeked; a seek decodes from
+# the previous keyframe anyway
+MAX_SKIP = 30
+
+
+def scaled_params(enhance_params: Dict[str, Any], events: EventStore, source_size: Tuple[int, int],
+                  scale: float) -> Tuple[Dict[str, Any], Tuple[int, int]]:
+    """Enhance parameters and source size for rendering the same layout `scale` times smaller.
+
+    Everything given in pixels (screen, record region, pixel padding, border
+    radius, shadow blur, cursor size) is scaled, so the compositor builds the
+    same picture at the reduced geometry. `draft` lets the wallpaper be
+    decoded at reduced size too.
+    """
+    screen = events.metadata.get("screen", {})
+    screen_width = enhance_params.get("screen_width") or screen.get("width") or source_size[0]
+    screen_height = enhance_params.get("screen_height") or screen.get("height") or source_size[1]
+    region = enhance_params.get("record_region") or events.metadata.get("record_region") or {"left": 0, "top": 0}
+    padding = enhance_params.get("padding", 0)
+
+    def px(value: float) -> int:
+        return max(int(round(value * scale)), 0)
+
+    params = dict(enhance_params, screen_width=max(px(screen_width), 2), screen_height=max(px(screen_height), 2),
+                  record_region=dict(region, left=px(region.get("left", 0)), top=px(region.get("top", 0))),
+                  border_radius=px(enhance_params.get("border_radius", 0)),
+                  shadow_blur=px(enhance_params.get("shadow_blur", 0)),
+                  cursor_scale=enhance_params.get("cursor_scale", 1.0) * scale, draft=True)
+    if not (isinstance(padding, float) and 0 <= padding <= 1):
+        params["padding"] = px(padding)
+    return params, (max(px(source_size[0]), 2), max(px(source_size[1]), 2))
+
+
+def select_frames(renderer: FrameRenderer, stride: Optional[int] = None, timestamps: Sequence[float] = (),
+                  count: int = config.PREVIEW_FRAMES) -> List[int]:
+    """Output frame indices to preview: at `timestamps` (seconds into the video), every `stride`-th
+    frame, or else `count` frames spread evenly over the recording."""
+    total = renderer.total_frames
+    if total <= 0:
+        return [0]
+    if timestamps:
+        times = renderer.frame_time(np.arange(total)) - renderer.frame_time(0)
+        return [int(min(np.searchsorted(times, t), total - 1)) for t in timestamps]
+    if stride:
+        return list(range(0, total, stride))
+    return sorted({int(i) for i in np.linspace(0, total - 1, min(count, total))})
+
+
+def read_source_frames(cap: Any, sources: Sequence[int]) -> Iterator[Tuple[int, np.ndarray]]:
+    """Decode frames `sources` (ascending) of `cap`, skipping short gaps and seeking over long ones."""
+    position = 0
+    for source in sources:
+        if source < position or source - position > MAX_SKIP:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, source)
+            position = source
+        while position < source and cap.grab():
+            position += 1
+        ok, frame = cap.read()
+        if not ok:
+            return
+        yield source, frame
+        position += 1
+
+
+def contact_sheet(tiles: List[np.ndarray], labels: List[str], gap: int = 4) -> np.ndarray:
+    """Lay rendered frames out in a near-square grid, each labelled in its corner."""
+    columns = math.ceil(math.sqrt(len(tiles)))
+    rows = math.ceil(len(tiles) / columns)
+    height, width = tiles[0].shape[:2]
+    sheet = np.full((rows * height + (rows + 1) * gap, columns * width + (columns + 1) * gap, 3), 32, dtype=np.uint8)
+    font_scale = max(height / 400, 0.35)
+    for i, (tile, label) in enumerate(zip(tiles, labels)):
+        y, x = gap + (i // columns) * (height + gap), gap + (i % columns) * (width + gap)
+        sheet[y:y + height, x:x + width] = tile
+        origin = (x + 6, y + int(22 * font_scale) + 4)
+        cv2.putText(sheet, label, origin, cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 0, 0), 2, cv2.LINE_AA)
+        cv2.putText(sheet, label, origin, cv2.FONT_HERSHEY_SIMPLEX, font_scale, (255, 255, 255), 1, cv2.LINE_AA)
+    return sheet
+
+
+def render_preview(video_path: str, output_path: str, data_path: Optional[str] = None,
+                   enhance_params: Dict[str, Any] = {}, scale: float = config.PREVIEW_SCALE,
+                   stride: Optional[int] = None, timestamps: Sequence[float] = (),
+                   count: int = config.PREVIEW_FRAMES, quiet: bool = False) -> str:
+    """Draft render of a few frames at `scale` of the full size, for tuning the enhance look.
+
+    An image `output_path` gets a contact sheet of the selected frames (or the
+    frame itself when only one is selected); any other extension gets a
+    low-res clip of every `stride`-th frame (every frame by default) through
+    the usual writers, played back at the recording's speed. The
+    layout comes from the same `FrameRenderer` as `enhance`, built for the
+    scaled-down geometry, so only the selected frames are decoded and
+    composited, and plates come from the plate cache like any render.
+    """
+    started = time.perf_counter()
+    events = load_events(data_path)
+    cap, source_size, fps, total_frames = open_source(video_path)
+    params, preview_size = scaled_params(enhance_params, events, source_size, scale)
+    # Draft plates are small, and keeping them (and the scaled wallpaper) on disk is what makes
+    # repeated previews while tuning fast
+    plate_cache = PlateCache() if enhance_params.get("plate_cache", True) else None
+    renderer = FrameRenderer(params, preview_size, fps, total_frames, events, plate_cache=plate_cache)
+
+    sheet = output_path.lower().endswith(IMAGE_EXTENSIONS)
+    if not sheet and not stride and not timestamps:
+        stride = 1
+    indices = select_frames(renderer, stride, timestamps, count)
+    # Output frame indices shown by each decoded frame (several, for repeats in deduplicated recordings)
+    shown_by: Dict[int, List[int]] = {}
+    for index in sorted(set(indices)):
+        source = int(renderer.source_index[index]) if renderer.source_index is not None else index
+        shown_by.setdefault(source, []).append(index)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    tiles: Dict[int, np.ndarray] = {}
+    rendered = 0
+    out = None if sheet else open_writer(output_path, max(fps / stride if stride else fps, 1.0), renderer.canvas_size,
+                                         enhance_params.get("writer", config.DEFAULT_WRITER),
+                                         enhance_params.get("writer_options"))
+    try:
+        # Frames are rendered as they are decoded, so only the small outputs are ever held
+        for source, frame in read_source_frames(cap, sorted(shown_by)):
+            for index in shown_by[source]:
+                output = renderer.render(frame, index)
+                if sheet:
+                    tiles[index] = output.copy()
+                else:
+                    out.write(output)
+                rendered += 1
+    finally:
+        cap.release()
+        if out is not None:
+            out.release()
+    if not rendered:
+        raise ValueError("No frames could be decoded for the preview")
+
+    if sheet:
+        start_time = float(renderer.frame_time(0))
+        shown = [index for index in indices if index in tiles]
+        labels = [f"{float(renderer.frame_time(index)) - start_time:.2f}s" for index in shown]
+        image = tiles[shown[0]] if len(shown) == 1 else contact_sheet([tiles[index] for index in shown], labels)
+        if not cv2.imwrite(output_path, image):
+            raise ValueError(f"Cannot write an image to {output_path}")
+
+    if not quiet:
+        width, height = renderer.canvas_size
+        pprint(f"Previewed {rendered} frame(s) at {width}x{height} in "
+               f"{(time.perf_counter() - started) * 1e3:.0f} ms", Color.CYAN)
+    return output_path
@@ -1,9 +1,10 @@
 import json
 import os
+import shutil
 import time
 import tempfile
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Tuple, Optional
 
 import cv2
 import numpy as np
@@ -11,22 +12,42 @@ from pynput import keyboard, mouse
 import mss
 import mss.tools
 
+from screenkit import config
+from screenkit.capture import CaptureSession
 from screenkit.enhance import enhance
-from screenkit.utils import pprint, Color, get_data_path
+from screenkit.events import EventStore, MoveSampler
+from screenkit.live import LiveRenderSink
+from screenkit.metrics import Metrics, NULL_METRICS, profile_path
+from screenkit.segments import SegmentEnhancer
+from screenkit.spool import check_disk_space
+from screenkit.utils import pprint, pprint_table, Color, get_data_path
 
 
 class ScreenRecorder:
     def __init__(self, output_dir: Optional[str] = None, region: Optional[Tuple[int, int, int, int]] = None,
-                 fps: int = 30, countdown_time: int = 3, output_raw: bool = False, enhance_params: Dict = {}):
+                 fps: int = 30, countdown_time: int = 3, output_raw: bool = False, enhance_params: Dict = {},
+                 buffer_mb: int = config.DEFAULT_RING_BUFFER_MB, spool: bool = False, keep_raw: bool = False,
+                 metrics: Optional[Metrics] = None, cursor_rate: float = config.DEFAULT_CURSOR_RATE,
+                 dedupe: bool = False, live: bool = False, segment_seconds: float = config.DEFAULT_SEGMENT_SECONDS):
         self.output_dir = output_dir or self.get_default_output_dir()
         self.region = region
         self.fps = fps
         self.countdown_time = countdown_time
         self.output_raw = output_raw
         self.enhance_params = enhance_params
+        self.buffer_mb = buffer_mb
+        self.spool = spool
+        self.keep_raw = keep_raw
+        self.dedupe = dedupe
+        self.live = live
+        self.segment_seconds = segment_seconds
+        self.metrics = metrics if metrics is not None else Metrics() if enhance_params.get("profile") else NULL_METRICS
         self.stop_recording = False
-        self.mouse_events: Dict[str, List[Dict]] = {"click": [], "move": []}
+        self.events = EventStore()
+        self.sampler = MoveSampler(self.events, self.session_time, 1 / cursor_rate if cursor_rate > 0 else 0.0)
         self.screen_width, self.screen_height = 0, 0
+        self.session: Optional[CaptureSession] = None
+        self.live_sink: Optional[LiveRenderSink] = None
 
     @staticmethod
     def get_default_output_dir() -> str:
@@ -35,12 +56,20 @@ class ScreenRecorder:
         os.makedirs(videos_dir, exist_ok=True)
         return videos_dir
 
+    def session_time(self) -> float:
+        """Seconds since the capture started, the clock frame timestamps use (0 until it has started)."""
+        # The input listeners start just before the session does; perf_counter alone is time since boot
+        if self.session is None or not self.session.start_time:
+            return 0.0
+        return time.perf_counter() - self.session.start_time
+
     def on_click(self, x: int, y: int, button: mouse.Button, pressed: bool) -> None:
         if self.screen_width and self.screen_height:
-            rel_x, rel_y = x / self.screen_width, y / self.screen_height
-            self.mouse_events["click"].append({
-                "x": rel_x, "y": rel_y, "button": str(button), "pressed": pressed, "time": time.time()
-            })
+            self.events.add_click(self.session_time(), x / self.screen_width, y / self.screen_height, str(button), pressed)
+
+    def on_move(self, x: int, y: int) -> None:
+        if self.screen_width and self.screen_height:
+            self.sampler.add(x / self.screen_width, y / self.screen_height)
 
     def get_mouse_position(self) -> Tuple[float, float]:
         if self.screen_width and self.screen_height:
@@ -101,10 +130,36 @@ class ScreenRecorder:
                     "screen_height": self.screen_height
                 })
 
-            frame_interval = 1 / self.fps
             timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
             video_filename = f"ScreenKit-{timestamp}.mp4"
-            video_path = os.path.join(tempfile.gettempdir(), video_filename)
+            raw_extension = config.SPOOL_EXTENSION if self.spool else ".mp4"
+            video_path = os.path.join(tempfile.gettempdir(), f"ScreenKit-{timestamp}{raw_extension}")
+            segment_dir = None
+            if self.segment_seconds and not self.live:
+                # Raw segments and their sidecars go to their own folder, named after video_path
+                segment_dir = os.path.join(tempfile.gettempdir(), f"ScreenKit-{timestamp}-segments")
+                os.makedirs(segment_dir, exist_ok=True)
+                video_path = os.path.join(segment_dir, os.path.basename(video_path))
+            if self.live:
+                # Frames are rendered as they are captured, straight into the final video
+                os.makedirs(self.output_dir, exist_ok=True)
+                video_path = os.path.join(self.output_dir, video_filename)
+                ignored = [flag for flag, on in (("--spool", self.spool), ("--keep-raw", self.keep_raw),
+                                                 ("--dedupe", self.dedupe), ("--segment", self.segment_seconds)) if on]
+                if ignored:
+                    pprint(f"{', '.join(ignored)} ignored: live recordings keep no raw capture.", Color.YELLOW)
+
+            monitor = {"top": self.region[1], "left": self.region[0], "width": self.region[2], "height": self.region[3]} if self.region else sct.monitors[0]
+            self.enhance_params["record_region"] = monitor
+
+            if self.spool and not self.live:
+                try:
+                    bytes_per_second, seconds = check_disk_space(video_path, (monitor["width"], monitor["height"]), self.fps)
+                except OSError as e:
+                    pprint(str(e), Color.RED)
+                    return
+                pprint(f"Raw spool needs ~{bytes_per_second * 60 / 1024 ** 3:.1f} GB per minute; "
+                       f"free space allows ~{seconds / 60:.0f} minutes.", Color.CYAN)
 
             if self.countdown_time > 0:
                 try:
@@ -114,66 +169,111 @@ class ScreenRecorder:
                     pprint("\nRecording cancelled.")
                     if os.path.isfile(video_path):
                         os.remove(video_path)
+                    if segment_dir:
+                        shutil.rmtree(segment_dir, ignore_errors=True)
                     return
 
             print(Color.CYAN + "\r[ScreenKit] - Recording started!                  ", end="", flush=True)
-            monitor = {"top": self.region[1], "left": self.region[0], "width": self.region[2], "height": self.region[3]} if self.region else sct.monitors[0]
-            self.enhance_params["record_region"] = monitor
 
-            fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-            video_writer = None
+            def make_live_sink(size: Tuple[int, int]) -> LiveRenderSink:
+                self.live_sink = LiveRenderSink(video_path, self.fps, size, self.enhance_params, self.events,
+                                                self.metrics)
+                return self.live_sink
+
+            output_path = os.path.join(self.output_dir, video_filename)
+            enhancer = SegmentEnhancer(output_path, self.events, self.enhance_params) if segment_dir else None
+            session = self.session = CaptureSession(monitor, self.fps, video_path, buffer_mb=self.buffer_mb,
+                                                    metrics=self.metrics, dedupe=self.dedupe and not self.live,
+                                                    writer_options=config.CAPTURE_WRITER_OPTIONS,
+                                                    sink=make_live_sink if self.live else None,
+                                                    segment_seconds=self.segment_seconds if segment_dir else 0,
+                                                    on_segment=enhancer.submit if enhancer else None)
+            # Shared with the session, so finished segments can be sliced out while it still appends
+            self.events.frame_times = session.frame_times
+            self.events.repeat_times = session.repeat_times
+            self.events.metadata.update(screen={"width": self.screen_width, "height": self.screen_height},
+                                        record_region=monitor)
+            # Moves only arrive when the pointer moves, so seed where it rests at the start
+            self.sampler.add(*self.get_mouse_position(), t=0.0)
 
             with keyboard.Listener(on_press=self.on_key_press) as key_listener, \
-                 mouse.Listener(on_click=self.on_click) as mouse_listener:
+                 mouse.Listener(on_click=self.on_click, on_move=self.on_move) as mouse_listener:
 
-                start_time = time.time()
+                session.start()
                 try:
                     while not self.stop_recording:
-                        loop_start = time.time()
-
-                        screenshot = sct.grab(monitor)
-                        frame = cv2.cvtColor(np.array(screenshot), cv2.COLOR_BGRA2BGR)
-
-                        if video_writer is None:
-                            height, width, _ = frame.shape
-                            video_writer = cv2.VideoWriter(video_path, fourcc, self.fps, (width, height))
-
-                        video_writer.write(frame)
-
-                        rel_x, rel_y = self.get_mouse_position()
-                        current_time = time.time() - start_time
-                        self.mouse_events["move"].append({
-                            "x": rel_x, "y": rel_y, "time": current_time
-                        })
-
-                        print(Color.CYAN + f"\r[ScreenKit] - Elapsed Time: {current_time:.2f} seconds", end="", flush=True)
-
-                        time.sleep(max(0, frame_interval - (time.time() - loop_start)))
+                        print(Color.CYAN + f"\r[ScreenKit] - {session.status()}", end="", flush=True)
+                        time.sleep(0.25)
+                    session.stop()
 
                 except KeyboardInterrupt:
+                    session.stop()
                     print("\nRecording cancelled.")
                     if os.path.isfile(video_path):
                         os.remove(video_path)
+                    if enhancer is not None:
+                        enhancer.cancel()
+                        shutil.rmtree(segment_dir, ignore_errors=True)
                     return
 
-            if video_writer:
-                video_writer.release()
-
+            print(Color.CYAN + f"\r[ScreenKit] - {session.status()}", end="", flush=True)
             print()
+            if session.dropped:
+                pprint(f"{session.dropped} frames were dropped because encoding fell behind.", Color.YELLOW)
+            pprint_table("Capture Pacing", session.pacer.report())
+            self.metrics.attach("pacing", dict(session.pacer.report(), dropped=session.dropped,
+                                               ring_high_water=session.ring.high_water if session.ring else 0))
+            self.sampler.flush()
+            self.metrics.attach("cursor_sampling", self.sampler.stats())
+            if self.dedupe and not self.live:
+                pprint(f"{len(session.repeat_times)} unchanged frames were recorded as repeats instead of being encoded.",
+                       Color.CYAN)
+
+            if self.live:
+                if self.live_sink is not None:
+                    pprint_table("Live Render", self.live_sink.stats())
+                    self.metrics.attach("live", self.live_sink.stats())
+                if self.enhance_params.get("profile"):
+                    pprint(f"Profile written to {self.metrics.write(profile_path(video_path))}", Color.CYAN)
+                pprint(f"The result video is available at {video_path}", Color.GREEN)
+                return video_path
+
+            if enhancer is not None:
+                pprint(f"Recording stopped. Finishing {enhancer.pending()} of {len(enhancer.jobs)} segments...",
+                       Color.GREEN)
+                try:
+                    output_path = enhancer.finish()
+                except BaseException:
+                    pprint(f"Enhancing failed; the raw segments and their sidecars are kept in {segment_dir}", Color.RED)
+                    raise
+                self.metrics.attach("segments", {"segments": len(enhancer.jobs),
+                                                 "wait_after_stop_s": round(enhancer.wait_seconds, 3)})
+                if self.enhance_params.get("profile"):
+                    pprint(f"Profile written to {self.metrics.write(profile_path(output_path))}", Color.CYAN)
+                if self.keep_raw:
+                    pprint(f"Raw segments and sidecars kept in {segment_dir}", Color.CYAN)
+                else:
+                    shutil.rmtree(segment_dir, ignore_errors=True)
+                pprint(f"The result video is available at {output_path}", Color.GREEN)
+                return output_path
+
             pprint(f"Recording stopped. Enhancing video...", Color.GREEN)
 
-            json_path = get_data_path(video_path)
-            self.save_json_data(json_path)
+            data_path = self.events.save(get_data_path(video_path))
 
-            output_path = os.path.join(self.output_dir, video_filename)
             output_path = enhance(
                 video_path=video_path,
                 output_path=output_path,
-                data_path=json_path,
-                enhance_params=self.enhance_params
+                data_path=data_path,
+                enhance_params=self.enhance_params,
+                metrics=self.metrics
             )
 
-            os.remove(json_path)
+            if self.keep_raw:
+                pprint(f"Raw recording kept at {video_path} (sidecar {data_path})", Color.CYAN)
+            else:
+                os.remove(data_path)
+                os.remove(video_path)
             pprint(f"The result video is available at {output_path}", Color.GREEN)
             return output_path
 
@@ -187,11 +287,16 @@ class ScreenRecorder:
         return True
 
     def save_json_data(self, json_path: str) -> None:
+        """Write the legacy JSON sidecar, for tools that have not moved to `.npz`."""
         with open(json_path, "w") as f:
-            json.dump(self.mouse_events, f)
+            json.dump(self.events.to_dict(), f)
 
 
 def record_screen(output_dir: Optional[str] = None, region: Optional[Tuple[int, int, int, int]] = None,
-           fps: int = 30, countdown_time: int = 3, output_raw: bool = False, enhance_params: Dict = {}) -> str:
-    recorder = ScreenRecorder(output_dir, region, fps, countdown_time, output_raw, enhance_params)
+           fps: int = 30, countdown_time: int = 3, output_raw: bool = False, enhance_params: Dict = {},
+           spool: bool = False, keep_raw: bool = False, cursor_rate: float = config.DEFAULT_CURSOR_RATE,
+           dedupe: bool = False, live: bool = False, segment_seconds: float = config.DEFAULT_SEGMENT_SECONDS) -> str:
+    recorder = ScreenRecorder(output_dir, region, fps, countdown_time, output_raw, enhance_params,
+                              spool=spool, keep_raw=keep_raw, cursor_rate=cursor_rate, dedupe=dedupe, live=live,
+                              segment_seconds=segment_seconds)
     return recorder.record()
\ No newline at end of file
@@ -3,11 +3,11 @@ import json
 from pathlib import Path
 
 import click
-from PIL import Image
 
-from screenkit.record import record_screen
-from screenkit.utils import pprint, pprint_table, Color
-from screenkit.trim import trim_video
+# Only light modules load here; each command imports what it needs (OpenCV,
+# NumPy, PIL, the input listeners) so `--help`, `background` and `cache` stay
+# fast, and nothing touches a display unless it records.
+from screenkit.utils import pprint, pprint_table, Color, find_sidecar
 from screenkit import config
 
 CACHE_FILE = Path("video_cache.json")
@@ -32,6 +32,17 @@ def parse_padding(ctx, param, value):
     except ValueError:
         raise click.BadParameter("Padding must be a number.")
 
+def parse_time_ranges(ctx, param, value):
+    """Parse repeated START-END options (seconds; END may be left out for 'until the end')."""
+    ranges = []
+    for item in value:
+        try:
+            start, end = item.split('-', 1)
+            ranges.append((float(start or 0), float(end) if end else None))
+        except ValueError:
+            raise click.BadParameter(f"'{item}' is not a START-END range in seconds")
+    return ranges
+
 def save_to_cache(output_path):
     """Saves the output path to the cache file."""
     if not os.path.isdir(config.DEFAULT_CACHE_DIR):
@@ -44,7 +55,7 @@ def save_to_cache(output_path):
 def load_from_cache():
     """Loads the output path from the cache file."""
     cache_path = os.path.join(config.DEFAULT_CACHE_DIR, CACHE_FILE)
-    if not cache_path.exists():
+    if not os.path.exists(cache_path):
         raise FileNotFoundError("Cache file not found.")
     with open(cache_path, 'r') as f:
         return json.load(f).get("output_path")
@@ -63,59 +74,200 @@ def cli():
           """)
     pprint("Welcome to ScreenKit CLI!", color=Color.CYAN, bold=True)
 
+def enhance_options(func):
+    """Options shared by every command that renders through `enhance`."""
+    options = [
+        click.option('-p', '--padding', callback=parse_padding, default=config.DEFAULT_PADDING, help=f"Padding for the beautified result (default: {config.DEFAULT_PADDING})"),
+        click.option('-b', '--background', type=str, default=config.DEFAULT_BACKGROUND, help=f"Background color for the recording (default: {config.DEFAULT_BACKGROUND})"),
+        click.option('--macos-titlebar', is_flag=True, help="Make the titlebar look like MacOS"),
+        click.option('--border-radius', type=float, default=config.DEFAULT_BORDER_RADIUS, help=f"Border radius for the recording (default: {config.DEFAULT_BORDER_RADIUS})"),
+        click.option('--cursor-scale', type=float, default=config.DEFAULT_CURSOR_SCALE, help=f"Cursor scale (default: {config.CURSOR_SCALE})"),
+        click.option('--shadow-blur', type=int, default=config.DEFAULT_SHADOW_BLUR, help=f"Shadow blur radius (default: {config.DEFAULT_SHADOW_BLUR})"),
+        click.option('--shadow-opacity', type=float, default=config.DEFAULT_SHADOW_OPACITY, help=f"Shadow opacity (default: {config.DEFAULT_SHADOW_OPACITY})"),
+        click.option('--workers', type=click.IntRange(min=0), default=config.DEFAULT_WORKERS, help=f"Compose worker threads for enhancing, 0 to render on a single thread (default: {config.DEFAULT_WORKERS})"),
+        click.option('--chunks', type=click.IntRange(min=1), default=1, help="Split one video into this many frame ranges rendered in parallel processes (default: 1)"),
+        click.option('--queue-depth', type=click.IntRange(min=1), default=config.DEFAULT_QUEUE_DEPTH, help=f"Frames buffered between enhance pipeline stages (default: {config.DEFAULT_QUEUE_DEPTH})"),
+        click.option('--writer', type=click.Choice(config.WRITER_BACKENDS), default=config.DEFAULT_WRITER, help="Encoder backend for the output; auto uses ffmpeg when installed, else OpenCV (default: auto)"),
+        click.option('--crf', type=click.IntRange(0, 51), default=config.DEFAULT_CRF, help=f"Quality for the ffmpeg writer, lower is better (default: {config.DEFAULT_CRF})"),
+        click.option('--preset', default=config.DEFAULT_PRESET, help=f"Speed preset for the ffmpeg writer (default: {config.DEFAULT_PRESET})"),
+        click.option('--encoder-threads', type=click.IntRange(min=0), default=0, help="Threads for the ffmpeg writer, 0 for automatic (default: 0)"),
+        click.option('--profile', is_flag=True, help="Write per-stage timings, cache hit rates and memory peaks to <output>.profile.json"),
+        click.option('--no-plate-cache', is_flag=True, help=f"Rebuild the background and shadow instead of using the cache in {config.PLATE_CACHE_DIR}"),
+        click.option('--no-static-skip', is_flag=True, help="Render every frame, even when it is identical to the previous one"),
+        click.option('--static-threshold', type=click.IntRange(0, 255), default=0, help="Largest per-pixel difference still treated as an unchanged frame (default: 0, exact)"),
+    ]
+    for option in reversed(options):
+        func = option(func)
+    return func
+
+def build_enhance_params(padding, background, macos_titlebar, border_radius, cursor_scale, shadow_blur, shadow_opacity, workers, chunks, queue_depth, writer, crf, preset, encoder_threads, profile, no_plate_cache, no_static_skip, static_threshold, **extra):
+    return {
+        "padding": padding,
+        "background": background,
+        "macos_titlebar": macos_titlebar,
+        "border_radius": border_radius,
+        "cursor_scale": cursor_scale,
+        "shadow_blur": shadow_blur,
+        "shadow_opacity": shadow_opacity,
+        "workers": workers,
+        "chunks": chunks,
+        "queue_depth": queue_depth,
+        "writer": writer,
+        "writer_options": {"crf": crf, "preset": preset, "threads": encoder_threads},
+        "plate_cache": not no_plate_cache,
+        "static_skip": not no_static_skip,
+        "static_threshold": static_threshold,
+        "profile": profile,
+        **extra
+    }
+
 @cli.command()
 @click.option('-o', '--output', help="Output folder for screenshots and video", default=config.DEFAULT_OUTPUT_DIR)
 @click.option('-r', '--region', callback=parse_region, help="Screen region to capture (x,y,width,height) or custom. Full screen if not set")
 @click.option('-f', '--fps', type=int, default=config.DEFAULT_FPS, help=f"Frames per second (default: {config.DEFAULT_FPS})")
-@click.option('-p', '--padding', callback=parse_padding, default=config.DEFAULT_PADDING, help=f"Padding for the beautified result (default: {config.DEFAULT_PADDING})")
-@click.option('-b', '--background', type=str, default=config.DEFAULT_BACKGROUND, help=f"Background color for the recording (default: {config.DEFAULT_BACKGROUND})")
 @click.option('-w', '--webcam', type=str, default=config.DEFAULT_WEBCAM, help=f"Webcam id to be used (default: {config.DEFAULT_WEBCAM})")
-@click.option('--macos-titlebar', is_flag=True, help="Make the titlebar look like MacOS")
-@click.option('--border-radius', type=float, default=config.DEFAULT_BORDER_RADIUS, help=f"Border radius for the recording (default: {config.DEFAULT_BORDER_RADIUS})")
-@click.option('--cursor-scale', type=float, default=config.DEFAULT_CURSOR_SCALE, help=f"Cursor scale (default: {config.CURSOR_SCALE})")
-@click.option('--shadow-blur', type=int, default=config.DEFAULT_SHADOW_BLUR, help=f"Shadow blur radius (default: {config.DEFAULT_SHADOW_BLUR})")
-@click.option('--shadow-opacity', type=float, default=config.DEFAULT_SHADOW_OPACITY, help=f"Shadow opacity (default: {config.DEFAULT_SHADOW_OPACITY})")
 @click.option('--output-raw', is_flag=True, help="Output file for raw recording data")
 @click.option('--countdown', type=int, default=config.DEFAULT_COUNTDOWN, help=f"Countdown time before starting the recording in seconds (default: {config.DEFAULT_COUNTDOWN})")
-def record(output, region, fps, padding, background, webcam, macos_titlebar, border_radius, cursor_scale, shadow_blur, shadow_opacity, output_raw, countdown):
+@click.option('--spool', is_flag=True, help="Capture to a lossless raw spool file instead of an intermediate mp4")
+@click.option('--keep-raw', is_flag=True, help="Keep the raw capture and its sidecar for re-rendering with 'screenkit enhance'")
+@click.option('--cursor-rate', type=click.FloatRange(min=0), default=config.DEFAULT_CURSOR_RATE, help=f"Max cursor samples per second, 0 for every move (default: {config.DEFAULT_CURSOR_RATE})")
+@click.option('--dedupe', is_flag=True, help="Record unchanged frames as repeats instead of encoding them again (saves CPU and disk on idle screens)")
+@click.option('--live', is_flag=True, help="Render the final video while recording, so it is ready as soon as recording stops")
+@click.option('--segment', 'segment_seconds', type=click.FloatRange(min=0), default=config.DEFAULT_SEGMENT_SECONDS, help="Rotate the capture to a new file every SECONDS and enhance finished segments while recording (0 for one file)")
+@enhance_options
+def record(output, region, fps, webcam, output_raw, countdown, spool, keep_raw, cursor_rate, dedupe, live, segment_seconds,
+           **enhance_args):
     """Start screen recording with specified options."""
+    from screenkit.record import record_screen
+
+    padding = enhance_args["padding"]
     settings = {
         "Output folder": output,
         "Region": region if region else "Full screen",
         "FPS": fps,
         "Padding": f"{padding * 100}%" if 0 <= padding <= 1.0 else padding,
-        "Background color": background,
-        "Shadow blur": shadow_blur,
-        "Shadow opacity": shadow_opacity,
-        "Border radius": border_radius,
-        "Raw output file": output_raw
+        "Background color": enhance_args["background"],
+        "Shadow blur": enhance_args["shadow_blur"],
+        "Shadow opacity": enhance_args["shadow_opacity"],
+        "Border radius": enhance_args["border_radius"],
+        "Raw output file": output_raw,
+        "Enhance workers": enhance_args["workers"] or "Single thread",
+        "Intermediate format": "Raw spool" if spool else "mp4",
+        "Skip unchanged frames": dedupe,
+        "Live render": live,
+        "Segments": f"every {segment_seconds:g}s" if segment_seconds else "Off"
     }
 
     pprint_table("Recording Settings", settings, color=Color.GREEN)
 
-    enhance_params = {
-        "padding": padding,
-        "background": background,
-        "webcam": webcam,
-        "macos_titlebar": macos_titlebar,
-        "border_radius": border_radius,
-        "cursor_scale": cursor_scale,
-        "shadow_blur": shadow_blur,
-        "shadow_opacity": shadow_opacity
-    }
+    enhance_params = build_enhance_params(**enhance_args, webcam=webcam)
 
     pprint("Starting screen recording. Please wait...", color=Color.CYAN, bold=True)
-    output_path = record_screen(output, region, fps, countdown, output_raw=output_raw, enhance_params=enhance_params)
+    output_path = record_screen(output, region, fps, countdown, output_raw=output_raw, enhance_params=enhance_params,
+                                spool=spool, keep_raw=keep_raw, cursor_rate=cursor_rate,
+                                dedupe=dedupe, live=live, segment_seconds=segment_seconds)
 
     # Save the output path to cache after recording
     save_to_cache(output_path)
 
 
+@cli.command()
+@click.argument('inputs', nargs=-1, required=True)
+@click.option('-d', '--data', 'data_path', type=click.Path(dir_okay=False), default=None, help="Mouse event sidecar (default: next to each input, then the temp folder)")
+@click.option('-o', '--output', default=None, help="Output video path for a single input (default: the output folder, named after the input)")
+@click.option('--output-dir', type=click.Path(file_okay=False), default=config.DEFAULT_OUTPUT_DIR, help=f"Output folder when enhancing several inputs (default: {config.DEFAULT_OUTPUT_DIR})")
+@click.option('-j', '--jobs', type=click.IntRange(min=1), default=None, help="Worker processes for several inputs (default: one per CPU)")
+@click.option('--checkpoint-every', 'checkpoint_seconds', type=click.FloatRange(min=0), default=0, help="Commit the output in chunks of this many seconds so an interrupted render can be resumed (0 to render in one go)")
+@click.option('--resume', is_flag=True, help="Continue an interrupted checkpointed render of the same input and settings, skipping finished chunks")
+@enhance_options
+def enhance(inputs, data_path, output, output_dir, jobs, checkpoint_seconds, resume, **enhance_args):
+    """Render raw recordings (spool files or videos) into final videos.
+
+    INPUTS are video paths or glob patterns such as 'raw/*.skspool'. Several
+    inputs are rendered in parallel worker processes.
+    """
+    from screenkit.batch import expand_inputs, plan_jobs, run_batch, summarize
+
+    video_paths = expand_inputs(inputs)
+    if not video_paths:
+        pprint(f"No recordings match {' '.join(inputs)}", color=Color.RED)
+        return
+    if len(video_paths) > 1 and (output or data_path):
+        pprint("-o/--output and -d/--data apply to a single input; use --output-dir for several.", color=Color.RED)
+        return
+    enhance_params = build_enhance_params(**enhance_args, checkpoint_seconds=checkpoint_seconds, resume=resume)
+
+    if len(video_paths) == 1 and jobs is None:
+        from screenkit.enhance import enhance as enhance_video
+
+        input_path = video_paths[0]
+        data_path = data_path or find_sidecar(input_path)
+        if output is None:
+            os.makedirs(output_dir, exist_ok=True)
+            output = os.path.join(output_dir, f"{Path(input_path).stem}.mp4")
+
+        pprint(f"Enhancing {input_path}" + (f" with cursor data from {data_path}" if data_path else " without cursor data"),
+               color=Color.CYAN, bold=True)
+        try:
+            output_path = enhance_video(input_path, output, data_path, enhance_params)
+        except Exception as e:
+            pprint(f"An error occurred: {str(e)}", color=Color.RED)
+            return
+
+        save_to_cache(output_path)
+        pprint(f"The result video is available at {output_path}", color=Color.GREEN)
+        return
+
+    batch = plan_jobs(video_paths, output_dir, data_path)
+    if output and len(batch) == 1:
+        batch[0].output_path = output
+    processes = min(jobs or os.cpu_count() or 1, len(batch))
+    pprint(f"Enhancing {len(batch)} recordings with {processes} worker process(es)...", color=Color.CYAN, bold=True)
+    results = run_batch(batch, enhance_params, processes)
+
+    pprint_table("Batch Summary", summarize(results), width=36)
+    succeeded = [result for result in results if result.ok]
+    if succeeded:
+        save_to_cache(succeeded[-1].job.output_path)
+    if len(succeeded) < len(results):
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.argument('input_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('-d', '--data', 'data_path', type=click.Path(dir_okay=False), default=None, help="Mouse event sidecar (default: next to the input, then the temp folder)")
+@click.option('-o', '--output', default=None, help="Contact sheet image (.png, .jpg) or low-res clip (.mp4, ...) (default: <output folder>/<input>-preview.png)")
+@click.option('--scale', type=click.FloatRange(0.05, 1.0), default=config.PREVIEW_SCALE, help=f"Fraction of the full resolution to render at (default: {config.PREVIEW_SCALE})")
+@click.option('--at', 'timestamps', type=click.FloatRange(min=0), multiple=True, help="Preview the frame this many seconds in; repeat for several")
+@click.option('--stride', type=click.IntRange(min=1), default=None, help="Preview every Nth frame")
+@click.option('--frames', 'count', type=click.IntRange(min=1), default=config.PREVIEW_FRAMES, help=f"Frames spread over the recording when neither --at nor --stride is given (default: {config.PREVIEW_FRAMES})")
+@enhance_options
+def preview(input_path, data_path, output, scale, timestamps, stride, count, **enhance_args):
+    """Render a quick low-resolution draft of a recording, for trying out enhance settings."""
+    from screenkit.preview import render_preview
+
+    data_path = data_path or find_sidecar(input_path)
+    if output is None:
+        output = os.path.join(config.DEFAULT_OUTPUT_DIR, f"{Path(input_path).stem}-preview.png")
+    try:
+        render_preview(input_path, output, data_path, build_enhance_params(**enhance_args), scale=scale, stride=stride,
+                       timestamps=timestamps, count=count)
+    except Exception as e:
+        pprint(f"An error occurred: {str(e)}", color=Color.RED)
+        return
+    pprint(f"The preview is available at {output}", color=Color.GREEN)
+
 @cli.command()
 @click.option('-s', '--start-time', type=float, default=0, help="Start time for trimming in seconds.")
 @click.option('-e', '--end-time', type=float, default=None, help="End time for trimming in seconds.")
-def trim(start_time, end_time):
+@click.option('-k', '--keep', multiple=True, callback=parse_time_ranges, help="Range to keep as START-END seconds; repeatable, replaces -s/-e")
+@click.option('-c', '--cut', multiple=True, callback=parse_time_ranges, help="Range to remove as START-END seconds; repeatable")
+@click.option('--writer', type=click.Choice(config.WRITER_BACKENDS), default=config.DEFAULT_WRITER, help="Encoder backend for the trimmed video (default: auto)")
+@click.option('--crf', type=click.IntRange(0, 51), default=config.DEFAULT_CRF, help=f"Quality for the ffmpeg writer, lower is better (default: {config.DEFAULT_CRF})")
+def trim(start_time, end_time, keep, cut, writer, crf):
     """Trim the recorded video based on start and end times."""
+    from screenkit.trim import trim_video
+
     try:
         video_path = load_from_cache()
         if not video_path:
@@ -124,11 +276,14 @@ def trim(start_time, end_time):
         if not os.path.isfile(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
 
-        pprint(f"Trimming video from {start_time}s to {end_time}s...", color=Color.CYAN, bold=True)
+        kept = ", ".join(f"{start}s to {f'{end}s' if end is not None else 'the end'}" for start, end in keep) \
+            or f"{start_time}s to {end_time}s"
+        removed = f" without {', '.join(f'{start}s to {end}s' for start, end in cut)}" if cut else ""
+        pprint(f"Trimming video to {kept}{removed}...", color=Color.CYAN, bold=True)
 
         # Replace the original video with the trimmed video
-        temp_file = trim_video(video_path, start_time, end_time)
-        os.replace(temp_file, video_path)
+        trim_video(video_path, start_time, end_time, keep=keep, cut=cut, output_path=video_path,
+                   writer=writer, writer_options={"crf": crf})
 
         pprint(f"Trimmed video saved to {video_path}.", color=Color.GREEN)
 
@@ -161,6 +316,8 @@ def list():
 @click.argument('wallpaper', type=str)
 def show(wallpaper):
     """Show a specific wallpaper."""
+    from PIL import Image
+
     try:
         wallpaper_path = Path(__file__).parent / config.BACKGROUND_MAP.get(wallpaper, "")
         img = Image.open(wallpaper_path)
@@ -171,5 +328,31 @@ def show(wallpaper):
     except Exception as e:
         pprint(f"An error occurred: {str(e)}", color=Color.RED)
 
+@cli.group()
+def cache():
+    """Manage the cache of prepared background plates"""
+    pass
+
+@cache.command()
+def stats():
+    """Show how many background plates are cached and their total size."""
+    from screenkit.plate_cache import PlateCache
+
+    stats = PlateCache().stats()
+    pprint_table("Plate Cache", {
+        "Directory": stats["directory"],
+        "Entries": stats["entries"],
+        "Size": f"{stats['bytes'] / 1024 ** 2:.1f} MB",
+        "Limit": f"{stats['max_bytes'] / 1024 ** 2:.0f} MB",
+    })
+
+@cache.command()
+def clear():
+    """Delete every cached background plate."""
+    from screenkit.plate_cache import PlateCache
+
+    removed = PlateCache().clear()
+    pprint(f"Removed {removed} cached plate{'s' if removed != 1 else ''}.", color=Color.GREEN)
+
 if __name__ == "__main__":
     cli()
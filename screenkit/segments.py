@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from tqdm import tqdm
+
+from screenkit import config
+from screenkit.batch import EnhanceJob, JobResult, run_job
+from screenkit.chunked import chunk_format, join_method, join_segments
+from screenkit.events import EventStore
+from screenkit.utils import pprint, Color
+
+
+class SegmentEnhancer:
+    """Enhances the finished segments of a rotating capture while recording goes on, then joins them.
+
+    `submit` is the `CaptureSession(on_segment=...)` callback: it saves the
+    segment's slice of `events` as a sidecar next to the raw segment and
+    queues the render on a background worker process. Raw segments and their
+    sidecars are complete as soon as they are submitted, so if the session
+    dies everything up to the last rotation can still be rendered with
+    `screenkit enhance`. `finish` waits for the renders still running, which
+    after stop is usually only the last segment, and joins them into
+    `output_path` the same way chunked renders are joined.
+    """
+
+    def __init__(self, output_path: str, events: EventStore, enhance_params: Dict[str, Any], workers: int = 1):
+        self.output_path = output_path
+        self.events = events
+        self.method = join_method(output_path, enhance_params.get("writer", config.DEFAULT_WRITER))
+        self.extension, writer, writer_options = chunk_format(self.method)
+        self.enhance_params = enhance_params
+        # Render segments with the writer they are joined from: stream-copyable, or compact and lossless
+        # (HuffYUV) when they are encoded once at the end, since they pile up until recording stops
+        self.segment_params = {**enhance_params, "chunks": 1, "writer": writer}
+        if writer != "ffmpeg":
+            self.segment_params["writer_options"] = writer_options
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        self.render_dir = tempfile.mkdtemp(prefix="screenkit-segments-", dir=os.path.dirname(os.path.abspath(output_path)))
+        # Spawned rather than forked: the recorder has capture and input listener threads running
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        self.jobs: List[Tuple[EnhanceJob, Future]] = []
+        self.wait_seconds = 0.0
+
+    def submit(self, index: int, raw_path: str, start: float, end: float) -> None:
+        data_path = self.events.slice(start, end).save(os.path.splitext(raw_path)[0] + config.SIDECAR_EXTENSION)
+        job = EnhanceJob(raw_path, os.path.join(self.render_dir, f"segment-{index:04d}{self.extension}"), data_path)
+        self.jobs.append((job, self.pool.submit(run_job, index, job, self.segment_params)))
+
+    def pending(self) -> int:
+        return sum(not future.done() for _, future in self.jobs)
+
+    def finish(self, quiet: bool = False) -> str:
+        """Wait for every segment render, join them into `output_path` and return it."""
+        started = time.perf_counter()
+        results: List[JobResult] = []
+        try:
+            with tqdm(total=len(self.jobs), initial=len(self.jobs) - self.pending(), desc="Enhancing segments",
+                      unit="segment", disable=quiet) as pbar:
+                for job, future in self.jobs:
+                    done = future.done()
+                    results.append(future.result())
+                    if not done:
+                        pbar.update(1)
+            self.pool.shutdown()
+            failed = [result for result in results if not result.ok]
+            if failed:
+                raise RuntimeError(f"Enhancing {failed[0].job.video_path} failed: {failed[0].error}")
+            if not results:
+                raise RuntimeError("No frames were captured")
+            if not quiet:
+                pprint(f"Joining {len(results)} segments ({self.method})...", Color.CYAN)
+            join_segments([result.job.output_path for result in results], self.output_path, self.method,
+                          self.enhance_params, quiet)
+        finally:
+            self.cancel()
+        self.wait_seconds = time.perf_counter() - started
+        return self.output_path
+
+    def cancel(self) -> None:
+        """Drop queued renders and remove the rendered segments."""
+        for _, future in self.jobs:
+            future.cancel()
+        self.pool.shutdown()
+        shutil.rmtree(self.render_dir, ignore_errors=True)
@@ -0,0 +1,180 @@
+import os
+import shutil
+import struct
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from screenkit import config
+
+# magic, version, width, height, channels, fps, frame count, header size
+HEADER_FORMAT = "<8sHIIHdQI"
+MAGIC = b"SKSPOOL\x00"
+VERSION = 1
+HEADER_SIZE = 4096  # keeps the frame data page aligned for mmap
+FRAME_COUNT_OFFSET = struct.calcsize("<8sHIIHd")
+
+
+def is_spool(path: str) -> bool:
+    """True if `path` is a raw frame spool, judged by its magic bytes."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def estimate_spool_bytes(size: Tuple[int, int], fps: float, seconds: float, channels: int = 3) -> int:
+    width, height = size
+    return HEADER_SIZE + int(width * height * channels * fps * seconds)
+
+
+def check_disk_space(path: str, size: Tuple[int, int], fps: float, min_seconds: float = 60) -> Tuple[int, float]:
+    """Return (bytes per second, seconds of recording that fit) for a spool at `path`.
+
+    Raises OSError when less than `min_seconds` of recording would fit.
+    """
+    bytes_per_second = estimate_spool_bytes(size, fps, 1) - HEADER_SIZE
+    free = shutil.disk_usage(os.path.dirname(os.path.abspath(path))).free
+    seconds = free / bytes_per_second
+    if seconds < min_seconds:
+        raise OSError(f"Only {free / 1024 ** 3:.1f} GB free for the spool file, enough for {seconds:.0f}s "
+                      f"of raw frames at {bytes_per_second / 1024 ** 2:.0f} MB/s.")
+    return bytes_per_second, seconds
+
+
+class SpoolWriter:
+    """Lossless raw BGR frame file with a small header, a drop-in for `cv2.VideoWriter`.
+
+    Frames go straight to disk through a large write buffer; the frame count in
+    the header is filled in on `release`, and readers fall back to the file size
+    if a recording was interrupted before that.
+    """
+
+    def __init__(self, path: str, fps: float, size: Tuple[int, int], channels: int = 3,
+                 buffer_size: int = config.SPOOL_WRITE_BUFFER):
+        self.path = path
+        self.fps = fps
+        self.width, self.height = size
+        self.channels = channels
+        self.frame_count = 0
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(self._header().ljust(HEADER_SIZE, b"\0"))
+
+    def _header(self) -> bytes:
+        return struct.pack(HEADER_FORMAT, MAGIC, VERSION, self.width, self.height, self.channels,
+                           self.fps, self.frame_count, HEADER_SIZE)
+
+    def isOpened(self) -> bool:
+        return not self._file.closed
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame.shape != (self.height, self.width, self.channels) or frame.dtype != np.uint8:
+            raise ValueError(f"Expected a {self.width}x{self.height}x{self.channels} uint8 frame, got {frame.shape} {frame.dtype}")
+        self._file.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+        self.frame_count += 1
+
+    def release(self) -> None:
+        if self._file.closed:
+            return
+        self._file.flush()
+        self._file.seek(FRAME_COUNT_OFFSET)
+        self._file.write(struct.pack("<Q", self.frame_count))
+        self._file.close()
+
+
+class SpoolReader:
+    """Memory-mapped view of a spool file, duck-typed like `cv2.VideoCapture`.
+
+    `read` returns read-only views into the mapping, so frames reach the
+    renderer without a decode or copy.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            header = f.read(struct.calcsize(HEADER_FORMAT))
+        magic, version, width, height, channels, fps, frame_count, header_size = struct.unpack(HEADER_FORMAT, header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a ScreenKit spool file: {path}")
+
+        frame_bytes = width * height * channels
+        stored = (os.path.getsize(path) - header_size) // frame_bytes
+        frame_count = min(frame_count, stored) if frame_count else stored
+
+        self.path = path
+        self.header_size = header_size
+        self.width, self.height, self.channels = width, height, channels
+        self.fps = fps
+        self.frames = np.memmap(path, dtype=np.uint8, mode="r", offset=header_size,
+                                shape=(frame_count, height, width, channels)) if frame_count else \
+            np.empty((0, height, width, channels), dtype=np.uint8)
+        self.position = 0
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def isOpened(self) -> bool:
+        return self.frames is not None
+
+    def get(self, prop: int) -> float:
+        return {
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_FRAME_COUNT: len(self.frames),
+            cv2.CAP_PROP_POS_FRAMES: self.position,
+        }.get(prop, 0)
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop != cv2.CAP_PROP_POS_FRAMES:
+            return False
+        self.position = int(np.clip(value, 0, len(self.frames)))
+        return True
+
+    def grab(self) -> bool:
+        if self.frames is None or self.position >= len(self.frames):
+            return False
+        self.position += 1
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.frames is None or self.position >= len(self.frames):
+            return False, None
+        frame = self.frames[self.position]
+        self.position += 1
+        return True, frame
+
+    def release(self) -> None:
+        self.frames = None
+
+
+def concat_spools(paths: List[str], output_path: str, chunk_size: int = config.SPOOL_WRITE_BUFFER) -> int:
+    """Join spool files with the same frame geometry into one, copying frame data as is. Returns the frame count."""
+    readers = [SpoolReader(path) for path in paths]
+    first = readers[0]
+    writer = SpoolWriter(output_path, first.fps, (first.width, first.height), first.channels)
+    try:
+        for reader in readers:
+            if (reader.width, reader.height, reader.channels) != (first.width, first.height, first.channels):
+                raise ValueError(f"{reader.path} is {reader.width}x{reader.height}, expected {first.width}x{first.height}")
+            remaining = len(reader) * reader.width * reader.height * reader.channels
+            with open(reader.path, "rb") as f:
+                f.seek(reader.header_size)
+                while remaining:
+                    data = f.read(min(chunk_size, remaining))
+                    if not data:
+                        break
+                    writer._file.write(data)
+                    remaining -= len(data)
+            writer.frame_count += len(reader)
+            reader.release()
+    finally:
+        writer.release()
+    return writer.frame_count
+
+
+def open_video(path: str):
+    """Open a spool file or any container OpenCV can decode."""
+    return SpoolReader(path) if is_spool(path) else cv2.VideoCapture(str(path))
+
@@ -1,45 +1,114 @@
 import os
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 import tempfile
 import cv2
+import numpy as np
 
+from screenkit import config
+from screenkit.events import load_events
+from screenkit.spool import open_video
+from screenkit.writers import open_writer
 
-def trim_video(video_path: str, start_time: float = 0, end_time: Optional[float] = None) -> str:
+# Skipping up to this many frames is cheaper than seeking back to a keyframe and decoding forward
+SEEK_GAP = 32
+
+Range = Tuple[float, Optional[float]]
+
+
+def keep_frames(total_frames: int, fps: float, keep: Sequence[Range], cut: Sequence[Range] = ()) -> np.ndarray:
+    """Sorted indices of the frames to keep, given half-open [start, end) ranges in seconds.
+
+    An end of None means the end of the video. Overlapping ranges are merged,
+    and `cut` ranges are removed from whatever `keep` selects.
+    """
+    def mask(ranges: Sequence[Range]) -> np.ndarray:
+        selected = np.zeros(total_frames, dtype=bool)
+        for start, end in ranges:
+            first = max(int(start * fps), 0)
+            last = total_frames if end is None else min(int(end * fps), total_frames)
+            selected[first:last] = True
+        return selected
+
+    return np.flatnonzero(mask(keep) & ~mask(cut))
+
+
+def seek_frames(cap, indices: Sequence[int]) -> Iterator[np.ndarray]:
+    """Yield the frames at `indices` (ascending, repeats allowed), seeking over long gaps."""
+    position, frame, frame_index = 0, None, -1
+    for index in indices:
+        if index != frame_index:
+            if not position <= index <= position + SEEK_GAP:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+                position = index
+            while position < index:
+                cap.grab()
+                position += 1
+            ret, frame = cap.read()
+            if not ret:
+                return
+            position, frame_index = index + 1, index
+        yield frame
+
+
+def trim_video(video_path: str, start_time: float = 0, end_time: Optional[float] = None,
+               data_path: Optional[str] = None, keep: Optional[List[Range]] = None,
+               cut: Optional[List[Range]] = None, output_path: Optional[str] = None,
+               writer: str = config.DEFAULT_WRITER, writer_options: Optional[Dict[str, Any]] = None) -> str:
+    """Cut `video_path` down to the given time ranges in a single pass.
+
+    Keeps [start_time, end_time) unless `keep` ranges are given, minus any
+    `cut` ranges. Only kept frames are decoded: the reader seeks straight to
+    each range. The result goes to a unique temporary file; with `output_path`
+    it then atomically replaces that path, otherwise the temporary path is
+    returned. Pass the recording's `data_path` sidecar to trim a raw
+    deduplicated capture, whose repeat entries are expanded back into frames.
+    `writer` and `writer_options` select the encoder (see `open_writer`).
+    """
    # Open the video file
-    cap = cv2.VideoCapture(str(video_path))
+    cap = open_video(video_path)
     if not cap.isOpened():
         raise RuntimeError(f"Error opening video file: {video_path}")
 
     # Get video properties
     fps = cap.get(cv2.CAP_PROP_FPS)
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
-    # Create a VideoWriter object for the output video
-    temp_file = os.path.join(tempfile.gettempdir(), "temp.mp4")
-    out = cv2.VideoWriter(str(temp_file), fourcc, fps, (width, height))
-
-    # Calculate the start and end frames
-    start_frame = int(start_time * fps)
-    if end_time is None:
-        end_frame = total_frames
-    else:
-        end_frame = int(end_time * fps)
-
-    # Read and write the video frames to the output file
-    frame_number = 0
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if start_frame <= frame_number <= end_frame:
-            out.write(frame)
-        frame_number += 1
-        if frame_number > end_frame:
-            break
-
-    cap.release()
-    out.release()
-    return temp_file
\ No newline at end of file
+    # Deduplicated captures expand back to one frame per capture tick
+    _, sources = load_events(data_path).frame_schedule()
+    if sources is not None:
+        total_frames = len(sources)
+
+    indices = keep_frames(total_frames, fps, keep or [(start_time, end_time)], cut or [])
+    if sources is not None:
+        indices = sources[indices]
+    if not len(indices):
+        # Replacing the recording with an empty video would lose it
+        cap.release()
+        raise ValueError("No frames fall inside the ranges to keep; the video was left unchanged")
+
+    # Write next to the destination so the final rename stays on one filesystem
+    target = output_path or video_path
+    directory = os.path.dirname(os.path.abspath(output_path)) if output_path else tempfile.gettempdir()
+    fd, temp_file = tempfile.mkstemp(prefix="screenkit-trim-", suffix=os.path.splitext(target)[1], dir=directory)
+    os.close(fd)
+
+    try:
+        out = open_writer(temp_file, fps, (width, height), writer, writer_options)
+        try:
+            for frame in seek_frames(cap, indices):
+                out.write(frame)
+        finally:
+            # Flushing can fail too (an ffmpeg writer exiting non-zero), so it counts as part of the write
+            out.release()
+    except BaseException:
+        os.remove(temp_file)
+        raise
+    finally:
+        cap.release()
+
+    if output_path:
+        os.replace(temp_file, output_path)
+        return output_path
+    return temp_file
@@ -1,8 +1,11 @@
 import os
 import tempfile
 from dataclasses import dataclass
+from typing import Optional
 from colorama import init, Fore, Style
 
+from screenkit import config
+
 init(autoreset=True)
 
 @dataclass
@@ -37,8 +40,19 @@ def pprint_table(header: str, data: dict, color: str = Color.GREEN, width: int =
     print(Color.CYAN + "-" * (width * 2 + 4))
 
 
-def get_data_path(video_path: str) -> str:
+def get_data_path(video_path: str, extension: str = config.SIDECAR_EXTENSION) -> str:
     filename = os.path.basename(video_path)
     filename_wo_extension = os.path.splitext(filename)[0]
     temp_dir = tempfile.gettempdir()
-    return os.path.join(temp_dir, f"{filename_wo_extension}.json")
\ No newline at end of file
+    return os.path.join(temp_dir, f"{filename_wo_extension}{extension}")
+
+
+def find_sidecar(video_path: str) -> Optional[str]:
+    """Locate the mouse event sidecar recorded alongside `video_path`, if any."""
+    stem = os.path.splitext(video_path)[0]
+    # Binary sidecars first, then the JSON ones written by older versions
+    for candidate in (stem + config.SIDECAR_EXTENSION, stem + ".json",
+                      get_data_path(video_path, config.SIDECAR_EXTENSION), get_data_path(video_path, ".json")):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
@@ -0,0 +1,235 @@
+import inspect
+import os
+import shutil
+import subprocess
+import tempfile
+from fractions import Fraction
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from screenkit import config
+from screenkit.spool import SpoolWriter
+from screenkit.utils import pprint, Color
+
+SEQUENCE_EXTENSIONS = (".png", ".npy")
+
+
+def ffmpeg_binary() -> Optional[str]:
+    """Path of the ffmpeg to pipe frames into (`SCREENKIT_FFMPEG` overrides the PATH lookup), or None."""
+    return shutil.which(os.environ.get("SCREENKIT_FFMPEG", "ffmpeg"))
+
+
+@lru_cache(maxsize=None)
+def ffmpeg_encoders(binary: str) -> Tuple[str, ...]:
+    """Names of the video encoders `binary` was built with."""
+    listing = subprocess.run([binary, "-hide_banner", "-encoders"], capture_output=True, text=True).stdout
+    return tuple(line.split()[1] for line in listing.splitlines() if line.startswith(" V"))
+
+
+def _check_frame(frame: np.ndarray, size: Tuple[int, int], channels: int = 3) -> None:
+    width, height = size
+    if frame.shape != (height, width, channels) or frame.dtype != np.uint8:
+        raise ValueError(f"Expected a {width}x{height}x{channels} uint8 frame, got {frame.shape} {frame.dtype}")
+
+
+def _frame_bytes(frame: np.ndarray, size: Tuple[int, int]) -> memoryview:
+    """Flat byte view of a BGR frame, copying only when it is not already contiguous."""
+    _check_frame(frame, size)
+    return memoryview(np.ascontiguousarray(frame)).cast("B")
+
+
+class OpenCVWriter:
+    """`cv2.VideoWriter` with a configurable fourcc (mp4v by default)."""
+
+    def __init__(self, path: str, fps: float, size: Tuple[int, int], fourcc: str = "mp4v"):
+        self.path = path
+        self._writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not self._writer.isOpened():
+            raise RuntimeError(f"OpenCV cannot write {fourcc} to {path}")
+
+    def isOpened(self) -> bool:
+        return self._writer.isOpened()
+
+    def write(self, frame: np.ndarray) -> None:
+        self._writer.write(frame)
+
+    def release(self) -> None:
+        self._writer.release()
+
+
+class FFmpegWriter:
+    """Pipes raw BGR frames into a local ffmpeg, which encodes them with libx264 (or `codec`).
+
+    Frames are written to ffmpeg's stdin straight from the NumPy buffer, so
+    the only copy is the one into the pipe. `crf`, `preset` and `threads` are
+    passed through; odd frame sizes are padded by one pixel for yuv420p.
+    """
+
+    def __init__(self, path: str, fps: float, size: Tuple[int, int], codec: str = config.DEFAULT_FFMPEG_CODEC,
+                 crf: int = config.DEFAULT_CRF, preset: str = config.DEFAULT_PRESET, threads: int = 0,
+                 pix_fmt: str = "yuv420p", binary: Optional[str] = None):
+        binary = binary or ffmpeg_binary()
+        if binary is None:
+            raise RuntimeError("ffmpeg not found")
+        if codec not in ffmpeg_encoders(binary):
+            raise RuntimeError(f"{binary} has no {codec} encoder")
+        self.path = path
+        self.size = size
+        width, height = size
+        command = [binary, "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", f"{fps:g}", "-i", "-",
+                   "-an", "-c:v", codec, "-pix_fmt", pix_fmt, "-threads", str(threads)]
+        if codec in ("libx264", "libx265"):
+            command += ["-crf", str(crf), "-preset", preset]
+        if pix_fmt == "yuv420p" and (width % 2 or height % 2):
+            command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+        command.append(str(path))
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=self._stderr, bufsize=0)
+
+    def _error(self) -> str:
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace").strip()[-500:]
+
+    def isOpened(self) -> bool:
+        return self._process.poll() is None
+
+    def write(self, frame: np.ndarray) -> None:
+        data = _frame_bytes(frame, self.size)
+        try:
+            while data:
+                written = self._process.stdin.write(data)
+                data = data[written:]
+        except BrokenPipeError:
+            self._process.wait()
+            raise RuntimeError(f"ffmpeg exited while encoding {self.path}: {self._error()}") from None
+
+    def release(self) -> None:
+        if self._process.stdin.closed:
+            return
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self._process.wait()
+        error = self._error() if returncode else ""
+        self._stderr.close()
+        if returncode:
+            raise RuntimeError(f"ffmpeg failed encoding {self.path}: {error}")
+
+
+class SequenceWriter:
+    """One `.png` or `.npy` file per frame.
+
+    `path` is either a printf pattern such as `frames/%06d.png` or a folder,
+    which gets `000000.<format>`, `000001.<format>`, ...
+    """
+
+    def __init__(self, path: str, fps: float, size: Tuple[int, int], format: str = "png", compression: int = 1):
+        if "%" not in os.path.basename(path):
+            path = os.path.join(path, f"%06d.{format}")
+        format = os.path.splitext(path)[1].lstrip(".")
+        if f".{format}" not in SEQUENCE_EXTENSIONS:
+            raise ValueError(f"Unsupported image sequence format: {format}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.fps = fps
+        self.size = size
+        self.format = format
+        self.frame_count = 0
+        self._png_params = [cv2.IMWRITE_PNG_COMPRESSION, compression]
+
+    def isOpened(self) -> bool:
+        return True
+
+    def write(self, frame: np.ndarray) -> None:
+        path = self.path % self.frame_count
+        if self.format == "npy":
+            np.save(path, frame)
+        elif not cv2.imwrite(path, frame, self._png_params):
+            raise RuntimeError(f"Could not write {path}")
+        self.frame_count += 1
+
+    def release(self) -> None:
+        pass
+
+
+class Y4MWriter:
+    """Uncompressed YUV4MPEG2 stream: 4:2:0 for even frame sizes, 4:4:4 otherwise."""
+
+    def __init__(self, path: str, fps: float, size: Tuple[int, int], buffer_size: int = config.SPOOL_WRITE_BUFFER):
+        width, height = size
+        self.path = path
+        self.size = size
+        self.subsampled = not (width % 2 or height % 2)
+        rate = Fraction(fps).limit_denominator(1001)
+        colorspace = "C420jpeg" if self.subsampled else "C444"
+        self._file = open(path, "wb", buffering=buffer_size)
+        self._file.write(f"YUV4MPEG2 W{width} H{height} F{rate.numerator}:{rate.denominator} Ip A1:1 {colorspace}\n".encode())
+
+    def isOpened(self) -> bool:
+        return not self._file.closed
+
+    def write(self, frame: np.ndarray) -> None:
+        _check_frame(frame, self.size)
+        if self.subsampled:
+            planes = cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+        else:
+            planes = np.ascontiguousarray(cv2.cvtColor(frame, cv2.COLOR_BGR2YUV).transpose(2, 0, 1))
+        self._file.write(b"FRAME\n")
+        self._file.write(memoryview(planes).cast("B"))
+
+    def release(self) -> None:
+        self._file.close()
+
+
+WRITERS: Dict[str, Callable[..., Any]] = {
+    "opencv": OpenCVWriter,
+    "ffmpeg": FFmpegWriter,
+    "sequence": SequenceWriter,
+    "y4m": Y4MWriter,
+    "spool": SpoolWriter,
+}
+
+
+def pick_backend(path: str) -> str:
+    """Backend implied by the output path: spool, Y4M and image sequences by extension, else ffmpeg if installed."""
+    path = str(path)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == config.SPOOL_EXTENSION:
+        return "spool"
+    if extension == ".y4m":
+        return "y4m"
+    if extension in SEQUENCE_EXTENSIONS:
+        return "sequence"
+    binary = ffmpeg_binary()
+    return "ffmpeg" if binary and config.DEFAULT_FFMPEG_CODEC in ffmpeg_encoders(binary) else "opencv"
+
+
+def open_writer(path: str, fps: float, size: Tuple[int, int], backend: str = "auto",
+                options: Optional[Dict[str, Any]] = None):
+    """Open a frame writer for `path` with `write(frame)` / `release()`, like `cv2.VideoWriter`.
+
+    `backend` is one of `config.WRITER_BACKENDS`; "auto" picks from the path (see
+    `pick_backend`). `options` are keyword arguments for that backend, and
+    ones it does not take are ignored. When ffmpeg cannot start (not
+    installed, encoder missing) the OpenCV writer is used instead, with a
+    warning.
+    """
+    if backend == "auto":
+        backend = pick_backend(path)
+    if backend not in WRITERS:
+        raise ValueError(f"Unknown writer backend {backend!r}, expected one of {', '.join(config.WRITER_BACKENDS)}")
+    writer_class = WRITERS[backend]
+    accepted = inspect.signature(writer_class).parameters
+    kwargs = {key: value for key, value in (options or {}).items() if key in accepted and value is not None}
+    try:
+        return writer_class(str(path), fps, size, **kwargs)
+    except (RuntimeError, OSError) as e:
+        if backend != "ffmpeg":
+            raise
+        pprint(f"The {backend} writer is unavailable ({e}); falling back to OpenCV.", color=Color.YELLOW)
+        return OpenCVWriter(str(path), fps, size)